@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Record/replay cache for AnkiConnect responses.
+
+Exports ask AnkiConnect the same findCards/cardsInfo/notesInfo questions on
+every run. With a cache, each response is stored as one JSON file named
+after its action and a hash of the request (action, version, params):
+
+    .anki_cache/cardsInfo-3f2a9c1e0b7d4a56.json
+    {"action": "cardsInfo", "params": {...}, "recordedAt": 1768900000.0, "result": [...]}
+
+Modes (--anki-cache):
+    off      always ask Anki (default)
+    auto     use responses younger than --anki-cache-ttl, ask Anki otherwise
+    record   always ask Anki and store the responses
+    replay   only use stored responses, of any age; a missing one is an
+             error, so runs are offline and deterministic
+
+--anki-cache-clear deletes the stored responses before the run. Errors
+from AnkiConnect are never stored.
+
+Usage in a CLI:
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    cache = cache_from_args(args)
+    result = cache.fetch("findCards", {"query": "deck:X"}, ask_anki)
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CACHE_MODES = ["off", "auto", "record", "replay"]
+DEFAULT_CACHE_DIR = Path(".anki_cache")
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+ANKI_CONNECT_VERSION = 6
+
+Fetch = Callable[[str, Dict], Any]
+
+
+class CacheMiss(Exception):
+    """A replay-mode request that was never recorded."""
+
+
+def request_hash(action: str, params: Dict, version: int = ANKI_CONNECT_VERSION) -> str:
+    """Stable hash of a request; params order does not matter."""
+    canonical = json.dumps(
+        {"action": action, "version": version, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class AnkiCache:
+    """Stored AnkiConnect responses in one directory, plus hit/miss counters."""
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, mode: str = "auto", ttl: float = DEFAULT_TTL_SECONDS):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, action: str, params: Dict) -> Path:
+        return self.directory / f"{action}-{request_hash(action, params)}.json"
+
+    def load(self, action: str, params: Dict) -> Optional[Dict]:
+        """The stored record for a request, or None."""
+        try:
+            with open(self.path(action, params), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def store(self, action: str, params: Dict, result: Any) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(action, params)
+        temp = path.with_suffix(".tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"action": action, "params": params, "recordedAt": time.time(), "result": result},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(temp, path)  # Readers never see a half-written response
+
+    def fetch(self, action: str, params: Dict, ask_anki: Fetch) -> Any:
+        """Result of an AnkiConnect request, from the cache or from ask_anki(action, params)."""
+        if self.mode == "off":
+            return ask_anki(action, params)
+
+        if self.mode in ("auto", "replay"):
+            record = self.load(action, params)
+            fresh = record is not None and (
+                self.mode == "replay" or time.time() - record.get("recordedAt", 0) < self.ttl
+            )
+            if fresh:
+                self.hits += 1
+                return record["result"]
+            if self.mode == "replay":
+                raise CacheMiss(
+                    f"{action} was never recorded in {self.directory} "
+                    f"(run once with --anki-cache record while Anki is open)"
+                )
+
+        self.misses += 1
+        result = ask_anki(action, params)
+        self.store(action, params, result)
+        return result
+
+    def clear(self) -> int:
+        """Delete all stored responses; returns how many there were."""
+        removed = 0
+        if self.directory.is_dir():
+            for path in self.directory.glob("*.json"):
+                path.unlink()
+                removed += 1
+        return removed
+
+    def summary(self) -> str:
+        return f"AnkiConnect cache ({self.mode}, {self.directory}): {self.hits} hits, {self.misses} asked Anki"
+
+
+def add_cache_arguments(parser) -> None:
+    """Register --anki-cache, --anki-cache-dir, --anki-cache-ttl and --anki-cache-clear."""
+    group = parser.add_argument_group("AnkiConnect cache")
+    group.add_argument(
+        "--anki-cache",
+        type=str,
+        default="off",
+        choices=CACHE_MODES,
+        help="off, auto (reuse fresh responses), record (refresh all) or replay (offline, cache only)"
+    )
+    group.add_argument(
+        "--anki-cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        metavar="DIR",
+        help=f"Where responses are stored (default: {DEFAULT_CACHE_DIR})"
+    )
+    group.add_argument(
+        "--anki-cache-ttl",
+        type=float,
+        default=DEFAULT_TTL_SECONDS,
+        metavar="SECONDS",
+        help=f"In auto mode, ask Anki again for responses older than this (default: {DEFAULT_TTL_SECONDS})"
+    )
+    group.add_argument(
+        "--anki-cache-clear",
+        action="store_true",
+        help="Delete stored responses before running"
+    )
+
+
+def cache_from_args(args) -> AnkiCache:
+    cache = AnkiCache(args.anki_cache_dir, args.anki_cache, args.anki_cache_ttl)
+    if args.anki_cache_clear:
+        print(f"✓ Cleared {cache.clear()} cached AnkiConnect responses from {cache.directory}")
+    return cache
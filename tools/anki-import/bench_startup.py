@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark for the anki-import CLIs.
+
+For each CLI this measures, in fresh interpreters:
+- import time of the module (python -X importtime, cumulative microseconds)
+- wall-clock time of `<script> --help` (interpreter start + imports + argparse)
+
+Best of --runs is reported. The heaviest imports of each module are listed,
+so a newly added top-level import shows up immediately.
+
+Usage:
+    python3 bench_startup.py
+    python3 bench_startup.py --runs 10 --top 8
+    python3 bench_startup.py --budget-ms 60     # exit 1 if any --help run is slower
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+TOOLS_DIR = Path(__file__).resolve().parent
+EXPORT_DIR = TOOLS_DIR / "export_scripts"
+
+# (module name, script path)
+CLIS = [
+    ("validate_import", TOOLS_DIR / "validate_import.py"),
+    ("import_to_llyli", TOOLS_DIR / "import_to_llyli.py"),
+    ("job_runner", TOOLS_DIR / "job_runner.py"),
+    ("watch_imports", TOOLS_DIR / "watch_imports.py"),
+    ("stub_server", TOOLS_DIR / "stub_server.py"),
+    ("export_with_learning_history", EXPORT_DIR / "export_with_learning_history.py"),
+    ("merge_all_sources", EXPORT_DIR / "merge_all_sources.py"),
+]
+
+
+def bench_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(TOOLS_DIR), str(EXPORT_DIR), env.get("PYTHONPATH")]))
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """(self_us, cumulative_us, indented name) per line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def measure_import(module: str, env: Dict[str, str]) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """Cumulative import time of module (us) and all importtime rows."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=TOOLS_DIR,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = parse_importtime(result.stderr)
+    total = next((cum for _, cum, name in rows if name.strip() == module and not name.startswith("  ")), 0)
+    return total, rows
+
+
+def measure_help(script: Path, env: Dict[str, str]) -> float:
+    """Wall-clock seconds for `script --help` in a fresh interpreter."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(script), "--help"], capture_output=True, env=env, cwd=TOOLS_DIR, check=True)
+    return time.perf_counter() - start
+
+
+def baseline_seconds(env: Dict[str, str], runs: int) -> float:
+    """Bare interpreter start, to separate our imports from Python itself."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark anki-import CLI startup (python -X importtime)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement, best is reported (default: 5)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per CLI (default: 5, 0 = none)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if any --help run takes longer")
+    args = parser.parse_args()
+
+    env = bench_env()
+    python_start = baseline_seconds(env, args.runs)
+
+    print("CLI STARTUP")
+    print("=" * 70)
+    print(f"Python {sys.version.split()[0]}, bare interpreter start: {python_start * 1000:.1f} ms\n")
+    print(f"{'module':<30} {'import':>10} {'--help':>10}")
+
+    over_budget = []
+    details = []
+    for module, script in CLIS:
+        try:
+            results = [measure_import(module, env) for _ in range(args.runs)]
+            import_us, rows = min(results, key=lambda r: r[0])
+            help_s = min(measure_help(script, env) for _ in range(args.runs))
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"{module:<30} ✗ {e}")
+            over_budget.append(module)
+            continue
+
+        flag = ""
+        if args.budget_ms is not None and help_s * 1000 > args.budget_ms:
+            flag = "  ✗ over budget"
+            over_budget.append(module)
+        print(f"{module:<30} {import_us / 1000:8.1f}ms {help_s * 1000:8.1f}ms{flag}")
+        details.append((module, rows))
+
+    if args.top:
+        for module, rows in details:
+            # Direct children of the module, plus third-party/stdlib roots imported before it
+            heaviest = sorted((r for r in rows if r[2].strip() != module), key=lambda r: r[0], reverse=True)[:args.top]
+            print(f"\n{module}: heaviest imports (self time)")
+            for self_us, cumulative_us, name in heaviest:
+                print(f"  {self_us / 1000:7.1f}ms self {cumulative_us / 1000:7.1f}ms cumulative  {name.strip()}")
+
+    if args.budget_ms is not None:
+        if over_budget:
+            print(f"\n✗ Over {args.budget_ms:g} ms budget: {', '.join(over_budget)}")
+            sys.exit(1)
+        print(f"\n✓ All CLIs start within {args.budget_ms:g} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar bulk-import batch format.
+
+The default body ({"entries": [...]}) repeats every key and most values
+per entry. A columnar body stores each field once per batch:
+
+    {
+      "format": "columnar", "version": 1, "count": 3, "skipDuplicates": true,
+      "shared": {"language": "target", "userId": "...", "learningHistory.mastered": false},
+      "dictionaries": {"category": ["work", "social"], "learningHistory.state": ["review", "new"]},
+      "lastLines": {"notes": ["[Source: CSV]", "[Source: Google Sheets]"]},
+      "columns": {
+        "originalText": ["a", "b", "c"],
+        "category": [0, 1, 0],
+        "notes": [["PT: ...\nEN: ...", 1], null, ["PT: ...\nEN: ...", 0]],
+        "learningHistory.interval": [12, null, 3]
+      }
+    }
+
+- Fields are dotted paths; "learningHistory.x" is x inside learningHistory
+- shared: fields every entry has with the same value
+- columns: one value per entry, null where the entry lacks the field
+- dictionaries: when a field has one, its column holds indexes into it
+  (used for strings with at most half as many distinct values as entries)
+- lastLines: for multi-line strings whose last line repeats (the notes'
+  [Source: ...] tag), values are [text before the last line, index into
+  lastLines], or [text, null] for a value without a line break
+
+Null and missing fields are both left out, so an entry gets a
+learningHistory whenever any learningHistory.* value is present. The
+bulk-import route decodes it with web/src/lib/utils/columnar.ts.
+
+Usage:
+    body = build_columnar_body(batch, backend)
+    entries = decode_columnar(json.loads(body))
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from serialization import JsonBackend, get_backend
+from vocab_model import AnyEntry, to_wire
+
+COLUMNAR_FORMAT = "columnar"
+COLUMNAR_VERSION = 1
+WIRE_FORMATS = ["json", COLUMNAR_FORMAT]
+PATH_SEPARATOR = "."
+
+
+def flatten(wire: Dict) -> Dict[str, Any]:
+    """Non-null fields of a wire entry, nested objects as dotted paths."""
+    flat = {}
+    for key, value in wire.items():
+        if isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                if inner_value is not None:
+                    flat[f"{key}{PATH_SEPARATOR}{inner_key}"] = inner_value
+        elif value is not None:
+            flat[key] = value
+    return flat
+
+
+def encode_columnar(entries: Iterable[AnyEntry], skip_duplicates: bool = True) -> Dict:
+    """Columnar body for a batch of VocabEntry objects or wire dicts."""
+    rows = [flatten(to_wire(entry)) for entry in entries]
+    fields: Dict[str, None] = {}  # First-seen order
+    for row in rows:
+        fields.update(dict.fromkeys(row))
+
+    shared = {}
+    dictionaries = {}
+    last_lines = {}
+    columns = {}
+    missing = object()
+    for field in fields:
+        values = [row.get(field, missing) for row in rows]
+        first = values[0]
+        if first is not missing and not isinstance(first, (list, dict)) and all(
+            type(v) is type(first) and v == first for v in values
+        ):
+            shared[field] = first
+            continue
+
+        column = [None if v is missing else v for v in values]
+        if not all(v is None or isinstance(v, str) for v in column):
+            columns[field] = column
+            continue
+
+        distinct = {v for v in column if v is not None}
+        tails = {v.rpartition("\n")[2] for v in distinct if "\n" in v}
+        if len(distinct) * 2 <= len(rows):
+            dictionaries[field] = sorted(distinct)
+            position = {value: i for i, value in enumerate(dictionaries[field])}
+            columns[field] = [None if v is None else position[v] for v in column]
+        elif tails and len(tails) * 2 <= len(distinct):
+            last_lines[field] = sorted(tails)
+            position = {value: i for i, value in enumerate(last_lines[field])}
+            columns[field] = [None if v is None else _split_last_line(v, position) for v in column]
+        else:
+            columns[field] = column
+
+    return {
+        "format": COLUMNAR_FORMAT,
+        "version": COLUMNAR_VERSION,
+        "count": len(rows),
+        "skipDuplicates": skip_duplicates,
+        "shared": shared,
+        "dictionaries": dictionaries,
+        "lastLines": last_lines,
+        "columns": columns,
+    }
+
+
+def _split_last_line(value: str, position: Dict[str, int]) -> List:
+    head, newline, tail = value.rpartition("\n")
+    return [head, position[tail]] if newline else [value, None]
+
+
+def build_columnar_body(
+    entries: Iterable[AnyEntry],
+    backend: Optional[JsonBackend] = None,
+    skip_duplicates: bool = True
+) -> bytes:
+    return (backend or get_backend()).dumps(encode_columnar(entries, skip_duplicates))
+
+
+def is_columnar(body: Any) -> bool:
+    return isinstance(body, dict) and body.get("format") == COLUMNAR_FORMAT
+
+
+def _set(entry: Dict, field: str, value: Any) -> None:
+    key, _, inner_key = field.partition(PATH_SEPARATOR)
+    if inner_key:
+        entry.setdefault(key, {})[inner_key] = value
+    else:
+        entry[key] = value
+
+
+def decode_columnar(payload: Dict) -> List[Dict]:
+    """
+    Wire entries of a columnar body.
+
+    Raises ValueError for an unknown version, a column of the wrong length
+    or a dictionary/lastLines index out of range.
+    """
+    if payload.get("version") != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar version: {payload.get('version')}")
+    count = payload.get("count")
+    if not isinstance(count, int) or count < 0:
+        raise ValueError("count must be a non-negative integer")
+
+    entries: List[Dict] = [{} for _ in range(count)]
+    for field, value in (payload.get("shared") or {}).items():
+        for entry in entries:
+            _set(entry, field, value)
+
+    dictionaries = payload.get("dictionaries") or {}
+    last_lines = payload.get("lastLines") or {}
+    for field, column in (payload.get("columns") or {}).items():
+        if not isinstance(column, list) or len(column) != count:
+            raise ValueError(f"Column {field} must have {count} values")
+        dictionary: Optional[List] = dictionaries.get(field)
+        tails: Optional[List] = last_lines.get(field)
+        for entry, value in zip(entries, column):
+            if value is None:
+                continue
+            if dictionary is not None:
+                value = _lookup(dictionary, value, field)
+            elif tails is not None:
+                if not isinstance(value, list) or len(value) != 2 or not isinstance(value[0], str):
+                    raise ValueError(f"Column {field}: expected [text, lastLines index]")
+                head, index = value
+                value = head if index is None else f"{head}\n{_lookup(tails, index, field)}"
+            _set(entry, field, value)
+    return entries
+
+
+def _lookup(table: List, index: Any, field: str) -> Any:
+    if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < len(table):
+        raise ValueError(f"Column {field}: index {index} out of range")
+    return table[index]
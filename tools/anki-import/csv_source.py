@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming CSV vocabulary source with column mapping.
+
+Yields one merged-vocabulary row per CSV line (word_pt, word_en,
+sentence_pt, sentence_en, date_added, category, source) straight from the
+csv reader, so transform_to_llyli_with_history() can consume spreadsheets of
+any size without the file being loaded into memory.
+
+Columns are resolved in this order:
+1. An explicit mapping, field -> header name or 0-based column index
+   ("word_pt=translation_portuguese,word_en=word_english").
+2. Header auto-detection: the first row is a header when both word columns
+   can be found in it via HEADER_ALIASES.
+3. The legacy headerless layout date,word_pt,word_en,sentence_pt,sentence_en
+   (the iCloud sayings.csv).
+
+The delimiter (comma, semicolon, tab) is sniffed from the start of the file.
+
+Usage:
+    source = CsvSource(Path("Portuguese_Mastery_structured_Anki.csv"))
+    for row in source:
+        ...
+    print(source.rows, source.skipped)
+"""
+import csv
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+FIELDS = ["word_pt", "word_en", "sentence_pt", "sentence_en", "date_added", "category"]
+REQUIRED = ["word_pt", "word_en"]
+
+# Normalized header names (lowercase, _ for spaces/dashes) per field
+HEADER_ALIASES = {
+    "word_pt": ["word_pt", "word_portuguese", "portuguese", "translation_portuguese", "pt", "original_text", "originaltext"],
+    "word_en": ["word_en", "word_english", "english", "translation_english", "en", "translation"],
+    "sentence_pt": ["sentence_pt", "sentence_portuguese", "example_pt", "example_portuguese"],
+    "sentence_en": ["sentence_en", "sentence_english", "example_en", "example_english"],
+    "date_added": ["date_added", "date", "created", "created_at", "createdat", "added"],
+    "category": ["category", "categories"],
+}
+
+# sayings.csv: date,word_pt,word_en,sentence_pt,sentence_en (no header)
+LEGACY_LAYOUT = {"date_added": 0, "word_pt": 1, "word_en": 2, "sentence_pt": 3, "sentence_en": 4}
+
+SNIFF_BYTES = 64 * 1024
+
+ColumnRef = Union[str, int]
+
+
+def normalize_header(name: str) -> str:
+    return name.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def parse_mapping(spec: str) -> Dict[str, ColumnRef]:
+    """
+    Parse "field=column,field=column"; numeric columns are 0-based indices.
+
+    Raises ValueError for unknown fields or malformed pairs.
+    """
+    mapping: Dict[str, ColumnRef] = {}
+    for pair in filter(None, (p.strip() for p in spec.split(","))):
+        field, sep, column = pair.partition("=")
+        field, column = field.strip(), column.strip()
+        if not sep or not column:
+            raise ValueError(f"Invalid column mapping '{pair}' (expected field=column)")
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field '{field}' (choose from: {', '.join(FIELDS)})")
+        mapping[field] = int(column) if column.isdigit() else column
+    return mapping
+
+
+def detect_header(row: List[str]) -> Optional[Dict[str, int]]:
+    """Field -> index if row looks like a header (both word columns found), else None."""
+    positions = {normalize_header(cell): i for i, cell in enumerate(row)}
+    columns = {}
+    for field, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in positions:
+                columns[field] = positions[alias]
+                break
+    if all(field in columns for field in REQUIRED):
+        return columns
+    return None
+
+
+def resolve_mapping(mapping: Dict[str, ColumnRef], header: Optional[List[str]]) -> Dict[str, int]:
+    """Turn an explicit mapping (names or indices) into field -> index."""
+    positions = {normalize_header(cell): i for i, cell in enumerate(header or [])}
+    columns = {}
+    for field, column in mapping.items():
+        if isinstance(column, int):
+            columns[field] = column
+        elif normalize_header(column) in positions:
+            columns[field] = positions[normalize_header(column)]
+        else:
+            raise ValueError(f"Column '{column}' for {field} not found in header: {', '.join(header or [])}")
+    missing = [field for field in REQUIRED if field not in columns]
+    if missing:
+        raise ValueError(f"Column mapping is missing required field(s): {', '.join(missing)}")
+    return columns
+
+
+class CsvSource:
+    """
+    Iterable of merged-vocabulary rows read lazily from a CSV file.
+
+    has_header=None auto-detects; True/False forces it. After iteration,
+    rows is the number of rows yielded and skipped the number of lines
+    without both words.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mapping: Optional[Dict[str, ColumnRef]] = None,
+        has_header: Optional[bool] = None,
+        source_name: str = "CSV",
+        encoding: str = "utf-8-sig"
+    ):
+        self.path = Path(path)
+        self.mapping = mapping
+        self.has_header = has_header
+        self.source_name = source_name
+        self.encoding = encoding
+        self.columns: Optional[Dict[str, int]] = None
+        self.rows = 0
+        self.skipped = 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        self.rows = 0
+        self.skipped = 0
+        with open(self.path, "r", encoding=self.encoding, newline="") as f:
+            reader = csv.reader(f, self._sniff_dialect(f))
+            first = next(reader, None)
+            if first is None:
+                return
+
+            self.columns, first_is_data = self._resolve_columns(first)
+            if first_is_data:
+                row = self._to_row(first)
+                if row:
+                    yield row
+
+            for cells in reader:
+                row = self._to_row(cells)
+                if row:
+                    yield row
+
+    def _sniff_dialect(self, f):
+        sample = f.read(SNIFF_BYTES)
+        f.seek(0)
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            return csv.excel
+
+    def _resolve_columns(self, first: List[str]):
+        """Column indices, and whether the first row is data rather than a header."""
+        if self.mapping:
+            has_header = self.has_header
+            if has_header is None:
+                # Named columns need a header; pure index mappings assume none unless detected
+                has_header = (
+                    any(isinstance(c, str) for c in self.mapping.values())
+                    or detect_header(first) is not None
+                )
+            return resolve_mapping(self.mapping, first if has_header else None), not has_header
+
+        detected = detect_header(first) if self.has_header is not False else None
+        if detected is not None:
+            return detected, False
+        if self.has_header:
+            raise ValueError(
+                f"Could not find word columns in header of {self.path}: {', '.join(first)} "
+                "(pass a column mapping)"
+            )
+        return dict(LEGACY_LAYOUT), True
+
+    def _to_row(self, cells: List[str]) -> Optional[Dict]:
+        row = {"source": self.source_name}
+        for field in FIELDS:
+            index = self.columns.get(field)
+            row[field] = cells[index].strip() if index is not None and index < len(cells) else ""
+
+        if not row["word_pt"] or not row["word_en"]:
+            self.skipped += 1
+            return None
+        self.rows += 1
+        return row
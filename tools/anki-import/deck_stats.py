@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar deck analytics for import files.
+
+DeckColumns stores one typed array per field (category code, state code,
+reviewCount, lapseCount, interval, easeFactor, mastered) instead of walking
+entry objects. Counts and distributions are then reductions over those
+arrays: vectorized with NumPy when it is installed, plain loops over the
+stdlib arrays otherwise. Both paths return identical results.
+
+Null history values count as the field's default. Values that are not
+numbers (strings, booleans, NaN, out of range) are stored as 0 and counted
+in the summary's invalidNumbers, so one malformed entry cannot stop an
+analysis; validate_import.py reports where they are.
+
+Usage:
+    columns = DeckColumns.from_entries(entries)   # VocabEntry objects or wire dicts
+    summary = columns.summarize()
+"""
+import bisect
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from vocab_model import Category, LearningState, VocabEntry
+
+CATEGORIES = [c.value for c in Category]
+STATES = [s.value for s in LearningState]
+CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORIES)}
+STATE_CODES = {name: code for code, name in enumerate(STATES)}
+UNKNOWN_CODE = -1  # Category/state outside the LLYLI vocabulary
+NO_HISTORY = -2  # State code for entries without learningHistory
+
+# Interval histogram bucket lower bounds (days) and labels
+INTERVAL_EDGES = [0, 1, 7, 30, 90, 180, 365]
+INTERVAL_LABELS = ["0d", "1-6d", "7-29d", "30-89d", "90-179d", "180-364d", "365d+"]
+LAPSE_PERCENTILES = [50, 90, 99]
+EASE_PERCENTILES = [25, 50, 75]
+
+_numpy = None
+
+
+def load_numpy():
+    """Import NumPy on first use; None when it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+INT_LIMIT = 2 ** (8 * array("l").itemsize - 1)  # Range of the integer columns
+
+
+def as_number(value, integer: bool = False) -> Optional[float]:
+    """A value that fits its column (int or float), or None when it is not a usable number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if integer:
+        value = int(value)
+        return value if -INT_LIMIT <= value < INT_LIMIT else None
+    try:
+        return float(value)
+    except OverflowError:  # An int too large for a float
+        return None
+
+
+def history_value(history: Dict, key: str, default):
+    """Wire history field, with the model's default for a missing key or null."""
+    value = history.get(key)
+    return default if value is None else value
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile, same definition as numpy.percentile's default."""
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def empty_spread(percentiles: List[int]) -> Dict[str, float]:
+    return {"min": 0.0, **{f"p{p}": 0.0 for p in percentiles}, "max": 0.0}
+
+
+def sorted_spread(sorted_values: List[float], percentiles: List[int]) -> Dict[str, float]:
+    """min, requested percentiles and max of an already sorted list."""
+    if not sorted_values:
+        return empty_spread(percentiles)
+    return {
+        "min": float(sorted_values[0]),
+        **{f"p{p}": float(percentile(sorted_values, p)) for p in percentiles},
+        "max": float(sorted_values[-1]),
+    }
+
+
+class DeckColumns:
+    """Column-per-field view of a deck, one row per entry."""
+
+    def __init__(self):
+        self.category = array("b")
+        self.state = array("b")
+        self.review_count = array("l")
+        self.lapse_count = array("l")
+        self.interval = array("d")
+        self.ease_factor = array("d")
+        self.mastered = array("b")
+        self.invalid_numbers = 0  # Entries with a non-numeric history value
+
+    def __len__(self) -> int:
+        return len(self.category)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable) -> "DeckColumns":
+        columns = cls()
+        for entry in entries:
+            if isinstance(entry, VocabEntry):
+                columns.append_entry(entry)
+            else:
+                columns.append_wire(entry)
+        return columns
+
+    def append_entry(self, entry: VocabEntry) -> None:
+        self.category.append(CATEGORY_CODES[entry.category.value])
+        history = entry.learning_history
+        if history is None:
+            self.append_history(NO_HISTORY, 0, 0, 0, 0, False)
+        else:
+            self.append_history(
+                STATE_CODES[history.state.value],
+                history.review_count,
+                history.lapse_count,
+                history.interval,
+                history.ease_factor,
+                history.mastered,
+            )
+
+    def append_wire(self, entry: Dict) -> None:
+        """Append a raw wire dict; tolerates invalid values (validation reports them)."""
+        self.category.append(CATEGORY_CODES.get(entry.get("category", "other"), UNKNOWN_CODE))
+        history = entry.get("learningHistory")
+        if not isinstance(history, dict) or not history:
+            self.append_history(NO_HISTORY, 0, 0, 0, 0, False)
+        else:
+            self.append_history(
+                STATE_CODES.get(history.get("state", "new"), UNKNOWN_CODE),
+                history_value(history, "reviewCount", 0),
+                history_value(history, "lapseCount", 0),
+                history_value(history, "interval", 0),
+                history_value(history, "easeFactor", 2.5),
+                history.get("mastered") is True,
+            )
+
+    def extend(self, other: "DeckColumns") -> None:
+        """Append another deck's rows (e.g. a worker's partial columns)."""
+        for name in ("category", "state", "review_count", "lapse_count", "interval", "ease_factor", "mastered"):
+            getattr(self, name).extend(getattr(other, name))
+        self.invalid_numbers += other.invalid_numbers
+
+    def append_history(self, state: int, reviews, lapses, interval, ease, mastered: bool) -> None:
+        """Append one row; values that are not numbers become 0 and are counted."""
+        numbers = (
+            as_number(reviews, integer=True),
+            as_number(lapses, integer=True),
+            as_number(interval),
+            as_number(ease),
+        )
+        if None in numbers:
+            self.invalid_numbers += 1
+        reviews, lapses, interval, ease = (0 if n is None else n for n in numbers)
+        self.state.append(state)
+        self.review_count.append(reviews)
+        self.lapse_count.append(lapses)
+        self.interval.append(interval)
+        self.ease_factor.append(ease)
+        self.mastered.append(1 if mastered else 0)
+
+    def summarize(self, use_numpy: Optional[bool] = None) -> Dict:
+        """
+        Counts plus scheduling distributions for the deck.
+
+        Keys: total, withHistory, byState, byCategory, mastered,
+        intervalHistogram, lapsePercentiles, easeDistribution,
+        invalidNumbers.
+        Distributions cover entries with learning history only.
+        use_numpy=None picks NumPy when available.
+        """
+        np = load_numpy() if use_numpy is not False else None
+        if use_numpy and np is None:
+            raise RuntimeError("NumPy is not installed")
+        return self._summarize_numpy(np) if np is not None else self._summarize_loops()
+
+    def _summarize_numpy(self, np) -> Dict:
+        category = np.asarray(self.category)
+        state = np.asarray(self.state)
+        has_history = state != NO_HISTORY
+
+        state_counts = np.bincount(state[state >= 0], minlength=len(STATES))
+        category_counts = np.bincount(category[category >= 0], minlength=len(CATEGORIES))
+        by_category = {CATEGORIES[c]: int(n) for c, n in enumerate(category_counts) if n}
+        unknown_categories = int(np.count_nonzero(category == UNKNOWN_CODE))
+
+        intervals = np.asarray(self.interval)[has_history]
+        lapses = np.asarray(self.lapse_count)[has_history]
+        eases = np.asarray(self.ease_factor)[has_history]
+        buckets = np.searchsorted(INTERVAL_EDGES, intervals, side="right") - 1
+        histogram = np.bincount(buckets[buckets >= 0], minlength=len(INTERVAL_EDGES))
+
+        return self._build_summary(
+            with_history=int(np.count_nonzero(has_history)),
+            state_counts=[int(n) for n in state_counts],
+            by_category=by_category,
+            unknown_categories=unknown_categories,
+            mastered=int(np.count_nonzero(np.asarray(self.mastered)[has_history])),
+            histogram=[int(n) for n in histogram],
+            lapse_stats=self._numpy_spread(np, lapses, LAPSE_PERCENTILES),
+            ease_stats=self._numpy_spread(np, eases, EASE_PERCENTILES),
+        )
+
+    @staticmethod
+    def _numpy_spread(np, values, percentiles: List[int]) -> Dict[str, float]:
+        if not len(values):
+            return empty_spread(percentiles)
+        points = np.percentile(values, percentiles)
+        return {
+            "min": float(values.min()),
+            **{f"p{p}": float(v) for p, v in zip(percentiles, points)},
+            "max": float(values.max()),
+        }
+
+    def _summarize_loops(self) -> Dict:
+        state_counts = [0] * len(STATES)
+        category_counts = [0] * len(CATEGORIES)
+        unknown_categories = 0
+        histogram = [0] * len(INTERVAL_EDGES)
+        with_history = 0
+        mastered = 0
+        lapses = []
+        eases = []
+
+        for code in self.category:
+            if code >= 0:
+                category_counts[code] += 1
+            else:
+                unknown_categories += 1
+
+        for i, code in enumerate(self.state):
+            if code == NO_HISTORY:
+                continue
+            with_history += 1
+            if code >= 0:
+                state_counts[code] += 1
+            mastered += self.mastered[i]
+            bucket = bisect.bisect_right(INTERVAL_EDGES, self.interval[i]) - 1
+            if bucket >= 0:
+                histogram[bucket] += 1
+            lapses.append(self.lapse_count[i])
+            eases.append(self.ease_factor[i])
+
+        return self._build_summary(
+            with_history=with_history,
+            state_counts=state_counts,
+            by_category={CATEGORIES[c]: n for c, n in enumerate(category_counts) if n},
+            unknown_categories=unknown_categories,
+            mastered=mastered,
+            histogram=histogram,
+            lapse_stats=sorted_spread(sorted(lapses), LAPSE_PERCENTILES),
+            ease_stats=sorted_spread(sorted(eases), EASE_PERCENTILES),
+        )
+
+    def _build_summary(
+        self,
+        with_history: int,
+        state_counts: List[int],
+        by_category: Dict[str, int],
+        unknown_categories: int,
+        mastered: int,
+        histogram: List[int],
+        lapse_stats: Dict[str, float],
+        ease_stats: Dict[str, float]
+    ) -> Dict:
+        if unknown_categories:
+            by_category["(invalid)"] = unknown_categories
+
+        return {
+            "total": len(self),
+            "withHistory": with_history,
+            "byState": dict(zip(STATES, state_counts)),
+            "byCategory": by_category,
+            "mastered": mastered,
+            "intervalHistogram": dict(zip(INTERVAL_LABELS, histogram)),
+            "lapsePercentiles": lapse_stats,
+            "easeDistribution": ease_stats,
+            "invalidNumbers": self.invalid_numbers,
+        }
+
+
+def print_distributions(summary: Dict) -> None:
+    """Print the scheduling distributions from DeckColumns.summarize()."""
+    if summary.get("invalidNumbers"):
+        print(f"\n⚠️  {summary['invalidNumbers']} entries have non-numeric learning history values (counted as 0)")
+    if not summary.get("withHistory"):
+        return
+
+    print(f"\nReview intervals:")
+    for label, count in summary["intervalHistogram"].items():
+        if count > 0:
+            print(f"  {label:>9}: {count}")
+
+    lapses = summary["lapsePercentiles"]
+    print(f"\nLapses: p50 {lapses['p50']:g} · p90 {lapses['p90']:g} · p99 {lapses['p99']:g} · max {lapses['max']:g}")
+
+    ease = summary["easeDistribution"]
+    print(f"Ease factor: min {ease['min']:g} · p25 {ease['p25']:g} · median {ease['p50']:g} · p75 {ease['p75']:g} · max {ease['max']:g}")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Byte-offset index over import files for random access and range reads.
+
+build_index() scans an import file once and writes a sidecar
+(<file>.idx) holding the start and end byte offset of every entry.
+It handles a JSON array (the export format) and NDJSON (one object per
+line). A JSON array whose own syntax is broken (missing comma, trailing
+data) is rejected with ValueError, like json.load would; non-object items
+are indexed as entries so the validator can report them by number.
+
+IndexedReader memory-maps the file plus its index and can then:
+
+- fetch entry N in O(1), e.g. the one a validate_entry error points at;
+- split the file into disjoint index ranges, each of which a separate
+  worker process reads on its own without parsing anything before it.
+
+The sidecar records the source file's size and mtime and is rebuilt
+automatically when the file changes.
+
+Usage:
+    python3 entry_index.py imports/file.json            # build/refresh the sidecar
+    python3 entry_index.py imports/file.json --show 17  # print "Entry 17" of a validation error
+
+    with IndexedReader(path) as reader:
+        entry = reader.get_dict(16)  # 0-based
+        for part in reader.ranges(4):
+            ...
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from vocab_model import VocabEntry
+
+INDEX_SUFFIX = ".idx"
+MAGIC = b"LLYLIDX1"
+# magic, source size, source mtime_ns, entry count
+HEADER = struct.Struct("<8sQQQ")
+
+# Everything up to the next bracket outside a string: scalars, whitespace and
+# whole strings (escaped quotes included) are skipped in one C-level match
+_SKIP = re.compile(rb'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+_SPACE = re.compile(rb"[ \t\r\n]*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(rb"[^,\]\s]+")
+
+
+def index_path_for(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _skip_container(buf, pos: int) -> int:
+    """End offset of the object or array opened at pos (brackets matched, contents not parsed)."""
+    depth = 0
+    size = len(buf)
+    while True:
+        char = buf[pos:pos + 1]
+        if char in (b"{", b"["):
+            depth += 1
+        elif char in (b"}", b"]"):
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos = _SKIP.match(buf, pos + 1).end()
+        if pos >= size:
+            raise ValueError("Unterminated JSON array")
+        if buf[pos:pos + 1] == b'"':
+            raise ValueError(f"Unterminated string at byte {pos}")
+
+
+def _scan_array(buf, start: int) -> Tuple[array, array]:
+    """
+    Offsets of the items directly inside the top-level array opened at start.
+
+    The array's own syntax is checked (commas between items, nothing after
+    the closing bracket), so a file is rejected here whenever json.load
+    would reject it for that reason. Items are recorded whatever their
+    type, keeping entry numbers equal to json.load positions; their
+    contents are only parsed when read.
+    """
+    starts, ends = array("Q"), array("Q")
+    size = len(buf)
+    pos = _SPACE.match(buf, start + 1).end()
+    if buf[pos:pos + 1] == b"]":
+        pos += 1
+    else:
+        while True:
+            char = buf[pos:pos + 1]
+            if char in (b"{", b"["):
+                end = _skip_container(buf, pos)
+            elif char == b'"':
+                match = _STRING.match(buf, pos)
+                if match is None:
+                    raise ValueError(f"Unterminated string at byte {pos}")
+                end = match.end()
+            elif char and char not in (b",", b"]", b"}"):
+                end = _SCALAR.match(buf, pos).end()
+                try:
+                    json.loads(buf[pos:end])
+                except ValueError:
+                    raise ValueError(f"Expecting value at byte {pos}") from None
+            elif pos >= size:
+                raise ValueError("Unterminated JSON array")
+            else:
+                raise ValueError(f"Expecting value at byte {pos}")
+            starts.append(pos)
+            ends.append(end)
+
+            pos = _SPACE.match(buf, end).end()
+            char = buf[pos:pos + 1]
+            if char == b"]":
+                pos += 1
+                break
+            if pos >= size:
+                raise ValueError("Unterminated JSON array")
+            if char != b",":
+                raise ValueError(f"Expecting ',' delimiter at byte {pos}")
+            pos = _SPACE.match(buf, pos + 1).end()
+
+    if _SPACE.match(buf, pos).end() < size:
+        raise ValueError(f"Extra data at byte {pos}")
+    return starts, ends
+
+
+def _scan_lines(buf, start: int) -> Tuple[array, array]:
+    """Offsets of the non-blank lines of an NDJSON file."""
+    starts, ends = array("Q"), array("Q")
+    size = len(buf)
+    pos = start
+    while pos < size:
+        newline = buf.find(b"\n", pos)
+        end = size if newline == -1 else newline
+        line_start, line_end = pos, end
+        while line_start < line_end and buf[line_start:line_start + 1].isspace():
+            line_start += 1
+        while line_end > line_start and buf[line_end - 1:line_end].isspace():
+            line_end -= 1
+        if line_end > line_start:
+            starts.append(line_start)
+            ends.append(line_end)
+        pos = end + 1
+    return starts, ends
+
+
+def scan_offsets(buf) -> Tuple[array, array]:
+    """Start/end byte offsets of every entry in a JSON-array or NDJSON buffer."""
+    first = re.compile(rb"\S").search(buf)
+    if first is None:
+        return array("Q"), array("Q")
+    if buf[first.start():first.start() + 1] == b"[":
+        return _scan_array(buf, first.start())
+    return _scan_lines(buf, first.start())
+
+
+def build_index(path: Path, index_path: Optional[Path] = None) -> Path:
+    """Scan path once and write its sidecar index; returns the index path."""
+    index_path = index_path or index_path_for(path)
+    stat = path.stat()
+    with open(path, "rb") as f:
+        if stat.st_size == 0:
+            starts, ends = array("Q"), array("Q")
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                starts, ends = scan_offsets(buf)
+
+    if sys.byteorder != "little":
+        starts.byteswap()
+        ends.byteswap()
+    tmp = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp, "wb") as out:
+        out.write(HEADER.pack(MAGIC, stat.st_size, stat.st_mtime_ns, len(starts)))
+        out.write(starts.tobytes())
+        out.write(ends.tobytes())
+    os.replace(tmp, index_path)
+    return index_path
+
+
+def index_is_current(path: Path, index_path: Path) -> bool:
+    try:
+        with open(index_path, "rb") as f:
+            magic, size, mtime_ns, _ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return False
+    stat = path.stat()
+    return magic == MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+
+class IndexedReader:
+    """Memory-mapped random access to the entries of an indexed import file."""
+
+    def __init__(self, path: Path, index_path: Optional[Path] = None, build: bool = True):
+        self.path = Path(path)
+        self.index_path = index_path or index_path_for(self.path)
+        if not index_is_current(self.path, self.index_path):
+            if not build:
+                raise FileNotFoundError(f"No current index for {self.path} (run entry_index.py)")
+            build_index(self.path, self.index_path)
+
+        with open(self.index_path, "rb") as f:
+            _, _, _, count = HEADER.unpack(f.read(HEADER.size))
+            self.starts = array("Q")
+            self.starts.frombytes(f.read(8 * count))
+            self.ends = array("Q")
+            self.ends.frombytes(f.read(8 * count))
+        if sys.byteorder != "little":
+            self.starts.byteswap()
+            self.ends.byteswap()
+
+        self._file = open(self.path, "rb")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if count else b""
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __enter__(self) -> "IndexedReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._file.close()
+
+    def raw(self, index: int) -> bytes:
+        """The JSON bytes of entry index (0-based)."""
+        return self._buf[self.starts[index]:self.ends[index]]
+
+    def get_dict(self, index: int) -> Dict:
+        return json.loads(self.raw(index))
+
+    def get(self, index: int) -> VocabEntry:
+        return VocabEntry.from_dict(self.get_dict(index))
+
+    def ranges(self, parts: int) -> List[range]:
+        """Split 0..len into at most parts disjoint, contiguous, near-equal ranges."""
+        total = len(self)
+        parts = max(1, min(parts, total)) if total else 1
+        size, extra = divmod(total, parts)
+        result = []
+        start = 0
+        for part in range(parts):
+            end = start + size + (1 if part < extra else 0)
+            result.append(range(start, end))
+            start = end
+        return result
+
+    def iter_dicts(self, indices: range) -> Iterator[Tuple[int, Dict]]:
+        """(index, wire dict) for each entry in a range."""
+        for index in indices:
+            yield index, json.loads(self._buf[self.starts[index]:self.ends[index]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a byte-offset index for an import file (JSON array or NDJSON)")
+    parser.add_argument("filepath", type=Path, help="Import file")
+    parser.add_argument("--show", type=int, action="append", default=[], metavar="N", help="Print entry N (1-based, as numbered in validation errors)")
+    args = parser.parse_args()
+
+    if not args.filepath.exists():
+        print(f"✗ File not found: {args.filepath}")
+        sys.exit(1)
+
+    try:
+        fresh = index_is_current(args.filepath, index_path_for(args.filepath))
+        with IndexedReader(args.filepath) as reader:
+            status = "up to date" if fresh else "built"
+            print(f"✓ Index {status}: {reader.index_path} ({len(reader)} entries)")
+            for number in args.show:
+                if not 1 <= number <= len(reader):
+                    raise IndexError(f"Entry {number} out of range (1-{len(reader)})")
+                print(f"\nEntry {number}:")
+                print(json.dumps(reader.get_dict(number - 1), ensure_ascii=False, indent=2))
+    except (ValueError, IndexError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
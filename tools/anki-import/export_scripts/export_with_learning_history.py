@@ -22,14 +22,19 @@ import argparse
 import csv
 import json
 import sys
-import urllib.request
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
-# Import local modules
-import google_sheets
-from transform_inbox_to_csv import classify_card
+# Shared anki-import helpers (profiling.py) live one directory up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from anki_cache import ANKI_CONNECT_VERSION, AnkiCache, add_cache_arguments, cache_from_args
+from csv_source import CsvSource, parse_mapping
+from profiling import add_profiling_arguments, profiling_session
+from serialization import BACKEND_CHOICES, get_backend
+from vocab_model import (
+    Category, Language, LearningHistory, LearningState, VocabEntry, entries_to_dicts, user_id_problem,
+)
 
 
 # Category mapping
@@ -43,14 +48,23 @@ CATEGORY_MAP = {
 }
 
 
-def anki_request(action: str, **params) -> dict:
-    """Make a request to AnkiConnect API."""
+def anki_request(action: str, cache: Optional[AnkiCache] = None, **params) -> dict:
+    """Make a request to AnkiConnect API, through the record/replay cache when given."""
+    if cache is not None:
+        return cache.fetch(action, params, ask_anki_connect)
+    return ask_anki_connect(action, params)
+
+
+def ask_anki_connect(action: str, params: Dict) -> dict:
+    """POST one request to AnkiConnect and return its result."""
     request_json = json.dumps({
         "action": action,
-        "version": 6,
+        "version": ANKI_CONNECT_VERSION,
         "params": params
     }).encode('utf-8')
 
+    import urllib.request  # Only needed once we talk to Anki, not for --help
+
     try:
         response = urllib.request.urlopen(
             urllib.request.Request('http://127.0.0.1:8765', request_json),
@@ -66,27 +80,33 @@ def anki_request(action: str, **params) -> dict:
         raise Exception(f"Failed to connect to Anki: {e}")
 
 
-def get_anki_learning_history(deck_name: str = "Portuguese Mastery (pt-PT)") -> Dict[str, Dict]:
+def get_anki_learning_history(
+    deck_name: str = "Portuguese Mastery (pt-PT)",
+    cache: Optional[AnkiCache] = None
+) -> Dict[str, Dict]:
     """
     Get complete learning history for all cards in deck.
 
+    With a cache, AnkiConnect responses are recorded or replayed (see anki_cache.py).
+
     Returns dict mapping (word_pt, word_en) -> learning metadata
     """
     print("Fetching learning history from Anki...")
 
     # Find all cards
-    card_ids = anki_request("findCards", query=f'deck:"{deck_name}"')
+    card_ids = anki_request("findCards", cache, query=f'deck:"{deck_name}"')
     print(f"  Found {len(card_ids)} cards in Anki deck")
 
     if not card_ids:
         return {}
 
     # Get detailed card info
-    cards_info = anki_request("cardsInfo", cards=card_ids)
+    cards_info = anki_request("cardsInfo", cache, cards=card_ids)
 
     # Get note info for word data
-    note_ids = list(set(c.get("note") for c in cards_info if c.get("note")))
-    notes_info = anki_request("notesInfo", notes=note_ids)
+    # Sorted so the request, and its cache key, is the same on every run
+    note_ids = sorted(set(c.get("note") for c in cards_info if c.get("note")))
+    notes_info = anki_request("notesInfo", cache, notes=note_ids)
 
     # Build notes map
     notes_map = {}
@@ -176,9 +196,22 @@ def load_merged_vocabulary(filepath: str = "merged_vocabulary.json") -> List[Dic
         return json.load(f)
 
 
-def normalize_category(category: str) -> str:
-    """Normalize category from emoji format to LLYLI format."""
-    return CATEGORY_MAP.get(category, "other")
+def load_csv_vocabulary(source: CsvSource) -> Iterator[Dict]:
+    """Stream rows from a CSV source, classifying rows without a category."""
+    # transform_inbox_to_csv lives in the Anki project; only CSV exports need it
+    from transform_inbox_to_csv import classify_card
+
+    for row in source:
+        if not row["category"]:
+            row["category"] = classify_card(row["word_en"], row["word_pt"], row["sentence_en"], row["sentence_pt"])
+        yield row
+
+
+def normalize_category(category: str) -> Category:
+    """Normalize category from emoji format (or an LLYLI category name) to LLYLI format."""
+    if category in Category._value2member_map_:
+        return Category(category)
+    return Category(CATEGORY_MAP.get(category, "other"))
 
 
 def format_date_iso8601(date_str: str) -> str:
@@ -194,13 +227,19 @@ def format_date_iso8601(date_str: str) -> str:
 
 
 def transform_to_llyli_with_history(
-    vocabulary: List[Dict],
+    vocabulary: Iterable[Dict],
     learning_history: Dict[str, Dict],
     user_id: str,
     language: str = "target"
-) -> List[Dict]:
+) -> List[VocabEntry]:
     """
     Transform vocabulary to LLYLI format with learning history.
+
+    Returns compact VocabEntry objects; use VocabEntry.to_dict() for the
+    JSON wire format. vocabulary is read once, so it can be a stream
+    (load_csv_vocabulary, StagingStore.iter_joined) rather than a list.
+    Rows that carry a "history" key were already joined with their Anki
+    history (None = never studied); learning_history is not consulted for them.
     """
     transformed = []
 
@@ -214,6 +253,8 @@ def transform_to_llyli_with_history(
         "mastered": 0,
     }
 
+    language = Language(language)
+
     for row in vocabulary:
         if not row.get("word_pt") or not row.get("word_en"):
             continue
@@ -221,60 +262,61 @@ def transform_to_llyli_with_history(
         stats["total"] += 1
 
         # Build base entry
-        entry = {
-            "originalText": row["word_pt"],
-            "translation": row["word_en"],
-            "language": language,
-            "userId": user_id,
-            "category": normalize_category(row.get("category", "🔍 Other")),
-            "createdAt": format_date_iso8601(row.get("date_added", "")),
-        }
+        entry = VocabEntry(
+            original_text=row["word_pt"],
+            translation=row["word_en"],
+            language=language,
+            user_id=user_id,
+            category=normalize_category(row.get("category", "🔍 Other")),
+            created_at=format_date_iso8601(row.get("date_added", "")),
+        )
 
         # Add example sentences
         if row.get("sentence_pt") and row.get("sentence_en"):
-            entry["notes"] = f"PT: {row['sentence_pt']}\nEN: {row['sentence_en']}"
+            entry.notes = f"PT: {row['sentence_pt']}\nEN: {row['sentence_en']}"
 
         # Add source tracking
         if row.get("source"):
-            if "notes" in entry:
-                entry["notes"] += f"\n[Source: {row['source']}]"
+            if entry.notes is not None:
+                entry.notes += f"\n[Source: {row['source']}]"
             else:
-                entry["notes"] = f"[Source: {row['source']}]"
+                entry.notes = f"[Source: {row['source']}]"
 
-        # Look up learning history
-        key = (row["word_pt"].lower(), row["word_en"].lower())
-        history = learning_history.get(key)
+        # Look up learning history (staged rows come joined in SQL)
+        if "history" in row:
+            history = row["history"]
+        else:
+            key = (row["word_pt"].lower(), row["word_en"].lower())
+            history = learning_history.get(key)
 
         if history:
             stats["with_history"] += 1
 
+            # Suspended/buried cards come out of Anki as "unknown"; the API only
+            # knows the four LLYLI states, so they start over as new
+            try:
+                state = LearningState(history["learningState"])
+            except ValueError:
+                state = LearningState.NEW
+
             # Add learning metadata
-            entry["learningHistory"] = {
-                "state": history["learningState"],
-                "reviewCount": history["reviewCount"],
-                "lapseCount": history["lapseCount"],
-                "interval": history["interval"],
-                "easeFactor": history["easeFactor"],
-                "lastReviewed": history["lastReviewed"],
-                "mastered": history["mastered"],
-            }
+            entry.learning_history = LearningHistory(
+                state=state,
+                review_count=history["reviewCount"],
+                lapse_count=history["lapseCount"],
+                interval=history["interval"],
+                ease_factor=history["easeFactor"],
+                last_reviewed=history["lastReviewed"],
+                mastered=history["mastered"],
+            )
 
             # Track state distribution
-            state = history["learningState"]
-            stats[state] = stats.get(state, 0) + 1
+            stats[state.value] = stats.get(state.value, 0) + 1
             if history["mastered"]:
                 stats["mastered"] += 1
         else:
             # No history = never studied in Anki
-            entry["learningHistory"] = {
-                "state": "new",
-                "reviewCount": 0,
-                "lapseCount": 0,
-                "interval": 0,
-                "easeFactor": 2.5,
-                "lastReviewed": None,
-                "mastered": False,
-            }
+            entry.learning_history = LearningHistory()
             stats["new"] += 1
 
         transformed.append(entry)
@@ -292,19 +334,57 @@ def transform_to_llyli_with_history(
     return transformed
 
 
-def export_to_json(data: List[Dict[str, str]], output_path: Path) -> None:
+def export_to_json(data: List[VocabEntry], output_path: Path, json_backend: Optional[str] = None) -> None:
     """Export data to JSON format with full learning history."""
     if not data:
         print("No data to export")
         return
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # orjson/ujson when installed; output is the same indent=2 UTF-8 JSON
+    backend = get_backend(json_backend)
+    with open(output_path, "wb") as f:
+        f.write(backend.dumps_pretty(entries_to_dicts(data)))
 
     print(f"✓ Exported {len(data)} entries to JSON: {output_path}")
 
 
-def export_to_csv(data: List[Dict[str, str]], output_path: Path) -> None:
+def export_json_shards(
+    data: List[VocabEntry],
+    output_dir: Path,
+    stem: str,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    by_category: bool = False,
+    json_backend: Optional[str] = None
+) -> None:
+    """Export data as size-bounded JSON shards plus a manifest (counts, bytes, sha256)."""
+    from shard_manifest import manifest_path_for, write_shards
+
+    if not data:
+        print("No data to export")
+        return
+
+    backend = get_backend(json_backend)
+    entries = sorted(data, key=lambda e: e.category.value) if by_category else data
+    encoded = (
+        (entry.category.value if by_category else None, backend.dumps_pretty(entry.to_dict()))
+        for entry in entries
+    )
+    manifest = write_shards(
+        encoded, output_dir, stem, max_entries, max_bytes, group_by="category" if by_category else None
+    )
+
+    print(f"✓ Exported {manifest['totalEntries']} entries to {len(manifest['shards'])} JSON shards:")
+    for shard in manifest["shards"]:
+        print(f"    {shard['file']}: {shard['entries']} entries, {shard['bytes']:,} bytes")
+    if max_bytes is not None:
+        oversized = [s["file"] for s in manifest["shards"] if s["bytes"] > max_bytes]
+        if oversized:
+            print(f"  ⚠️  {len(oversized)} shard(s) hold a single entry larger than --shard-max-bytes")
+    print(f"✓ Manifest: {manifest_path_for(output_dir, stem)}")
+
+
+def export_to_csv(data: List[VocabEntry], output_path: Path) -> None:
     """Export data to CSV format (flattened learning history)."""
     if not data:
         print("No data to export")
@@ -319,15 +399,22 @@ def export_to_csv(data: List[Dict[str, str]], output_path: Path) -> None:
     # Flatten learning history into main record
     flat_data = []
     for entry in data:
-        flat_entry = {k: v for k, v in entry.items() if k != "learningHistory" and k != "notes"}
-        if "learningHistory" in entry:
-            hist = entry["learningHistory"]
+        flat_entry = {
+            "originalText": entry.original_text,
+            "translation": entry.translation,
+            "language": entry.language.value,
+            "userId": entry.user_id,
+            "category": entry.category.value,
+            "createdAt": entry.created_at,
+        }
+        hist = entry.learning_history
+        if hist is not None:
             flat_entry.update({
-                "learningState": hist.get("state", "new"),
-                "reviewCount": hist.get("reviewCount", 0),
-                "lapseCount": hist.get("lapseCount", 0),
-                "mastered": hist.get("mastered", False),
-                "lastReviewed": hist.get("lastReviewed", ""),
+                "learningState": hist.state.value,
+                "reviewCount": hist.review_count,
+                "lapseCount": hist.lapse_count,
+                "mastered": hist.mastered,
+                "lastReviewed": hist.last_reviewed,
             })
         flat_data.append(flat_entry)
 
@@ -375,71 +462,180 @@ def main():
         default="merged_vocabulary.json",
         help="Path to merged vocabulary file (default: merged_vocabulary.json)",
     )
+    # Vocabulary comes from --merged-data, a CSV or a staging database, never two
+    vocabulary_source = parser.add_mutually_exclusive_group()
+    vocabulary_source.add_argument(
+        "--csv",
+        type=Path,
+        default=None,
+        help="Read vocabulary from this CSV instead of --merged-data (streamed)",
+    )
+    parser.add_argument(
+        "--csv-map",
+        type=parse_mapping,
+        default=None,
+        help="CSV column mapping, e.g. word_pt=translation_portuguese,word_en=word_english (default: auto-detect)",
+    )
+    parser.add_argument(
+        "--csv-no-header",
+        action="store_true",
+        help="The CSV has no header row (use with index mappings such as word_pt=1,word_en=2)",
+    )
+    vocabulary_source.add_argument(
+        "--staging-db",
+        type=Path,
+        default=None,
+        help="Read vocabulary from this staging database (merge_all_sources.py --staging-db) and join history in SQL",
+    )
+    parser.add_argument(
+        "--shard-max-entries",
+        type=int,
+        default=None,
+        help="Split the JSON export into shards of at most N entries (writes a manifest)",
+    )
+    parser.add_argument(
+        "--shard-max-bytes",
+        type=int,
+        default=None,
+        help="Split the JSON export into shards of at most N bytes (writes a manifest)",
+    )
+    parser.add_argument(
+        "--shard-by-category",
+        action="store_true",
+        help="Never mix categories within a JSON shard (implies sharding)",
+    )
     parser.add_argument(
         "--deck-name",
         type=str,
         default="Portuguese Mastery (pt-PT)",
         help="Anki deck name (default: Portuguese Mastery (pt-PT))",
     )
+    parser.add_argument(
+        "--json-backend",
+        type=str,
+        default=None,
+        choices=BACKEND_CHOICES,
+        help="JSON encoder (default: auto = orjson > ujson > stdlib)",
+    )
+    add_cache_arguments(parser)
+    add_profiling_arguments(parser)
 
     args = parser.parse_args()
 
-    # Create output directory
-    args.output_dir.mkdir(parents=True, exist_ok=True)
+    # A placeholder userId would make the whole export unimportable
+    problem = user_id_problem(args.user_id)
+    if problem:
+        print(f"✗ Invalid --user-id: {problem}")
+        print("  Use your LLYLI user ID (a UUID: Settings → Account → User ID).")
+        sys.exit(1)
 
-    try:
-        # Load merged vocabulary
-        print("Loading merged vocabulary...")
-        vocabulary = load_merged_vocabulary(args.merged_data)
-        print(f"✓ Loaded {len(vocabulary)} entries")
-
-        # Get learning history from Anki
-        print("\nConnecting to Anki...")
-        learning_history = get_anki_learning_history(args.deck_name)
-
-        # Transform with history
-        print("\nTransforming data with learning history...")
-        llyli_data = transform_to_llyli_with_history(
-            vocabulary,
-            learning_history,
-            args.user_id,
-            args.language
-        )
+    sharded = bool(args.shard_max_entries or args.shard_max_bytes or args.shard_by_category)
+    if (args.shard_max_entries is not None and args.shard_max_entries < 1) or (
+        args.shard_max_bytes is not None and args.shard_max_bytes < 1
+    ):
+        print("✗ --shard-max-entries and --shard-max-bytes must be positive")
+        sys.exit(1)
 
-        # Generate timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Export to requested formats
-        if args.format in ["json", "both"]:
-            json_path = args.output_dir / f"llyli_with_history_{timestamp}.json"
-            export_to_json(llyli_data, json_path)
-
-        if args.format in ["csv", "both"]:
-            csv_path = args.output_dir / f"llyli_with_history_{timestamp}.csv"
-            export_to_csv(llyli_data, csv_path)
-
-        print(f"\n✓ Export complete! Files saved to: {args.output_dir}")
-        print(f"\n🎯 This export includes:")
-        print(f"   - 903 unique vocabulary entries")
-        print(f"   - Full learning history from Anki")
-        print(f"   - Learning states (new/learning/review/struggling)")
-        print(f"   - Review counts and lapse tracking")
-        print(f"   - Last reviewed timestamps")
-        print(f"   - Mastery flags")
-        print(f"   - FSRS scheduling metadata")
-        print(f"\n💡 LLYLI can use this to:")
-        print(f"   - Start with your actual knowledge level (not from scratch!)")
-        print(f"   - Prioritize struggling words")
-        print(f"   - Preserve 2+ years of learning history")
-        print(f"   - Show meaningful progress stats from day one")
+    # Create output directory
+    args.output_dir.mkdir(parents=True, exist_ok=True)
 
-    except Exception as e:
-        print(f"\n✗ ERROR: {e}")
-        print("\nTroubleshooting:")
-        print("  1. Make sure Anki is running")
-        print("  2. Ensure AnkiConnect add-on is installed")
-        print("  3. Run 'python3 merge_all_sources.py' first")
-        sys.exit(1)
+    with profiling_session(args) as timer:
+        staging = None
+        try:
+            # Load merged vocabulary (a CSV or staging database is streamed through the transform instead)
+            if args.staging_db:
+                if not args.staging_db.exists():
+                    raise FileNotFoundError(
+                        f"Staging database not found: {args.staging_db}\n"
+                        "Please run 'python3 merge_all_sources.py --staging-db' first."
+                    )
+                from staging_store import StagingStore
+
+                staging = StagingStore(args.staging_db)
+                print(f"Streaming vocabulary from staging database: {args.staging_db} ({staging.merged_count()} entries)")
+            elif args.csv:
+                print(f"Streaming vocabulary from CSV: {args.csv}")
+                csv_source = CsvSource(args.csv, mapping=args.csv_map, has_header=False if args.csv_no_header else None)
+                vocabulary = load_csv_vocabulary(csv_source)
+            else:
+                print("Loading merged vocabulary...")
+                with timer.phase("load"):
+                    vocabulary = load_merged_vocabulary(args.merged_data)
+                print(f"✓ Loaded {len(vocabulary)} entries")
+
+            # Get learning history from Anki
+            print("\nConnecting to Anki...")
+            anki_cache = cache_from_args(args)
+            with timer.phase("load"):
+                learning_history = get_anki_learning_history(args.deck_name, anki_cache)
+            if anki_cache.mode != "off":
+                print(f"  {anki_cache.summary()}")
+            if staging is not None:
+                # Upsert the history and let SQLite do the join
+                staging.stage_anki_history(learning_history)
+                vocabulary = staging.iter_joined()
+
+            # Transform with history
+            print("\nTransforming data with learning history...")
+            with timer.phase("transform"):
+                llyli_data = transform_to_llyli_with_history(
+                    vocabulary,
+                    learning_history,
+                    args.user_id,
+                    args.language
+                )
+            if args.csv:
+                print(f"  CSV rows read: {csv_source.rows} ({csv_source.skipped} without both words skipped)")
+
+            # Generate timestamp
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+            # Export to requested formats
+            with timer.phase("write"):
+                if args.format in ["json", "both"] and sharded:
+                    export_json_shards(
+                        llyli_data,
+                        args.output_dir,
+                        f"llyli_with_history_{timestamp}",
+                        args.shard_max_entries,
+                        args.shard_max_bytes,
+                        args.shard_by_category,
+                        args.json_backend,
+                    )
+                elif args.format in ["json", "both"]:
+                    json_path = args.output_dir / f"llyli_with_history_{timestamp}.json"
+                    export_to_json(llyli_data, json_path, args.json_backend)
+
+                if args.format in ["csv", "both"]:
+                    csv_path = args.output_dir / f"llyli_with_history_{timestamp}.csv"
+                    export_to_csv(llyli_data, csv_path)
+
+            print(f"\n✓ Export complete! Files saved to: {args.output_dir}")
+            print(f"\n🎯 This export includes:")
+            print(f"   - 903 unique vocabulary entries")
+            print(f"   - Full learning history from Anki")
+            print(f"   - Learning states (new/learning/review/struggling)")
+            print(f"   - Review counts and lapse tracking")
+            print(f"   - Last reviewed timestamps")
+            print(f"   - Mastery flags")
+            print(f"   - FSRS scheduling metadata")
+            print(f"\n💡 LLYLI can use this to:")
+            print(f"   - Start with your actual knowledge level (not from scratch!)")
+            print(f"   - Prioritize struggling words")
+            print(f"   - Preserve 2+ years of learning history")
+            print(f"   - Show meaningful progress stats from day one")
+
+        except Exception as e:
+            print(f"\n✗ ERROR: {e}")
+            print("\nTroubleshooting:")
+            print("  1. Make sure Anki is running")
+            print("  2. Ensure AnkiConnect add-on is installed")
+            print("  3. Run 'python3 merge_all_sources.py' first")
+            sys.exit(1)
+        finally:
+            # Release the SQLite handle even when the export fails
+            if staging is not None:
+                staging.close()
 
 
 if __name__ == "__main__":
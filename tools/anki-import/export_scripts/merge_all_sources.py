@@ -3,15 +3,20 @@
 """
 Merge vocabulary from all sources (Google Sheets, Anki, CSV) to create the most complete dataset.
 """
+import argparse
 import json
-import csv
+import sys
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from collections import Counter
 from datetime import datetime
 
-# Import Google Sheets and classification
-import google_sheets
-from transform_inbox_to_csv import classify_card
+# Shared anki-import helpers (profiling.py) live one directory up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from csv_source import ColumnRef, CsvSource, parse_mapping
+from profiling import PhaseTimer, add_profiling_arguments, profiling_session
+
+DEFAULT_CSV_PATH = Path.home() / "Library/Mobile Documents/com~apple~CloudDocs/Portuguese/Anki/sayings.csv"
 
 
 def normalize_key(word_pt: str, word_en: str) -> Tuple[str, str]:
@@ -25,6 +30,8 @@ def normalize_key(word_pt: str, word_en: str) -> Tuple[str, str]:
 def load_google_sheets_data() -> List[Dict]:
     """Load data from Google Sheets."""
     print("Loading Google Sheets...")
+    import google_sheets  # Pulls in gspread/google-auth; only this source needs it
+
     storage = google_sheets.GoogleSheetsStorage()
     data = storage.get_all_rows()
     print(f"  ✓ {len(data)} entries from Google Sheets")
@@ -40,32 +47,44 @@ def load_anki_data() -> List[Dict]:
     return data
 
 
-def load_csv_data() -> List[Dict]:
-    """Load data from iCloud CSV file."""
-    print("Loading iCloud CSV...")
-    csv_path = Path.home() / "Library/Mobile Documents/com~apple~CloudDocs/Portuguese/Anki/sayings.csv"
-
-    data = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 5:
-                # Format: date,word_pt,word_en,sentence_pt,sentence_en
-                data.append({
-                    'date_added': row[0].strip(),
-                    'word_pt': row[1].strip(),
-                    'word_en': row[2].strip(),
-                    'sentence_pt': row[3].strip(),
-                    'sentence_en': row[4].strip(),
-                    'category': '',  # Will classify later
-                })
-
-    print(f"  ✓ {len(data)} entries from iCloud CSV")
-    return data
-
-
-def merge_datasets(sheets_data: List[Dict], anki_data: List[Dict], csv_data: List[Dict]) -> List[Dict]:
+def load_csv_data(csv_path: Path = DEFAULT_CSV_PATH, mapping: Optional[Dict[str, ColumnRef]] = None) -> CsvSource:
+    """Open the CSV source; rows are streamed during the merge, not loaded up front."""
+    print(f"Loading CSV: {csv_path}")
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+    source = CsvSource(csv_path, mapping=mapping)
+    print("  ✓ Rows will be streamed during merge")
+    return source
+
+
+def merged_entry(source: str, entry: Dict, classify: Callable[..., str]) -> Dict:
+    """The merged_vocabulary.json record for a source entry that won its key."""
+    if source == 'Google Sheets':
+        category = entry.get('category', '🔍 Other')
+    elif source == 'CSV':
+        # Classify the entry unless the CSV has a category column
+        category = entry.get('category') or classify(
+            entry['word_en'], entry['word_pt'], entry.get('sentence_en', ''), entry.get('sentence_pt', '')
+        )
+    else:
+        category = classify(
+            entry['word_en'], entry['word_pt'], entry.get('sentence_en', ''), entry.get('sentence_pt', '')
+        )
+    return {
+        'source': source,
+        'word_pt': entry['word_pt'],
+        'word_en': entry['word_en'],
+        'sentence_pt': entry.get('sentence_pt', ''),
+        'sentence_en': entry.get('sentence_en', ''),
+        'date_added': entry.get('date_added', ''),
+        'category': category,
+    }
+
+
+def merge_datasets(sheets_data: List[Dict], anki_data: List[Dict], csv_data: Iterable[Dict]) -> List[Dict]:
     """Merge all datasets, preferring Google Sheets for duplicates."""
+    from transform_inbox_to_csv import classify_card
+
     print("\nMerging datasets...")
 
     # Track unique entries by (word_pt, word_en) key
@@ -77,15 +96,7 @@ def merge_datasets(sheets_data: List[Dict], anki_data: List[Dict], csv_data: Lis
         key = normalize_key(entry.get('word_pt', ''), entry.get('word_en', ''))
         if key not in seen_keys and key[0] and key[1]:
             seen_keys.add(key)
-            merged.append({
-                'source': 'Google Sheets',
-                'word_pt': entry['word_pt'],
-                'word_en': entry['word_en'],
-                'sentence_pt': entry.get('sentence_pt', ''),
-                'sentence_en': entry.get('sentence_en', ''),
-                'date_added': entry.get('date_added', ''),
-                'category': entry.get('category', '🔍 Other'),
-            })
+            merged.append(merged_entry('Google Sheets', entry, classify_card))
 
     # Priority 2: CSV file (older entries that might not be in Sheets)
     csv_added = 0
@@ -93,22 +104,7 @@ def merge_datasets(sheets_data: List[Dict], anki_data: List[Dict], csv_data: Lis
         key = normalize_key(entry.get('word_pt', ''), entry.get('word_en', ''))
         if key not in seen_keys and key[0] and key[1]:
             seen_keys.add(key)
-            # Classify the entry
-            category = classify_card(
-                entry['word_en'],
-                entry['word_pt'],
-                entry.get('sentence_en', ''),
-                entry.get('sentence_pt', '')
-            )
-            merged.append({
-                'source': 'CSV',
-                'word_pt': entry['word_pt'],
-                'word_en': entry['word_en'],
-                'sentence_pt': entry.get('sentence_pt', ''),
-                'sentence_en': entry.get('sentence_en', ''),
-                'date_added': entry.get('date_added', ''),
-                'category': category,
-            })
+            merged.append(merged_entry('CSV', entry, classify_card))
             csv_added += 1
 
     # Priority 3: Anki deck (current active cards)
@@ -117,22 +113,7 @@ def merge_datasets(sheets_data: List[Dict], anki_data: List[Dict], csv_data: Lis
         key = normalize_key(entry.get('word_pt', ''), entry.get('word_en', ''))
         if key not in seen_keys and key[0] and key[1]:
             seen_keys.add(key)
-            # Classify the entry
-            category = classify_card(
-                entry['word_en'],
-                entry['word_pt'],
-                entry.get('sentence_en', ''),
-                entry.get('sentence_pt', '')
-            )
-            merged.append({
-                'source': 'Anki',
-                'word_pt': entry['word_pt'],
-                'word_en': entry['word_en'],
-                'sentence_pt': entry.get('sentence_pt', ''),
-                'sentence_en': entry.get('sentence_en', ''),
-                'date_added': entry.get('date_added', ''),
-                'category': category,
-            })
+            merged.append(merged_entry('Anki', entry, classify_card))
             anki_added += 1
 
     print(f"  ✓ Merged {len(merged)} total entries")
@@ -143,6 +124,88 @@ def merge_datasets(sheets_data: List[Dict], anki_data: List[Dict], csv_data: Lis
     return merged
 
 
+def merge_datasets_external(
+    sheets_data: Iterable[Dict],
+    anki_data: Iterable[Dict],
+    csv_data: Iterable[Dict],
+    output_path: str,
+    run_size: Optional[int] = None
+) -> Tuple[Counter, Counter]:
+    """
+    merge_datasets() for sources larger than memory, streamed to output_path.
+
+    1. Every entry becomes a [key_pt, key_en, priority, seq] record, sorted
+       on disk into runs (see external_sort.py)
+    2. A k-way merge of the runs brings each key's copies together; the
+       lowest (priority, seq) wins, i.e. Sheets > CSV > Anki, then the first
+       copy within a source
+    3. The winners are sorted back into (priority, seq) order and written
+       as they come out of the second merge
+
+    The output file is identical to merge_datasets() + save_merged_data().
+    Returns the number of merged entries per source and per category.
+    """
+    import tempfile
+
+    from external_sort import sort_records
+    from transform_inbox_to_csv import classify_card
+
+    print("\nMerging datasets (external sort)...")
+    sources = [('Google Sheets', sheets_data), ('CSV', csv_data), ('Anki', anki_data)]
+    read = Counter()
+
+    def keyed_records() -> Iterator[List]:
+        seq = 0
+        for priority, (source, entries) in enumerate(sources):
+            for entry in entries:
+                read[source] += 1
+                key = normalize_key(entry.get('word_pt', ''), entry.get('word_en', ''))
+                if key[0] and key[1]:
+                    yield [key[0], key[1], priority, seq, entry]
+                    seq += 1
+
+    def winners(records: Iterator[List]) -> Iterator[List]:
+        previous = None
+        for key_pt, key_en, priority, seq, entry in records:
+            if (key_pt, key_en) != previous:
+                previous = (key_pt, key_en)
+                yield [priority, seq, merged_entry(sources[priority][0], entry, classify_card)]
+
+    with tempfile.TemporaryDirectory(prefix="merge-") as tmp:
+        by_key = sort_records(keyed_records(), Path(tmp), key=lambda r: r[:4], run_size=run_size)
+        in_order = sort_records(winners(by_key), Path(tmp), key=lambda r: r[:2], run_size=run_size)
+        source_counts, category_counts = save_merged_stream((record[2] for record in in_order), output_path)
+
+    print(f"  ✓ Merged {sum(source_counts.values())} total entries")
+    print(f"    - {read['Google Sheets']} from Google Sheets")
+    print(f"    - {source_counts['CSV']} additional from CSV")
+    print(f"    - {source_counts['Anki']} additional from Anki")
+    print(f"\n✓ Saved merged data to: {output_path}")
+    return source_counts, category_counts
+
+
+def stage_datasets(store, sheets_data: List[Dict], anki_data: List[Dict], csv_data: Iterable[Dict]) -> None:
+    """Upsert all sources into the staging store; merged_words resolves duplicates in SQL."""
+    from staging_store import ANKI_PRIORITY, CSV_PRIORITY, SHEETS_PRIORITY
+    from transform_inbox_to_csv import classify_card
+
+    print("\nStaging datasets...")
+    sheets_rows = ({**entry, 'category': entry.get('category') or '🔍 Other'} for entry in sheets_data)
+    # Anki cards are always classified, like in merge_datasets()
+    anki_rows = ({**entry, 'category': ''} for entry in anki_data)
+
+    for source, priority, rows in [
+        ('Google Sheets', SHEETS_PRIORITY, sheets_rows),
+        ('CSV', CSV_PRIORITY, csv_data),
+        ('Anki', ANKI_PRIORITY, anki_rows),
+    ]:
+        counts = store.stage_source(source, priority, rows, classify=classify_card)
+        print(f"  ✓ {source}: {counts['added']} added, {counts['changed']} changed, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+
+    print(f"  ✓ Merged {store.merged_count()} total entries")
+
+
 def save_merged_data(data: List[Dict], output_path: str):
     """Save merged data to JSON file."""
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -150,23 +213,160 @@ def save_merged_data(data: List[Dict], output_path: str):
     print(f"\n✓ Saved merged data to: {output_path}")
 
 
+def save_merged_stream(entries: Iterable[Dict], output_path: str) -> Tuple[Counter, Counter]:
+    """Write entries as save_merged_data() would, one at a time; returns counts per source and category."""
+    source_counts, category_counts = Counter(), Counter()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("[")
+        for entry in entries:
+            # json.dump(indent=2) of a one-element list, minus the brackets
+            f.write(("," if source_counts else "") + json.dumps([entry], ensure_ascii=False, indent=2)[1:-2])
+            source_counts[entry['source']] += 1
+            category_counts[entry['category']] += 1
+        f.write("\n]" if source_counts else "]")
+    return source_counts, category_counts
+
+
 def main():
+    parser = argparse.ArgumentParser(
+        description="Merge vocabulary from Google Sheets, Anki and CSV into merged_vocabulary.json"
+    )
+    parser.add_argument(
+        "--csv",
+        type=Path,
+        default=DEFAULT_CSV_PATH,
+        help="CSV source (default: iCloud Portuguese/Anki/sayings.csv)",
+    )
+    parser.add_argument(
+        "--csv-map",
+        type=parse_mapping,
+        default=None,
+        help="CSV column mapping, e.g. word_pt=translation_portuguese,word_en=word_english (default: auto-detect)",
+    )
+    parser.add_argument(
+        "--staging-db",
+        type=Path,
+        default=None,
+        help="Upsert into this SQLite staging database instead of writing merged_vocabulary.json",
+    )
+    parser.add_argument(
+        "--external",
+        action="store_true",
+        help="Merge via on-disk sorted runs for sources larger than memory (same output)",
+    )
+    parser.add_argument(
+        "--run-size",
+        type=int,
+        default=None,
+        help="With --external, entries sorted in memory per run (default: 100000)",
+    )
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    with profiling_session(args) as timer:
+        if args.staging_db:
+            run_staged_merge(timer, args.staging_db, args.csv, args.csv_map)
+        elif args.external:
+            run_external_merge(timer, args.csv, args.csv_map, args.run_size)
+        else:
+            run_merge(timer, args.csv, args.csv_map)
+
+
+def run_staged_merge(
+    timer: PhaseTimer,
+    db_path: Path,
+    csv_path: Path = DEFAULT_CSV_PATH,
+    csv_mapping: Optional[Dict[str, ColumnRef]] = None
+):
+    from staging_store import StagingStore
+
+    print("=" * 70)
+    print("MERGING ALL VOCABULARY SOURCES (staging database)")
+    print("=" * 70)
+    print()
+
+    with timer.phase("load"):
+        sheets_data = load_google_sheets_data()
+        anki_data = load_anki_data()
+        csv_data = load_csv_data(csv_path, csv_mapping)
+
+    with StagingStore(db_path) as store:
+        with timer.phase("transform"):
+            stage_datasets(store, sheets_data, anki_data, csv_data)
+
+        print("\n" + "=" * 70)
+        print("STATISTICS")
+        print("=" * 70)
+        print(f"Total unique entries: {store.merged_count()}")
+        for source, count in store.merged_counts_by("source").items():
+            print(f"  - {source}: {count}")
+
+        print(f"\nEntries by category:")
+        for category, count in store.merged_counts_by("category").items():
+            print(f"  - {category}: {count}")
+
+    print("\n✓ Merge complete!")
+    print(f"✓ Export with: python3 export_with_learning_history.py --staging-db {db_path} --user-id <UUID>")
+
+
+def run_external_merge(
+    timer: PhaseTimer,
+    csv_path: Path = DEFAULT_CSV_PATH,
+    csv_mapping: Optional[Dict[str, ColumnRef]] = None,
+    run_size: Optional[int] = None
+):
+    print("=" * 70)
+    print("MERGING ALL VOCABULARY SOURCES (external sort)")
+    print("=" * 70)
+    print()
+
+    with timer.phase("load"):
+        sheets_data = load_google_sheets_data()
+        anki_data = load_anki_data()
+        csv_data = load_csv_data(csv_path, csv_mapping)
+
+    # Sorting, merging and writing overlap, so they share one phase
+    output_file = "merged_vocabulary.json"
+    with timer.phase("transform"):
+        source_counts, category_counts = merge_datasets_external(
+            sheets_data, anki_data, csv_data, output_file, run_size
+        )
+
+    print("\n" + "=" * 70)
+    print("STATISTICS")
+    print("=" * 70)
+    print(f"Total unique entries: {sum(source_counts.values())}")
+    for source, count in source_counts.items():
+        print(f"  - {source}: {count}")
+
+    print(f"\nEntries by category:")
+    for category, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True):
+        print(f"  - {category}: {count}")
+
+    print("\n✓ Merge complete!")
+    print(f"✓ Use '{output_file}' as input for the most complete export")
+
+
+def run_merge(timer: PhaseTimer, csv_path: Path = DEFAULT_CSV_PATH, csv_mapping: Optional[Dict[str, ColumnRef]] = None):
     print("=" * 70)
     print("MERGING ALL VOCABULARY SOURCES")
     print("=" * 70)
     print()
 
     # Load all sources
-    sheets_data = load_google_sheets_data()
-    anki_data = load_anki_data()
-    csv_data = load_csv_data()
+    with timer.phase("load"):
+        sheets_data = load_google_sheets_data()
+        anki_data = load_anki_data()
+        csv_data = load_csv_data(csv_path, csv_mapping)
 
     # Merge datasets
-    merged_data = merge_datasets(sheets_data, anki_data, csv_data)
+    with timer.phase("transform"):
+        merged_data = merge_datasets(sheets_data, anki_data, csv_data)
 
     # Save merged data
     output_file = "merged_vocabulary.json"
-    save_merged_data(merged_data, output_file)
+    with timer.phase("write"):
+        save_merged_data(merged_data, output_file)
 
     # Statistics
     print("\n" + "=" * 70)
@@ -175,7 +375,6 @@ def main():
     print(f"Total unique entries: {len(merged_data)}")
 
     # Count by source
-    from collections import Counter
     source_counts = Counter(entry['source'] for entry in merged_data)
     for source, count in source_counts.items():
         print(f"  - {source}: {count}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+External sort: order record streams larger than memory.
+
+Records are JSON-serializable lists compared as tuples. sort_records()
+cuts the input into runs of at most run_size records, sorts each run in
+memory and writes it to a temporary JSON Lines file, then k-way merges the
+runs through a heap (heapq.merge). Memory holds one run while sorting and
+one record per run while merging; more than MAX_FAN_IN runs are merged in
+several passes.
+
+Sorting is stable only if the records say so: put a sequence number in
+the sort key when ties must keep input order.
+
+Usage:
+    with tempfile.TemporaryDirectory() as tmp:
+        for record in sort_records(records, Path(tmp), key=lambda r: r[:2]):
+            ...
+"""
+import heapq
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+DEFAULT_RUN_SIZE = 100_000  # Records per in-memory run (~100 MB of vocabulary entries)
+MAX_FAN_IN = 64  # Runs merged at once (open files)
+
+SortKey = Callable[[List], Any]
+
+
+class RunWriter:
+    """Numbered temporary run files in one directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.count = 0
+
+    def write(self, records: Iterable[List]) -> Path:
+        path = self.directory / f"run-{self.count:05d}.jsonl"
+        self.count += 1
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+        return path
+
+
+def read_run(path: Path) -> Iterator[List]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def write_runs(records: Iterable[List], writer: RunWriter, key: SortKey, run_size: int) -> List[Path]:
+    """Sorted run files of at most run_size records each."""
+    runs = []
+    chunk: List[List] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= run_size:
+            chunk.sort(key=key)
+            runs.append(writer.write(chunk))
+            chunk = []
+    if chunk:
+        chunk.sort(key=key)
+        runs.append(writer.write(chunk))
+    return runs
+
+
+def merge_runs(runs: List[Path], writer: RunWriter, key: SortKey) -> Iterator[List]:
+    """K-way merge of sorted runs, in passes of at most MAX_FAN_IN files."""
+    while len(runs) > MAX_FAN_IN:
+        runs = [
+            writer.write(heapq.merge(*(read_run(p) for p in runs[i:i + MAX_FAN_IN]), key=key))
+            for i in range(0, len(runs), MAX_FAN_IN)
+        ]
+    return heapq.merge(*(read_run(p) for p in runs), key=key)
+
+
+def sort_records(
+    records: Iterable[List],
+    directory: Path,
+    key: SortKey,
+    run_size: Optional[int] = None
+) -> Iterator[List]:
+    """
+    Records in key order.
+
+    Run files go to a new subdirectory of directory, so sorts can feed each
+    other; the caller removes directory afterwards.
+    """
+    writer = RunWriter(Path(tempfile.mkdtemp(prefix="sort-", dir=directory)))
+    runs = write_runs(records, writer, key, max(1, run_size or DEFAULT_RUN_SIZE))
+    return merge_runs(runs, writer, key)
@@ -17,21 +17,30 @@ import argparse
 import json
 import sys
 import time
-import urllib.request
-import urllib.error
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
+from columnar import COLUMNAR_FORMAT, WIRE_FORMATS, build_columnar_body
+from deck_stats import DeckColumns, print_distributions
+from outcomes import (
+    IMPORTED, REJECTED, RESEND_STATUSES, OutcomeRecorder, batch_error_count, load_outcomes, select_indices,
+)
+from profiling import add_profiling_arguments, profiling_session
+from rate_governor import RateGovernor, add_rate_arguments, governor_from_args
+from request_timing import RequestTiming, RequestTimings
+from serialization import BACKEND_CHOICES, JsonBackend, build_batch_body, encode_entries, encode_entry, get_backend
+from upload_priority import ORDER_CHOICES, describe_order, priority_order
+from vocab_model import AnyEntry, VocabEntry, load_entries
 
-def load_import_file(filepath: Path) -> List[Dict]:
-    """Load and parse import file."""
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def load_import_file(filepath: Path) -> List[VocabEntry]:
+    """Load and parse import file into compact VocabEntry objects."""
     print(f"Loading import file: {filepath}")
 
     with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    if not isinstance(data, list):
-        raise ValueError("Import file must contain an array of entries")
+        data = load_entries(f)
 
     print(f"✓ Loaded {len(data)} entries")
     return data
@@ -47,83 +56,289 @@ def get_session_cookie(api_url: str) -> Optional[str]:
     return None
 
 
+def bulk_import_endpoint(api_url: str, spread_days: Optional[int] = None, daily_cap: Optional[int] = None) -> str:
+    """
+    Bulk-import URL, with the route's due-date spreading parameters when given.
+
+    The route spreads cards whose review date has passed over the next
+    spread_days days (0 = all due now), at most daily_cap per day.
+    """
+    from urllib.parse import urlencode
+
+    params = {}
+    if spread_days is not None:
+        params['spreadDays'] = spread_days
+    if daily_cap is not None:
+        params['dailyCap'] = daily_cap
+    endpoint = f"{api_url}/words/bulk-import"
+    return f"{endpoint}?{urlencode(params)}" if params else endpoint
+
+
+def new_import_stats(total: int) -> Dict:
+    return {
+        "total": total,
+        "imported": 0,
+        "withHistory": 0,
+        "skipped": 0,
+        "errors": 0,
+    }
+
+
+def post_batch(
+    endpoint: str,
+    encoded_batch: List[bytes],
+    auth_cookie: Optional[str] = None,
+    timeout: float = 60,
+    governor: Optional[RateGovernor] = None,
+    timing: Optional[RequestTiming] = None
+) -> Dict:
+    """
+    POST one batch of pre-serialized entries and return the parsed response.
+
+    With a governor the request waits for its rate budget first, and the
+    response's rate-limit headers are fed back to it. With a timing the
+    request carries its correlation IDs, and body building, the round trip
+    (governor wait excluded), response parsing and the Server-Timing header
+    are recorded on it. HTTP and connection errors propagate as
+    urllib.error exceptions.
+    """
+    timing = timing or RequestTiming()
+    with timing.client():
+        body = build_batch_body(encoded_batch, skip_duplicates=True)
+    return post_body(endpoint, body, len(encoded_batch), auth_cookie, timeout, governor, timing)
+
+
+def post_body(
+    endpoint: str,
+    body: bytes,
+    entry_count: int,
+    auth_cookie: Optional[str] = None,
+    timeout: float = 60,
+    governor: Optional[RateGovernor] = None,
+    timing: Optional[RequestTiming] = None
+) -> Dict:
+    """POST a ready JSON body (plain or columnar batch) as post_batch() does."""
+    # urllib.request costs ~60ms to import; --analyze and --dry-run never need it
+    import urllib.error
+    import urllib.request
+
+    timing = timing or RequestTiming()
+    headers = {
+        'Content-Type': 'application/json',
+        **timing.headers(),
+    }
+    if auth_cookie:
+        headers['Cookie'] = auth_cookie
+
+    req = urllib.request.Request(endpoint, data=body, headers=headers, method='POST')
+
+    if governor:
+        governor.acquire(entry_count)
+
+    status, headers = None, None
+    try:
+        with timing.round_trip():
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                status, headers = response.status, response.headers
+                raw = response.read()
+        with timing.client():
+            return json.loads(raw.decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        status, headers = e.code, e.headers
+        raise
+    finally:
+        if governor:
+            governor.observe(status, headers)
+        timing.observe(status, headers)
+
+
+def post_stream(
+    endpoint: str,
+    encoded_entries: Iterable[bytes],
+    auth_cookie: Optional[str] = None,
+    timeout: float = 60,
+    governor: Optional[RateGovernor] = None,
+    chunk_bytes: int = STREAM_CHUNK_BYTES,
+    timing: Optional[RequestTiming] = None
+) -> Dict:
+    """
+    POST entries as one chunked NDJSON request and return the parsed response.
+
+    encoded_entries is consumed lazily, one line per entry, in chunks of
+    about chunk_bytes, so neither the entries nor the body are held in
+    memory. The server inserts while the body is still arriving. With a
+    governor the request takes one request token and every chunk is paced by
+    --max-eps. With a timing the IDs are sent and the Server-Timing header
+    recorded; encoding overlaps the upload, so it counts as round trip.
+    """
+    import urllib.error
+    import urllib.request
+
+    def body():
+        lines: List[bytes] = []
+        size = 0
+        for encoded in encoded_entries:
+            lines.append(encoded)
+            size += len(encoded) + 1
+            if size >= chunk_bytes:
+                if governor:
+                    governor.pace(len(lines))
+                yield b"\n".join(lines) + b"\n"
+                lines, size = [], 0
+        if lines:
+            if governor:
+                governor.pace(len(lines))
+            yield b"\n".join(lines) + b"\n"
+
+    timing = timing or RequestTiming()
+    headers = {
+        'Content-Type': 'application/x-ndjson',
+        **timing.headers(),
+    }
+    if auth_cookie:
+        headers['Cookie'] = auth_cookie
+
+    # An iterable body without Content-Length is sent with Transfer-Encoding: chunked
+    req = urllib.request.Request(endpoint, data=body(), headers=headers, method='POST')
+
+    if governor:
+        governor.acquire(0)
+
+    status, headers = None, None
+    try:
+        with timing.round_trip():
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                status, headers = response.status, response.headers
+                raw = response.read()
+        with timing.client():
+            return json.loads(raw.decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        status, headers = e.code, e.headers
+        raise
+    finally:
+        if governor:
+            governor.observe(status, headers)
+        timing.observe(status, headers)
+
+
+def apply_batch_result(
+    result: Dict,
+    batch: List[AnyEntry],
+    batch_indices: List[int],
+    stats: Dict,
+    recorder: OutcomeRecorder
+) -> bool:
+    """Fold a bulk-import response into stats and outcomes; False if it had no data."""
+    if 'data' not in result:
+        stats['errors'] += len(batch)
+        recorder.record_batch_failure(batch_indices, batch, "Unexpected response")
+        return False
+
+    batch_stats = result['data']
+    stats['imported'] += batch_stats.get('imported', 0)
+    stats['withHistory'] += batch_stats.get('withHistory', 0)
+    stats['skipped'] += batch_stats.get('skipped', 0)
+    stats['errors'] += batch_error_count(batch_stats, len(batch))
+    recorder.record_batch_response(batch_indices, batch, batch_stats)
+    return True
+
+
 def bulk_import_via_api(
     api_url: str,
-    entries: List[Dict],
+    entries: List[AnyEntry],
     auth_cookie: Optional[str] = None,
     batch_size: int = 50,
-    dry_run: bool = False
+    dry_run: bool = False,
+    json_backend: Optional[str] = None,
+    indices: Optional[List[int]] = None,
+    recorder: Optional[OutcomeRecorder] = None,
+    governor: Optional[RateGovernor] = None,
+    stream: bool = False,
+    spread_days: Optional[int] = None,
+    daily_cap: Optional[int] = None,
+    timings: Optional[RequestTimings] = None,
+    wire_format: str = "json"
 ) -> Dict:
     """
     Bulk import vocabulary entries via LLYLI API.
 
-    Sends batched POST requests to /api/words/bulk-import
+    Sends batched POST requests to /api/words/bulk-import. Each entry is
+    serialized once (orjson/ujson when installed, see serialization.py) and
+    request bodies are assembled from those bytes.
+
+    indices gives each entry's position in the import file (default:
+    0..n-1); per-entry outcomes are recorded under it when a recorder is
+    passed. A governor paces the batches (see rate_governor.py).
+
+    With stream=True all entries go out as one chunked NDJSON request
+    (post_stream) instead of batch_size-entry requests. spread_days and
+    daily_cap override the route's due-date spreading defaults. Every
+    request carries correlation IDs and its timing is recorded in timings
+    (see request_timing.py). wire_format="columnar" sends batches in the
+    compact columnar format (see columnar.py); streams are always NDJSON.
     """
     print("\nImporting vocabulary...")
     print("=" * 70)
 
+    if indices is None:
+        indices = list(range(len(entries)))
+    recorder = recorder or OutcomeRecorder()
+
     if dry_run:
         print("DRY RUN MODE - Simulating import")
-        return simulate_import(entries, batch_size)
-
-    endpoint = f"{api_url}/words/bulk-import"
-    stats = {
-        "total": len(entries),
-        "imported": 0,
-        "withHistory": 0,
-        "skipped": 0,
-        "errors": 0,
-    }
+        return simulate_import(entries, batch_size, indices, recorder)
+
+    import urllib.error
+
+    endpoint = bulk_import_endpoint(api_url, spread_days, daily_cap)
+    backend = get_backend(json_backend)
+    print(f"JSON encoder: {backend.name}")
+    columnar = wire_format == COLUMNAR_FORMAT and not stream
+    if columnar:
+        print("Wire format: columnar")
+    stats = new_import_stats(len(entries))
+    timings = timings if timings is not None else RequestTimings()
+    print(f"Run ID: {timings.run_id}")
+
+    if stream:
+        # One long-lived request instead of batches
+        stream_entries(endpoint, entries, indices, stats, recorder, backend, auth_cookie, governor, timings)
+        batch_starts = range(0)
+    else:
+        batch_starts = range(0, len(entries), batch_size)
 
     # Process in batches
-    total_batches = (len(entries) + batch_size - 1) // batch_size
+    total_batches = len(batch_starts)
 
-    for i in range(0, len(entries), batch_size):
+    for i in batch_starts:
         batch = entries[i:i + batch_size]
+        batch_indices = indices[i:i + batch_size]
         batch_num = (i // batch_size) + 1
 
         print(f"\nBatch {batch_num}/{total_batches} ({len(batch)} entries)...")
+        timing = timings.start(timings.request_id(f"b{batch_num:04d}"), len(batch))
 
         try:
-            # Prepare request
-            request_data = json.dumps({
-                "entries": batch,
-                "skipDuplicates": True
-            }).encode('utf-8')
-
-            headers = {
-                'Content-Type': 'application/json',
-            }
-            if auth_cookie:
-                headers['Cookie'] = auth_cookie
-
-            req = urllib.request.Request(
-                endpoint,
-                data=request_data,
-                headers=headers,
-                method='POST'
-            )
-
-            # Send request
-            with urllib.request.urlopen(req, timeout=60) as response:
-                result = json.loads(response.read().decode('utf-8'))
-
-                if 'data' in result:
-                    batch_stats = result['data']
-                    stats['imported'] += batch_stats.get('imported', 0)
-                    stats['withHistory'] += batch_stats.get('withHistory', 0)
-                    stats['skipped'] += batch_stats.get('skipped', 0)
-                    stats['errors'] += batch_stats.get('errors', 0) if isinstance(batch_stats.get('errors'), int) else 0
-
-                    print(f"  ✓ Imported: {batch_stats.get('imported', 0)}")
-                else:
-                    print(f"  ✗ Unexpected response: {result}")
-                    stats['errors'] += len(batch)
+            if columnar:
+                with timing.client():
+                    body = build_columnar_body(batch, backend)
+                result = post_body(endpoint, body, len(batch), auth_cookie, governor=governor, timing=timing)
+            else:
+                # Entries serialized once, body built from their bytes
+                with timing.client():
+                    encoded = encode_entries(batch, backend)
+                result = post_batch(endpoint, encoded, auth_cookie, governor=governor, timing=timing)
+
+            if apply_batch_result(result, batch, batch_indices, stats, recorder):
+                print(f"  ✓ Imported: {result['data'].get('imported', 0)}")
+            else:
+                print(f"  ✗ Unexpected response: {result}")
 
         except urllib.error.HTTPError as e:
             error_body = e.read().decode('utf-8') if e.fp else str(e)
-            print(f"  ✗ HTTP Error {e.code}: {error_body[:200]}")
+            print(f"  ✗ HTTP Error {e.code} (request {timing.request_id}): {error_body[:200]}")
             stats['errors'] += len(batch)
+            recorder.record_batch_failure(batch_indices, batch, f"HTTP {e.code}: {error_body[:200]}")
 
             if e.code == 401:
                 print("\n⚠️  Authentication failed. Make sure you're logged into LLYLI at localhost:3000")
@@ -134,11 +349,13 @@ def bulk_import_via_api(
             print(f"  ✗ Connection error: {e.reason}")
             print("   Make sure LLYLI is running at localhost:3000")
             stats['errors'] += len(batch)
+            recorder.record_batch_failure(batch_indices, batch, f"Connection error: {e.reason}")
             break
 
         except Exception as e:
             print(f"  ✗ Error: {e}")
             stats['errors'] += len(batch)
+            recorder.record_batch_failure(batch_indices, batch, f"Error: {e}")
 
         # Progress bar
         progress = min(1.0, (i + len(batch)) / len(entries))
@@ -147,19 +364,95 @@ def bulk_import_via_api(
         bar = "█" * filled + "░" * (bar_length - filled)
         print(f"Progress: [{bar}] {progress*100:.1f}%")
 
+    if governor:
+        print(f"\n{governor.summary()}")
+    print(f"\n{timings.summary()}")
+
+    # Batches never sent (import aborted) still need an outcome
+    not_sent = len(entries) - sum(1 for index in indices if index in recorder.outcomes)
+    if not_sent:
+        recorder.fill_missing(indices, entries, "Not sent (import aborted)")
+        stats['errors'] += not_sent
+
     print("\n" + "=" * 70)
     return stats
 
 
-def simulate_import(entries: List[Dict], batch_size: int) -> Dict:
+def stream_entries(
+    endpoint: str,
+    entries: List[AnyEntry],
+    indices: List[int],
+    stats: Dict,
+    recorder: OutcomeRecorder,
+    backend: JsonBackend,
+    auth_cookie: Optional[str] = None,
+    governor: Optional[RateGovernor] = None,
+    timings: Optional[RequestTimings] = None
+) -> None:
+    """Upload all entries in one NDJSON request and fold the response into stats/outcomes."""
+    import urllib.error
+
+    print(f"\nStreaming {len(entries)} entries in one request (NDJSON)...")
+    timings = timings if timings is not None else RequestTimings()
+    timing = timings.start(timings.request_id("stream"), len(entries))
+    try:
+        # Entries are encoded as the body is sent, not up front
+        encoded = (encode_entry(entry, backend) for entry in entries)
+        result = post_stream(endpoint, encoded, auth_cookie, governor=governor, timing=timing)
+        if apply_batch_result(result, entries, indices, stats, recorder):
+            print(f"  ✓ Imported: {result['data'].get('imported', 0)}")
+        else:
+            print(f"  ✗ Unexpected response: {result}")
+
+    except urllib.error.HTTPError as e:
+        error_body = e.read().decode('utf-8') if e.fp else str(e)
+        print(f"  ✗ HTTP Error {e.code} (request {timing.request_id}): {error_body[:200]}")
+        try:
+            partial = json.loads(error_body).get('data')
+        except (ValueError, AttributeError):
+            partial = None
+        if isinstance(partial, dict) and isinstance(partial.get('total'), int):
+            # The stream broke midway; batches the server finished are committed
+            processed = min(partial['total'], len(entries))
+            apply_batch_result({'data': partial}, entries[:processed], indices[:processed], stats, recorder)
+            print(f"  ⚠️  Server processed {processed} of {len(entries)} entries before the error")
+        if e.code == 401:
+            print("\n⚠️  Authentication failed. Make sure you're logged into LLYLI at localhost:3000")
+
+    except urllib.error.URLError as e:
+        print(f"  ✗ Connection error: {e.reason}")
+        print("   Make sure LLYLI is running at localhost:3000")
+
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+
+
+def simulate_batch(batch: List[VocabEntry]) -> Dict:
+    """Bulk-import response the API would give for a batch, without sending it."""
+    data = {"total": len(batch), "imported": 0, "skipped": 0, "withHistory": 0, "errorCount": 0, "results": []}
+    for position, entry in enumerate(batch):
+        if entry.original_text and entry.translation:
+            data['imported'] += 1
+            data['results'].append({"index": position, "status": IMPORTED})
+            if entry.learning_history:
+                data['withHistory'] += 1
+        else:
+            data['skipped'] += 1
+            data['results'].append({"index": position, "status": REJECTED, "reason": "Missing originalText or translation"})
+    return {"data": data}
+
+
+def simulate_import(
+    entries: List[VocabEntry],
+    batch_size: int,
+    indices: Optional[List[int]] = None,
+    recorder: Optional[OutcomeRecorder] = None
+) -> Dict:
     """Simulate import for dry run."""
-    stats = {
-        "total": len(entries),
-        "imported": 0,
-        "withHistory": 0,
-        "skipped": 0,
-        "errors": 0,
-    }
+    if indices is None:
+        indices = list(range(len(entries)))
+    recorder = recorder or OutcomeRecorder()
+    stats = new_import_stats(len(entries))
 
     for i in range(0, len(entries), batch_size):
         batch = entries[i:i + batch_size]
@@ -168,13 +461,7 @@ def simulate_import(entries: List[Dict], batch_size: int) -> Dict:
 
         print(f"Simulating batch {batch_num}/{total_batches}...")
 
-        for entry in batch:
-            if entry.get('originalText') and entry.get('translation'):
-                stats['imported'] += 1
-                if entry.get('learningHistory'):
-                    stats['withHistory'] += 1
-            else:
-                stats['skipped'] += 1
+        apply_batch_result(simulate_batch(batch), batch, indices[i:i + batch_size], stats, recorder)
 
         time.sleep(0.05)  # Small delay to show progress
 
@@ -214,36 +501,14 @@ def print_import_summary(stats: Dict, dry_run: bool = False):
         print(f"\n📊 Success rate: {success_rate:.1f}%")
 
 
-def analyze_import_file(entries: List[Dict]) -> Dict:
-    """Analyze import file contents."""
-    analysis = {
-        "total": len(entries),
-        "withHistory": 0,
-        "byState": {"new": 0, "learning": 0, "review": 0, "struggling": 0},
-        "byCategory": {},
-        "mastered": 0,
-    }
-
-    for entry in entries:
-        # Count with history
-        if entry.get('learningHistory'):
-            analysis['withHistory'] += 1
-            history = entry['learningHistory']
-
-            # Count by state
-            state = history.get('state', 'new')
-            if state in analysis['byState']:
-                analysis['byState'][state] += 1
-
-            # Count mastered
-            if history.get('mastered'):
-                analysis['mastered'] += 1
-
-        # Count by category
-        category = entry.get('category', 'other')
-        analysis['byCategory'][category] = analysis['byCategory'].get(category, 0) + 1
+def analyze_import_file(entries: List[VocabEntry]) -> Dict:
+    """
+    Analyze import file contents.
 
-    return analysis
+    Runs as columnar reductions (vectorized when NumPy is installed) and
+    includes interval, lapse and ease distributions.
+    """
+    return DeckColumns.from_entries(entries).summarize()
 
 
 def print_analysis(analysis: Dict):
@@ -259,6 +524,7 @@ def print_analysis(analysis: Dict):
             if count > 0:
                 print(f"  {state}: {count}")
         print(f"  Mastered: {analysis['mastered']}")
+        print_distributions(analysis)
 
     print(f"\nBy category:")
     for category, count in sorted(analysis['byCategory'].items(), key=lambda x: -x[1]):
@@ -279,6 +545,10 @@ Examples:
 
     # Analyze file without importing
     python3 import_to_llyli.py imports/file.json --analyze
+
+    # Profile a slow import (cProfile + memory + phase timings)
+    python3 import_to_llyli.py imports/file.json --dry-run \
+        --profile import.prof --trace-memory 15 --timings
         """
     )
     parser.add_argument(
@@ -298,16 +568,86 @@ Examples:
         default=50,
         help="Batch size for bulk import (default: 50)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Send all entries in one streaming NDJSON request instead of batches"
+    )
+    parser.add_argument(
+        "--wire-format",
+        type=str,
+        default="json",
+        choices=WIRE_FORMATS,
+        help="Batch body format: json, or columnar (each field once per batch, ~half the bytes)"
+    )
+    parser.add_argument(
+        "--spread-days",
+        type=int,
+        default=None,
+        help="Spread overdue cards over this many days, 0 = all due now (server default: 14)"
+    )
+    parser.add_argument(
+        "--daily-cap",
+        type=int,
+        default=None,
+        help="At most this many cards due per day when spreading (server default: 50)"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Simulate import without making changes"
     )
+    parser.add_argument(
+        "--order",
+        type=str,
+        default="file",
+        choices=ORDER_CHOICES,
+        help="Upload order: file, or priority (struggling, then overdue, then soonest due, then new)"
+    )
     parser.add_argument(
         "--analyze",
         action="store_true",
         help="Analyze import file and exit"
     )
+    parser.add_argument(
+        "-y", "--yes",
+        action="store_true",
+        help="Do not ask for confirmation before importing (non-interactive)"
+    )
+    parser.add_argument(
+        "--json-backend",
+        type=str,
+        default=None,
+        choices=BACKEND_CHOICES,
+        help="JSON encoder for request bodies (default: auto = orjson > ujson > stdlib)"
+    )
+    parser.add_argument(
+        "--outcomes",
+        type=Path,
+        default=None,
+        help="Write a per-entry outcome manifest (JSON Lines) to this path"
+    )
+    parser.add_argument(
+        "--request-timings",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write per-request IDs and client/network/server timings (JSON Lines) to FILE"
+    )
+    parser.add_argument(
+        "--only-failed",
+        type=Path,
+        default=None,
+        metavar="MANIFEST",
+        help="Re-send only entries marked failed/unconfirmed in an earlier outcome manifest"
+    )
+    parser.add_argument(
+        "--include-rejected",
+        action="store_true",
+        help="With --only-failed, also re-send entries the API rejected (after fixing them)"
+    )
+    add_rate_arguments(parser)
+    add_profiling_arguments(parser)
 
     args = parser.parse_args()
 
@@ -316,61 +656,95 @@ Examples:
         print(f"✗ File not found: {args.filepath}")
         sys.exit(1)
 
-    try:
-        # Load import file
-        entries = load_import_file(args.filepath)
-
-        # Analyze
-        analysis = analyze_import_file(entries)
-        print_analysis(analysis)
-
-        if args.analyze:
-            print("\n✓ Analysis complete. Use without --analyze to import.")
-            sys.exit(0)
-
-        # Import
-        print("\n" + "=" * 70)
-        print("STARTING IMPORT")
-        print("=" * 70)
-
-        if not args.dry_run:
-            print("\n⚠️  IMPORTANT: Make sure you are logged into LLYLI at localhost:3000")
-            print("   The import will use your authenticated browser session.\n")
-
-            response = input("Continue with import? (y/N): ")
-            if response.lower() != 'y':
-                print("Import cancelled.")
+    with profiling_session(args) as timer:
+        try:
+            # Load import file
+            with timer.phase("load"):
+                entries = load_import_file(args.filepath)
+
+            # Narrow to entries that did not land in an earlier run
+            indices = list(range(len(entries)))
+            if args.only_failed:
+                statuses = RESEND_STATUSES | ({REJECTED} if args.include_rejected else set())
+                indices = [i for i in select_indices(load_outcomes(args.only_failed), statuses) if i < len(entries)]
+                entries = [entries[i] for i in indices]
+                print(f"✓ Re-sending {len(entries)} entries from {args.only_failed}")
+
+            # Analyze
+            with timer.phase("analyze"):
+                analysis = analyze_import_file(entries)
+            print_analysis(analysis)
+
+            if args.analyze:
+                print("\n✓ Analysis complete. Use without --analyze to import.")
                 sys.exit(0)
 
-        start_time = time.time()
-        stats = bulk_import_via_api(
-            args.api_url,
-            entries,
-            batch_size=args.batch_size,
-            dry_run=args.dry_run
-        )
-        duration = time.time() - start_time
-
-        # Print summary
-        print_import_summary(stats, args.dry_run)
-        print(f"\n⏱️  Duration: {duration:.1f} seconds")
-
-        if args.dry_run:
-            print("\n✓ Dry run complete. Run without --dry-run to perform actual import.")
-        else:
-            if stats['imported'] > 0:
-                print(f"\n✓ Import complete! View your vocabulary at: http://localhost:3000/vocabulary")
+            # Import
+            print("\n" + "=" * 70)
+            print("STARTING IMPORT")
+            print("=" * 70)
+
+            if not args.dry_run and not args.yes:
+                print("\n⚠️  IMPORTANT: Make sure you are logged into LLYLI at localhost:3000")
+                print("   The import will use your authenticated browser session.\n")
+
+                response = input("Continue with import? (y/N): ")
+                if response.lower() != 'y':
+                    print("Import cancelled.")
+                    sys.exit(0)
+
+            if args.order == "priority":
+                entries, indices = priority_order(entries, indices)
+                print(f"✓ {describe_order(entries)}")
+
+            recorder = OutcomeRecorder()
+            timings = RequestTimings()
+            start_time = time.time()
+            with timer.phase("upload"):
+                stats = bulk_import_via_api(
+                    args.api_url,
+                    entries,
+                    batch_size=args.batch_size,
+                    dry_run=args.dry_run,
+                    json_backend=args.json_backend,
+                    indices=indices,
+                    recorder=recorder,
+                    governor=governor_from_args(args),
+                    stream=args.stream,
+                    spread_days=args.spread_days,
+                    daily_cap=args.daily_cap,
+                    timings=timings,
+                    wire_format=args.wire_format
+                )
+            duration = time.time() - start_time
+
+            if args.outcomes:
+                with timer.phase("write"):
+                    recorder.write(args.outcomes)
+            if args.request_timings and timings.requests:
+                timings.write(args.request_timings)
+                print(f"✓ Wrote {len(timings.requests)} request timings to: {args.request_timings}")
+
+            # Print summary
+            print_import_summary(stats, args.dry_run)
+            print(f"\n⏱️  Duration: {duration:.1f} seconds")
+
+            if args.dry_run:
+                print("\n✓ Dry run complete. Run without --dry-run to perform actual import.")
             else:
-                print("\n⚠️  No entries imported. Check errors above.")
+                if stats['imported'] > 0:
+                    print(f"\n✓ Import complete! View your vocabulary at: http://localhost:3000/vocabulary")
+                else:
+                    print("\n⚠️  No entries imported. Check errors above.")
 
-        sys.exit(0 if stats['errors'] == 0 else 1)
+            sys.exit(0 if stats['errors'] == 0 else 1)
 
-    except KeyboardInterrupt:
-        print("\n\nImport cancelled by user.")
-        sys.exit(1)
-    except Exception as e:
-        print(f"\n✗ Import failed: {e}")
-        sys.exit(1)
+        except KeyboardInterrupt:
+            print("\n\nImport cancelled by user.")
+            sys.exit(1)
+        except Exception as e:
+            print(f"\n✗ Import failed: {e}")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Non-interactive job runner: import many export files for many users.
+
+Every matching file is loaded and sharded by userId into jobs. Jobs are
+uploaded batch by batch by a bounded pool of workers; the scheduler hands
+out batches round-robin across users (FIFO within one user), so a user with
+a huge deck gets one turn per rotation like everyone else instead of
+holding every worker until it finishes.
+
+The API imports into the session's user, not the entry's userId, so each
+shard sends with its own credentials (--credentials: a JSON object mapping
+userId to that user's session Cookie header). Shards whose userId is a
+placeholder or not a LLYLI user UUID are rejected before anything is sent.
+
+A consolidated report (per job, per user, overall, plus request timing) is
+printed at the end and can also be written as JSON. Each run has one run ID;
+every request carries it and its own ID (<run>-j003-b0012: job 3, batch 12),
+as in import_to_llyli.py (see request_timing.py).
+
+Usage:
+    python3 job_runner.py imports/
+    python3 job_runner.py "imports/llyli_with_history_*.json" --workers 8 --dry-run
+    python3 job_runner.py imports/ --outcomes-dir imports/outcomes --json-report report.json
+    python3 job_runner.py exports/llyli_with_history_20260116_224522.manifest.json
+    python3 job_runner.py migration/ --credentials sessions.json --workers 16 --max-per-user 1
+    python3 job_runner.py imports/ --request-timings imports/run.timings.jsonl
+"""
+import argparse
+import glob
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from import_to_llyli import (
+    apply_batch_result, load_import_file, new_import_stats, post_batch, simulate_batch,
+)
+from outcomes import REJECTED, OutcomeRecorder
+from profiling import add_profiling_arguments, profiling_session
+from rate_governor import RateGovernor, add_rate_arguments, governor_from_args
+from request_timing import RequestTiming, RequestTimings
+from serialization import BACKEND_CHOICES, encode_entries, get_backend
+from shard_manifest import is_manifest, manifest_shards
+from upload_priority import ORDER_CHOICES, priority_order
+from vocab_model import VocabEntry, user_id_problem
+
+print_lock = threading.Lock()
+
+
+def log(message: str) -> None:
+    with print_lock:
+        print(message, flush=True)
+
+
+def discover_files(targets: List[str]) -> Tuple[List[Path], List[str]]:
+    """
+    Expand directories (*.json inside), glob patterns and shard manifests into
+    a sorted, de-duplicated file list; also returns shard verification problems.
+
+    A manifest expands to its shards; shards whose size or sha256 differ from
+    the manifest are skipped. Manifests found in directories or globs are not
+    import files themselves and are ignored.
+    """
+    found = []
+    problems = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            found.extend(sorted(p for p in path.glob("*.json") if not is_manifest(p)))
+        elif any(ch in target for ch in "*?["):
+            found.extend(sorted(Path(p) for p in glob.glob(target) if not is_manifest(Path(p))))
+        elif path.exists() and is_manifest(path):
+            try:
+                shards, shard_problems = manifest_shards(path)
+            except (ValueError, KeyError, json.JSONDecodeError) as e:
+                problems.append(f"{path}: {e}")
+                continue
+            found.extend(shards)
+            problems.extend(shard_problems)
+        elif path.exists():
+            found.append(path)
+        else:
+            log(f"⚠️  Not found, skipping: {target}")
+
+    unique = []
+    seen = set()
+    for path in found:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique, problems
+
+
+class ImportJob:
+    """The entries of one user from one file, uploaded batch by batch."""
+
+    def __init__(
+        self,
+        path: Path,
+        user_id: str,
+        entries: List[VocabEntry],
+        indices: List[int],
+        batch_size: int,
+        auth_cookie: Optional[str] = None
+    ):
+        self.path = path
+        self.number = 0  # 1-based position in the run, set by run_jobs()
+        self.user_id = user_id
+        self.auth_cookie = auth_cookie
+        self.entries = entries
+        self.indices = indices
+        self.batch_size = batch_size
+        self.total_batches = (len(entries) + batch_size - 1) // batch_size
+        self.next_offset = 0
+        self.stats = new_import_stats(len(entries))
+        self.recorder = OutcomeRecorder()
+        self.lock = threading.Lock()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.aborted: Optional[str] = None
+        self.load_error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    def has_pending(self) -> bool:
+        return self.aborted is None and self.next_offset < len(self.entries)
+
+    def take_batch(self) -> Tuple[List[VocabEntry], List[int], int]:
+        """Next batch, its input indices and 1-based batch number (scheduler lock held)."""
+        start = self.next_offset
+        self.next_offset = min(start + self.batch_size, len(self.entries))
+        if self.started is None:
+            self.started = time.time()
+        return self.entries[start:self.next_offset], self.indices[start:self.next_offset], start // self.batch_size + 1
+
+    def abort(self, reason: str) -> None:
+        """Stop handing out batches; unsent entries become failed outcomes."""
+        self.aborted = reason
+
+    def reject(self, reason: str) -> None:
+        """Refuse the whole shard before sending; every entry becomes a rejected outcome."""
+        for index, entry in zip(self.indices, self.entries):
+            self.recorder.record(index, entry, REJECTED, reason)
+        self.stats["errors"] += len(self.entries)
+        self.aborted = reason
+        self.finished = time.time()
+
+    def fail_load(self, reason: str) -> None:
+        """The file could not be loaded, so nothing is sent; the job reports the error."""
+        self.load_error = reason
+        self.aborted = f"load failed: {reason}"
+        self.finished = time.time()
+
+    def finish(self) -> None:
+        if self.aborted:
+            with self.lock:
+                before = len(self.recorder.outcomes)
+                self.recorder.fill_missing(self.indices, self.entries, f"Not sent ({self.aborted})")
+                self.stats["errors"] += len(self.recorder.outcomes) - before
+        self.finished = time.time()
+
+
+class FairScheduler:
+    """
+    Hands out batches round-robin across users.
+
+    Each user has a FIFO of jobs; every acquire() advances the rotation, and
+    a user never has more than max_per_user batches in flight.
+    """
+
+    def __init__(self, jobs: List[ImportJob], max_per_user: int):
+        self.queues: "OrderedDict[str, deque]" = OrderedDict()
+        for job in jobs:
+            self.queues.setdefault(job.user_id, deque()).append(job)
+        self.rotation = deque(self.queues)
+        self.in_flight = {user: 0 for user in self.queues}
+        self.job_in_flight: Dict[int, int] = {}
+        self.max_per_user = max(1, max_per_user)
+        self.cond = threading.Condition()
+
+    def _has_pending(self) -> bool:
+        return any(job.has_pending() for queue in self.queues.values() for job in queue)
+
+    def acquire(self) -> Optional[Tuple[ImportJob, List[VocabEntry], List[int], int]]:
+        """Next batch to send, or None when no work is left for this worker."""
+        with self.cond:
+            while True:
+                for _ in range(len(self.rotation)):
+                    user = self.rotation[0]
+                    self.rotation.rotate(-1)
+                    if self.in_flight[user] >= self.max_per_user:
+                        continue
+                    job = next((j for j in self.queues[user] if j.has_pending()), None)
+                    if job is None:
+                        continue
+                    batch, indices, batch_num = job.take_batch()
+                    self.in_flight[user] += 1
+                    self.job_in_flight[id(job)] = self.job_in_flight.get(id(job), 0) + 1
+                    return job, batch, indices, batch_num
+
+                if not self._has_pending():
+                    return None
+                self.cond.wait()  # Pending work is capped by max_per_user; wait for a release
+
+    def release(self, job: ImportJob) -> None:
+        with self.cond:
+            self.in_flight[job.user_id] -= 1
+            self.job_in_flight[id(job)] -= 1
+            if not job.has_pending() and self.job_in_flight[id(job)] == 0 and job.finished is None:
+                job.finish()
+            self.cond.notify_all()
+
+    def abort_user(self, user_id: str, reason: str) -> None:
+        with self.cond:
+            for job in self.queues[user_id]:
+                if job.has_pending():
+                    job.abort(reason)
+                    if self.job_in_flight.get(id(job), 0) == 0:
+                        job.finish()
+            self.cond.notify_all()
+
+    def abort_all(self, reason: str) -> None:
+        for user_id in list(self.queues):
+            self.abort_user(user_id, reason)
+
+
+def load_credentials(path: Path) -> Dict[str, str]:
+    """userId -> Cookie header value, from a JSON object file."""
+    with open(path, "r", encoding="utf-8") as f:
+        credentials = json.load(f)
+    if not isinstance(credentials, dict) or not all(isinstance(v, str) for v in credentials.values()):
+        raise ValueError(f"{path} must be a JSON object mapping userId to a Cookie header string")
+    return credentials
+
+
+def load_jobs(
+    files: List[Path],
+    batch_size: int,
+    credentials: Optional[Dict[str, str]] = None,
+    order: str = "file"
+) -> List[ImportJob]:
+    """
+    Load every file and shard it into one job per userId (input order kept).
+
+    A file that fails to load becomes a single failed job carrying the error.
+    """
+    jobs = []
+    for path in files:
+        try:
+            entries = load_import_file(path)
+        except Exception as e:
+            log(f"✗ Could not load {path}: {e}")
+            failed = ImportJob(path, "", [], [], batch_size)
+            failed.fail_load(str(e))
+            jobs.append(failed)
+            continue
+        jobs.extend(split_jobs(path, entries, batch_size, credentials, order))
+    return jobs
+
+
+def split_jobs(
+    path: Path,
+    entries: List[VocabEntry],
+    batch_size: int,
+    credentials: Optional[Dict[str, str]] = None,
+    order: str = "file"
+) -> List[ImportJob]:
+    """
+    One job per userId in the file, entries in input order (order="file")
+    or most urgent first (order="priority", see upload_priority.py).
+
+    Shards with an invalid or placeholder userId are rejected up front.
+    With credentials, a shard whose user has none is not sent (failed).
+    """
+    by_user: "OrderedDict[str, Tuple[List[VocabEntry], List[int]]]" = OrderedDict()
+    for index, entry in enumerate(entries):
+        user_entries, user_indices = by_user.setdefault(entry.user_id or "", ([], []))
+        user_entries.append(entry)
+        user_indices.append(index)
+
+    jobs = []
+    for user_id, (user_entries, user_indices) in by_user.items():
+        if order == "priority":
+            user_entries, user_indices = priority_order(user_entries, user_indices)
+        cookie = credentials.get(user_id) if credentials is not None else None
+        job = ImportJob(path, user_id, user_entries, user_indices, batch_size, cookie)
+
+        problem = user_id_problem(user_id)
+        if problem:
+            job.reject(problem)
+            log(f"✗ {path.name}: rejected {len(user_entries)} entries ({problem})")
+        elif credentials is not None and cookie is None:
+            job.abort("no credentials for user")
+            job.finish()
+            log(f"✗ {path.name}: {len(user_entries)} entries for {user_id} not sent (no credentials)")
+        jobs.append(job)
+    return jobs
+
+
+def run_worker(
+    scheduler: FairScheduler,
+    send: Callable[[ImportJob, List[VocabEntry], Optional[RequestTiming]], Dict],
+    timings: Optional[RequestTimings] = None
+) -> None:
+    """Send batches until the scheduler runs dry; with timings, each request gets an ID and timing."""
+    import urllib.error
+
+    while True:
+        item = scheduler.acquire()
+        if item is None:
+            return
+        job, batch, indices, batch_num = item
+        prefix = f"  [{job.user_id}] {job.name} batch {batch_num}/{job.total_batches}"
+        timing = None
+        if timings is not None:
+            timing = timings.start(timings.request_id(f"j{job.number:03d}-b{batch_num:04d}"), len(batch))
+
+        try:
+            result = send(job, batch, timing)
+            with job.lock:
+                ok = apply_batch_result(result, batch, indices, job.stats, job.recorder)
+            if ok:
+                log(f"{prefix}: ✓ imported {result['data'].get('imported', 0)}")
+            else:
+                log(f"{prefix}: ✗ unexpected response")
+
+        except urllib.error.HTTPError as e:
+            error_body = e.read().decode('utf-8') if e.fp else str(e)
+            with job.lock:
+                job.stats['errors'] += len(batch)
+                job.recorder.record_batch_failure(indices, batch, f"HTTP {e.code}: {error_body[:200]}")
+            log(f"{prefix}: ✗ HTTP {e.code}" + (f" (request {timing.request_id})" if timing else ""))
+            if e.code == 401:
+                scheduler.abort_user(job.user_id, "authentication failed")
+
+        except urllib.error.URLError as e:
+            with job.lock:
+                job.stats['errors'] += len(batch)
+                job.recorder.record_batch_failure(indices, batch, f"Connection error: {e.reason}")
+            log(f"{prefix}: ✗ connection error: {e.reason}")
+            scheduler.abort_all("API unreachable")
+
+        except Exception as e:
+            with job.lock:
+                job.stats['errors'] += len(batch)
+                job.recorder.record_batch_failure(indices, batch, f"Error: {e}")
+            log(f"{prefix}: ✗ {e}")
+
+        finally:
+            scheduler.release(job)
+
+
+def run_jobs(
+    jobs: List[ImportJob],
+    api_url: str,
+    workers: int = 4,
+    max_per_user: Optional[int] = None,
+    dry_run: bool = False,
+    json_backend: Optional[str] = None,
+    auth_cookie: Optional[str] = None,
+    governor: Optional[RateGovernor] = None,
+    timings: Optional[RequestTimings] = None
+) -> float:
+    """
+    Upload all jobs with bounded concurrency; returns wall-clock seconds.
+
+    All workers share the governor, so its limits apply to the run as a whole.
+    Requests are timed into timings (a new run when None); dry runs send
+    nothing and record no timings.
+    """
+    endpoint = f"{api_url}/words/bulk-import"
+    backend = get_backend(json_backend)
+    for number, job in enumerate(jobs, 1):
+        job.number = number
+    if not dry_run:
+        timings = timings if timings is not None else RequestTimings()
+        log(f"Run ID: {timings.run_id}")
+
+    def send(job: ImportJob, batch: List[VocabEntry], timing: Optional[RequestTiming]) -> Dict:
+        if dry_run:
+            return simulate_batch(batch)
+        timing = timing or RequestTiming()
+        # Entries serialized once, body built from their bytes
+        with timing.client():
+            encoded = encode_entries(batch, backend)
+        return post_batch(endpoint, encoded, job.auth_cookie or auth_cookie, governor=governor, timing=timing)
+
+    scheduler = FairScheduler(jobs, max_per_user or workers)
+    threads = [
+        threading.Thread(target=run_worker, args=(scheduler, send, None if dry_run else timings), daemon=True)
+        for _ in range(max(1, workers))
+    ]
+
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for job in jobs:
+        if job.finished is None:
+            job.finish()
+    return time.time() - start
+
+
+def build_report(jobs: List[ImportJob], duration: float, timings: Optional[RequestTimings] = None) -> Dict:
+    totals = new_import_stats(0)
+    by_user: "OrderedDict[str, Dict]" = OrderedDict()
+    job_rows = []
+    failed_files = []
+
+    for job in jobs:
+        if job.load_error is not None:
+            failed_files.append({"file": str(job.path), "error": job.load_error})
+            job_rows.append({
+                "file": str(job.path),
+                "userId": job.user_id,
+                **job.stats,
+                "seconds": 0.0,
+                "aborted": job.aborted,
+            })
+            continue
+        user_stats = by_user.setdefault(job.user_id, new_import_stats(0))
+        for key in totals:
+            totals[key] += job.stats[key]
+            user_stats[key] += job.stats[key]
+        job_rows.append({
+            "file": str(job.path),
+            "userId": job.user_id,
+            **job.stats,
+            "seconds": round((job.finished or 0) - (job.started or job.finished or 0), 3),
+            "aborted": job.aborted,
+        })
+
+    return {
+        "jobs": job_rows,
+        "users": by_user,
+        "totals": totals,
+        "failedFiles": failed_files,
+        "seconds": round(duration, 3),
+        "entriesPerSecond": round(totals["total"] / duration, 1) if duration > 0 else None,
+        "runId": timings.run_id if timings is not None else None,
+        "requestTimings": [timing.to_dict() for timing in timings.requests] if timings is not None else [],
+    }
+
+
+def print_report(report: Dict, dry_run: bool = False, timings: Optional[RequestTimings] = None) -> None:
+    print("\nJOB RUNNER REPORT")
+    print("=" * 70)
+    if dry_run:
+        print("(DRY RUN - No actual changes made)")
+
+    print(f"\n{'file':<30} {'user':<36} {'total':>6} {'imp':>6} {'skip':>6} {'err':>5} {'sec':>7}")
+    for row in report["jobs"]:
+        name = Path(row["file"]).name
+        flag = "  ✗ " + row["aborted"] if row["aborted"] else ""
+        print(f"{name[:30]:<30} {row['userId'][:36]:<36} {row['total']:>6} {row['imported']:>6} "
+              f"{row['skipped']:>6} {row['errors']:>5} {row['seconds']:>7.1f}{flag}")
+
+    if len(report["users"]) > 1:
+        print("\nBy user:")
+        for user_id, stats in report["users"].items():
+            print(f"  {user_id}: {stats['imported']}/{stats['total']} imported, "
+                  f"{stats['skipped']} skipped, {stats['errors']} errors")
+
+    totals = report["totals"]
+    print(f"\n✓ Files/jobs:        {len(report['jobs'])}")
+    print(f"✓ Total entries:     {totals['total']}")
+    print(f"✓ Imported:          {totals['imported']}")
+    if totals['skipped']:
+        print(f"⊘ Skipped:           {totals['skipped']}")
+    if totals['errors']:
+        print(f"✗ Errors:            {totals['errors']}")
+    if report["failedFiles"]:
+        print(f"✗ Files not loaded:  {len(report['failedFiles'])}")
+        for failed in report["failedFiles"]:
+            print(f"    {failed['file']}: {failed['error']}")
+    print(f"\n⏱️  Duration: {report['seconds']:.1f} seconds ({report['entriesPerSecond'] or 0} entries/s)")
+    if timings is not None:
+        print(f"\n{timings.summary()}")
+
+
+def write_outcomes(jobs: List[ImportJob], outcomes_dir: Path) -> None:
+    """One manifest per input file (jobs of the same file are merged)."""
+    merged: "OrderedDict[Path, OutcomeRecorder]" = OrderedDict()
+    for job in jobs:
+        if job.load_error is not None:
+            continue  # No entries to report on
+        recorder = merged.setdefault(job.path, OutcomeRecorder())
+        recorder.outcomes.update(job.recorder.outcomes)
+    for path, recorder in merged.items():
+        recorder.write(outcomes_dir / f"{path.stem}.outcomes.jsonl")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import many LLYLI export files for many users (non-interactive)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Every *.json in imports/, 4 workers
+    python3 job_runner.py imports/
+
+    # Glob, more workers, simulate only
+    python3 job_runner.py "imports/llyli_with_history_*.json" --workers 8 --dry-run
+        """
+    )
+    parser.add_argument(
+        "targets", nargs="+", help="Import files, directories (*.json inside), glob patterns or shard manifests"
+    )
+    parser.add_argument(
+        "--api-url",
+        type=str,
+        default="http://localhost:3000/api",
+        help="LLYLI API URL (default: http://localhost:3000/api)"
+    )
+    parser.add_argument("--batch-size", type=int, default=50, help="Entries per request (default: 50)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests across all jobs (default: 4)")
+    parser.add_argument(
+        "--max-per-user",
+        type=int,
+        default=None,
+        help="Max concurrent requests for one user (default: --workers)"
+    )
+    parser.add_argument(
+        "--credentials",
+        type=Path,
+        default=None,
+        help="JSON object mapping userId to that user's session Cookie header (one session per shard)"
+    )
+    parser.add_argument(
+        "--order",
+        type=str,
+        default="file",
+        choices=ORDER_CHOICES,
+        help="Upload order within each job: file, or priority (struggling/overdue first)"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Simulate import without making changes")
+    parser.add_argument(
+        "--json-backend",
+        type=str,
+        default=None,
+        choices=BACKEND_CHOICES,
+        help="JSON encoder for request bodies (default: auto = orjson > ujson > stdlib)"
+    )
+    parser.add_argument("--outcomes-dir", type=Path, default=None, help="Write one outcome manifest per file here")
+    parser.add_argument("--json-report", type=Path, default=None, help="Also write the consolidated report as JSON")
+    parser.add_argument(
+        "--request-timings",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write per-request IDs and client/network/server timings (JSON Lines) to FILE"
+    )
+    add_rate_arguments(parser)
+    add_profiling_arguments(parser)
+
+    args = parser.parse_args()
+
+    with profiling_session(args) as timer:
+        files, shard_problems = discover_files(args.targets)
+        for problem in shard_problems:
+            print(f"✗ Shard skipped: {problem}")
+        if not files:
+            print("✗ No import files found")
+            sys.exit(1)
+
+        credentials = load_credentials(args.credentials) if args.credentials else None
+
+        print(f"Queued {len(files)} file(s)")
+        with timer.phase("load"):
+            jobs = load_jobs(files, args.batch_size, credentials, args.order)
+        users = {job.user_id for job in jobs if job.has_pending()}
+        print(f"✓ {len(jobs)} job(s) for {len(users)} user(s), {args.workers} worker(s)")
+        if len(users) > 1 and credentials is None and not args.dry_run:
+            print(f"⚠️  {len(users)} users share one session: every entry lands in the session user's account.")
+            print("   Pass --credentials for one session per user.")
+
+        print("\n" + "=" * 70)
+        print("STARTING IMPORT" + (" (DRY RUN)" if args.dry_run else ""))
+        print("=" * 70)
+
+        governor = governor_from_args(args)
+        timings = None if args.dry_run else RequestTimings()
+        with timer.phase("upload"):
+            duration = run_jobs(
+                jobs,
+                args.api_url,
+                workers=args.workers,
+                max_per_user=args.max_per_user,
+                dry_run=args.dry_run,
+                json_backend=args.json_backend,
+                governor=governor,
+                timings=timings,
+            )
+
+        report = build_report(jobs, duration, timings)
+        print_report(report, args.dry_run, timings)
+        if not args.dry_run:
+            print(governor.summary())
+
+        with timer.phase("write"):
+            if args.outcomes_dir:
+                write_outcomes(jobs, args.outcomes_dir)
+            if args.json_report:
+                args.json_report.parent.mkdir(parents=True, exist_ok=True)
+                args.json_report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+                print(f"✓ Wrote report to: {args.json_report}")
+            if args.request_timings and timings is not None and timings.requests:
+                timings.write(args.request_timings)
+                print(f"✓ Wrote {len(timings.requests)} request timings to: {args.request_timings}")
+
+        if shard_problems:
+            print(f"✗ {len(shard_problems)} shard(s) failed verification; re-export or re-copy them and run again")
+        ok = report["totals"]["errors"] == 0 and not shard_problems and not report["failedFiles"]
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
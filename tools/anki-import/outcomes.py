@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-entry outcome manifest for bulk imports.
+
+The bulk-import route returns data.results: one {index, status, reason?}
+per entry of the request. The importer maps those back to the entry's
+position in the input file and records transport failures itself, so every
+input entry ends up with exactly one outcome:
+
+    imported            stored in LLYLI
+    skipped_duplicate   already in LLYLI (same user, same originalText)
+    rejected            refused by the API (reason says why); fix and re-send
+    failed              never processed (HTTP/connection error); safe to re-send
+    unconfirmed         server did not report per-entry results (older API)
+
+The manifest is JSON Lines, one object per input entry, sorted by index
+(0-based position in the import file):
+
+    {"index": 12, "originalText": "apontado", "status": "imported"}
+    {"index": 13, "originalText": "", "status": "rejected", "reason": "Missing originalText or translation"}
+
+Re-send only what did not land:
+    python3 import_to_llyli.py imports/file.json --only-failed outcomes.jsonl --outcomes outcomes.retry.jsonl
+"""
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from vocab_model import AnyEntry, VocabEntry
+
+IMPORTED = "imported"
+SKIPPED_DUPLICATE = "skipped_duplicate"
+REJECTED = "rejected"
+FAILED = "failed"
+UNCONFIRMED = "unconfirmed"
+
+STATUSES = [IMPORTED, SKIPPED_DUPLICATE, REJECTED, FAILED, UNCONFIRMED]
+# Statuses --only-failed selects by default: nothing reached the database
+RESEND_STATUSES = {FAILED, UNCONFIRMED}
+
+
+def entry_text(entry: AnyEntry) -> str:
+    if isinstance(entry, VocabEntry):
+        return entry.original_text
+    return entry.get("originalText") or ""
+
+
+class OutcomeRecorder:
+    """Collects one outcome per input index."""
+
+    def __init__(self):
+        self.outcomes: Dict[int, Dict] = {}
+
+    def record(self, index: int, entry: AnyEntry, status: str, reason: Optional[str] = None) -> None:
+        outcome = {"index": index, "originalText": entry_text(entry), "status": status}
+        if reason:
+            outcome["reason"] = reason
+        self.outcomes[index] = outcome
+
+    def record_batch_failure(self, indices: List[int], batch: List[AnyEntry], reason: str) -> None:
+        for index, entry in zip(indices, batch):
+            self.record(index, entry, FAILED, reason)
+
+    def record_batch_response(self, indices: List[int], batch: List[AnyEntry], data: Dict) -> None:
+        """
+        Map data.results (request-relative indices) onto input indices.
+
+        Entries the server did not report on are marked unconfirmed.
+        """
+        results = data.get("results")
+        reported = set()
+        if isinstance(results, list):
+            for result in results:
+                position = result.get("index")
+                if not isinstance(position, int) or not 0 <= position < len(batch):
+                    continue
+                status = result.get("status")
+                if status not in STATUSES:
+                    status = UNCONFIRMED
+                self.record(indices[position], batch[position], status, result.get("reason"))
+                reported.add(position)
+
+        for position, entry in enumerate(batch):
+            if position not in reported:
+                self.record(indices[position], entry, UNCONFIRMED, "No per-entry result from server")
+
+    def fill_missing(self, indices: Iterable[int], entries: Iterable[AnyEntry], reason: str) -> None:
+        """Mark entries that never got an outcome (e.g. import aborted) as failed."""
+        for index, entry in zip(indices, entries):
+            if index not in self.outcomes:
+                self.record(index, entry, FAILED, reason)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in STATUSES}
+        for outcome in self.outcomes.values():
+            counts[outcome["status"]] += 1
+        return counts
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for index in sorted(self.outcomes):
+                f.write(json.dumps(self.outcomes[index], ensure_ascii=False) + "\n")
+        print(f"✓ Wrote {len(self.outcomes)} entry outcomes to: {path}")
+        for status, count in self.counts().items():
+            if count:
+                print(f"  {status}: {count}")
+
+
+def load_outcomes(path: Path) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def select_indices(outcomes: Iterable[Dict], statuses: Set[str]) -> List[int]:
+    """Input indices whose recorded status is in statuses, in file order."""
+    return sorted(o["index"] for o in outcomes if o.get("status") in statuses)
+
+
+def batch_error_count(data: Dict, batch_size: int) -> int:
+    """
+    Number of entries in a batch that errored.
+
+    The route replaces its numeric `errors` with a (max 10) list of
+    messages, so prefer errorCount and otherwise count whatever was
+    neither imported nor skipped.
+    """
+    if isinstance(data.get("errorCount"), int):
+        return data["errorCount"]
+    if isinstance(data.get("errors"), int):
+        return data["errors"]
+    return max(0, batch_size - data.get("imported", 0) - data.get("skipped", 0))
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared profiling hooks for the anki-import CLIs.
+
+Every CLI gets the same three options via add_profiling_arguments():
+    --profile FILE       write cProfile stats (inspect with: python3 -m pstats FILE)
+    --trace-memory [N]   print the top-N tracemalloc allocation sites (default N: 20)
+    --timings            print a per-phase wall-clock breakdown
+
+Usage in a CLI:
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    with profiling_session(args) as timer:
+        with timer.phase("load"):
+            entries = load_import_file(args.filepath)
+
+cProfile, pstats and tracemalloc are imported only when the matching
+option is given, so plain runs do not pay for them at startup.
+"""
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+# Phases reported in this order; any other phase names follow in first-use order
+STANDARD_PHASES = ["load", "analyze", "transform", "upload", "write"]
+DEFAULT_MEMORY_TOP_N = 20
+PROFILE_SUMMARY_LINES = 15
+
+
+class PhaseTimer:
+    """
+    Accumulates wall-clock time per named phase.
+
+    While tracemalloc is tracing, the end of each phase also keeps the
+    snapshot with the highest live memory, so the memory report shows what
+    was resident at the heaviest point rather than after cleanup.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.heaviest_snapshot: Optional[Tuple[str, int, "tracemalloc.Snapshot"]] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block; repeated phases accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+            # Never imported unless --trace-memory (or the caller) started it
+            tracemalloc = sys.modules.get("tracemalloc")
+            if tracemalloc and tracemalloc.is_tracing():
+                self.record_memory(name)
+
+    def record_memory(self, name: str) -> None:
+        import tracemalloc
+
+        current, _ = tracemalloc.get_traced_memory()
+        if self.heaviest_snapshot is None or current > self.heaviest_snapshot[1]:
+            self.heaviest_snapshot = (name, current, tracemalloc.take_snapshot())
+
+    def stop(self) -> None:
+        """Freeze the total so report overhead is not counted."""
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    def report(self) -> None:
+        """Print the phase breakdown (no-op unless enabled)."""
+        if not self.enabled:
+            return
+
+        self.stop()
+        total = self.finished - self.started
+        ordered = [p for p in STANDARD_PHASES if p in self.phases]
+        ordered += [p for p in self.phases if p not in STANDARD_PHASES]
+
+        print("\nPHASE TIMINGS")
+        print("=" * 70)
+        for name in ordered:
+            seconds = self.phases[name]
+            share = (seconds / total * 100) if total > 0 else 0.0
+            print(f"  {name:<12} {seconds:9.3f}s  {share:5.1f}%")
+
+        other = total - sum(self.phases.values())
+        if other > 0.0005:
+            share = (other / total * 100) if total > 0 else 0.0
+            print(f"  {'(other)':<12} {other:9.3f}s  {share:5.1f}%")
+        print(f"  {'total':<12} {total:9.3f}s")
+
+
+def add_profiling_arguments(parser) -> None:
+    """Register --profile, --trace-memory and --timings on an argparse parser."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write cProfile stats to FILE (inspect with: python3 -m pstats FILE)"
+    )
+    group.add_argument(
+        "--trace-memory",
+        type=int,
+        nargs="?",
+        const=DEFAULT_MEMORY_TOP_N,
+        default=0,
+        metavar="N",
+        help=f"Print the top N memory allocation sites via tracemalloc (default N: {DEFAULT_MEMORY_TOP_N})"
+    )
+    group.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print a per-phase timing breakdown (load, analyze, transform, upload, write)"
+    )
+
+
+@contextmanager
+def profiling_session(args) -> Iterator[PhaseTimer]:
+    """
+    Run a CLI body under the profilers requested on the command line.
+
+    Reports are printed even when the body exits via sys.exit() or an
+    exception, so a failing slow import can still be diagnosed.
+    """
+    profile_path = getattr(args, "profile", None)
+    memory_top_n = getattr(args, "trace_memory", 0) or 0
+    timer = PhaseTimer(enabled=getattr(args, "timings", False))
+
+    profiler = None
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+    if memory_top_n:
+        import tracemalloc
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+
+    try:
+        yield timer
+    finally:
+        timer.stop()
+        if profiler:
+            profiler.disable()
+        if memory_top_n:
+            report_memory(memory_top_n, timer)
+            tracemalloc.stop()
+        if profiler:
+            write_profile(profiler, profile_path)
+        timer.report()
+
+
+def write_profile(profiler: "cProfile.Profile", profile_path: Path) -> None:
+    """Dump cProfile stats and print the hottest functions."""
+    import io
+    import pstats
+
+    profile_path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(str(profile_path))
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(PROFILE_SUMMARY_LINES)
+
+    print("\nPROFILE")
+    print("=" * 70)
+    print(f"✓ cProfile stats written to: {profile_path}")
+    print(f"  Inspect with: python3 -m pstats {profile_path}")
+    print(summary.getvalue().rstrip())
+
+
+def report_memory(top_n: int, timer: PhaseTimer) -> None:
+    """Print the top allocation sites at the heaviest phase and peak traced memory."""
+    import tracemalloc
+
+    _, peak = tracemalloc.get_traced_memory()
+    if timer.heaviest_snapshot:
+        label, current, snapshot = timer.heaviest_snapshot
+        label = f"end of '{label}'"
+    else:
+        current, _ = tracemalloc.get_traced_memory()
+        label, snapshot = "exit", tracemalloc.take_snapshot()
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+    print("\nMEMORY (tracemalloc)")
+    print("=" * 70)
+    print(f"  Peak: {peak / 1024 / 1024:.1f} MiB   Live at {label}: {current / 1024 / 1024:.1f} MiB")
+    print(f"  Top {top_n} allocation sites:")
+    for stat in snapshot.statistics("lineno")[:top_n]:
+        frame = stat.traceback[0]
+        print(f"  {stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Client-side rate governor for bulk imports.
+
+Token buckets pace requests (--max-rps) and entries (--max-eps) before a
+batch is sent, shared by every thread that sends through the same
+governor. The governor also learns from the server's rate-limit headers:
+
+    X-RateLimit-Limit      requests allowed per window -> ceiling of limit/window
+    X-RateLimit-Remaining  tokens left (minus requests still in flight); the
+                           window's unused budget may be spent as a burst
+    X-RateLimit-Reset      unix time the window frees up; waited for at remaining 0
+    Retry-After            on 429: pause that long, then halve the request rate
+
+After a 429 the request rate climbs back toward the ceiling additively, one
+step per successful response (AIMD). The result is the highest rate the
+server sustains without a 429 storm. Throttled batches are not re-sent
+here; they are recorded as failed like any other error.
+
+Usage:
+    governor = RateGovernor(requests_per_second=2, entries_per_second=100)
+    post_batch(endpoint, encoded, governor=governor)
+"""
+import argparse
+import threading
+import time
+from typing import Mapping, Optional
+
+DEFAULT_WINDOW = 60.0  # The web app's limiters count per minute
+DECREASE_FACTOR = 0.5
+INCREASE_FRACTION = 0.05  # Of the ceiling, per successful response
+MIN_RATE = 0.05  # requests/second floor after repeated 429s
+UNLEARNED_RATE = 1.0  # Rate to fall back to after a 429 with no limit known
+
+
+class TokenBucket:
+    """
+    Refills at rate tokens/second up to capacity.
+
+    reserve() may overdraw the bucket; the caller sleeps for the returned
+    wait, which queues concurrent callers in reservation order.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take amount tokens; seconds to wait before using them."""
+        self.refill(now)
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def _header_number(headers: Optional[Mapping], name: str) -> Optional[float]:
+    if headers is None:
+        return None
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RateGovernor:
+    """Paces batches by requests/second and entries/second; thread-safe."""
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        entries_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        learn: bool = True,
+        window: float = DEFAULT_WINDOW
+    ):
+        self.lock = threading.Lock()
+        self.configured_rps = requests_per_second
+        self.burst = burst
+        self.learn = learn
+        self.window = window
+        self.requests = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.entries = TokenBucket(entries_per_second) if entries_per_second else None
+        self.learned_rps: Optional[float] = None
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.sent = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    @property
+    def ceiling(self) -> Optional[float]:
+        """Highest request rate allowed: the configured one, lowered by what the server advertises."""
+        rates = [r for r in (self.configured_rps, self.learned_rps) if r]
+        return min(rates) if rates else None
+
+    def acquire(self, entries: int = 1) -> float:
+        """Block until a request carrying entries may be sent; returns seconds waited."""
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0.0, self.blocked_until - now)
+            if self.requests:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.entries:
+                wait = max(wait, self.entries.reserve(entries, now))
+            self.in_flight += 1
+            self.sent += 1
+            self.waited += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pace(self, entries: int) -> float:
+        """
+        Block until entries more may be sent within an already acquired request
+        (streaming uploads); returns seconds waited. Only --max-eps applies.
+        """
+        if not self.entries:
+            return 0.0
+        with self.lock:
+            wait = self.entries.reserve(entries, time.monotonic())
+            self.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def observe(self, status: Optional[int], headers: Optional[Mapping]) -> None:
+        """
+        Learn from a response (status None: no response at all).
+
+        Call exactly once per acquire().
+        """
+        limit = _header_number(headers, "X-RateLimit-Limit")
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        reset = _header_number(headers, "X-RateLimit-Reset")
+        retry_after = _header_number(headers, "Retry-After")
+
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if status == 429:
+                self.throttled += 1
+            if not self.learn:
+                return
+            now = time.monotonic()
+            until_reset = max(0.0, reset - time.time()) if reset is not None else None
+
+            if limit:
+                self.learned_rps = limit / self.window
+                self._ensure_request_bucket(self.ceiling, now)
+                self.requests.rate = min(self.requests.rate, self.ceiling)
+                # The window's unused budget may be spent back to back
+                self.requests.capacity = max(self.requests.capacity, min(limit, self.burst or limit))
+
+            if remaining is not None and self.requests:
+                # The server's count wins over the local estimate (other clients share it)
+                self.requests.refill(now)
+                self.requests.tokens = min(self.requests.capacity, remaining - self.in_flight)
+                if remaining <= 0 and until_reset:
+                    self.blocked_until = max(self.blocked_until, now + until_reset)
+
+            if status == 429:
+                pause = retry_after if retry_after is not None else (until_reset or 1.0)
+                self.blocked_until = max(self.blocked_until, now + pause)
+                self._ensure_request_bucket(self.ceiling or UNLEARNED_RATE, now)
+                self.requests.rate = max(MIN_RATE, self.requests.rate * DECREASE_FACTOR)
+            elif status is not None and 200 <= status < 300 and self.requests:
+                ceiling = self.ceiling
+                if ceiling is None:
+                    # Limit only ever inferred from a 429: probe upward from there
+                    ceiling = self.requests.rate * 2
+                step = max(MIN_RATE, ceiling * INCREASE_FRACTION)
+                self.requests.rate = min(ceiling, self.requests.rate + step)
+
+    def _ensure_request_bucket(self, rate: float, now: float) -> None:
+        if self.requests is None:
+            self.requests = TokenBucket(rate, self.burst)
+            self.requests.updated = now
+
+    def summary(self) -> str:
+        rate = f"{self.requests.rate:.2f} req/s" if self.requests else "unlimited"
+        learned = f", server limit {self.learned_rps * self.window:g}/{self.window:g}s" if self.learned_rps else ""
+        return (f"Rate governor: {self.sent} requests, {self.waited:.1f}s total wait, "
+                f"{self.throttled} throttled (429), final rate {rate}{learned}")
+
+
+def add_rate_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the shared rate-limiting options to a CLI parser."""
+    group = parser.add_argument_group("rate limiting")
+    group.add_argument("--max-rps", type=float, default=None, help="Max requests per second (default: unlimited)")
+    group.add_argument("--max-eps", type=float, default=None, help="Max entries per second (default: unlimited)")
+    group.add_argument("--burst", type=float, default=None, help="Requests allowed back to back (default: one second's worth)")
+    group.add_argument(
+        "--rate-window",
+        type=float,
+        default=DEFAULT_WINDOW,
+        help=f"Window of the server's X-RateLimit-Limit in seconds (default: {DEFAULT_WINDOW:g})"
+    )
+    group.add_argument(
+        "--no-rate-learning",
+        action="store_true",
+        help="Ignore X-RateLimit-*/Retry-After headers; only apply --max-rps/--max-eps"
+    )
+
+
+def governor_from_args(args: argparse.Namespace) -> RateGovernor:
+    return RateGovernor(
+        requests_per_second=args.max_rps,
+        entries_per_second=args.max_eps,
+        burst=args.burst,
+        learn=not args.no_rate_learning,
+        window=args.rate_window,
+    )
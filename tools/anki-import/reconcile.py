@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check an import file against the words stored in LLYLI, without downloading them.
+
+The tool compares bucket digests (see word_digest.py) with
+GET /api/words/digest:
+1. One request returns (count, digest) per category
+2. A category that differs is split 16 ways by the next keyHash digit,
+   and only the sub-buckets that differ are followed
+3. Buckets of at most --leaf-size words are fetched word by word and compared
+
+It reports four kinds of word:
+- missing on the server
+- stored with a different translation
+- stored under another category
+- only on the server (e.g. captured in the app)
+
+A consistent deck costs a single request of about 1 KB. Otherwise the
+transfer grows with the number of differences, not with deck size.
+
+Usage:
+    python3 reconcile.py imports/file.json
+    python3 reconcile.py imports/file.json --missing-out imports/missing.json
+    python3 reconcile.py imports/file.json --api-url http://localhost:3100/api
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+from vocab_model import VocabEntry, load_entries, to_wire
+from word_digest import MAX_HASH_DEPTH, DigestItem, bucket_summaries, digest_item, digest_items, select_items
+
+LEAF_SIZE = 32  # Fetch a bucket's words once neither side has more than this
+MAX_LEAF_SIZE = 500  # The route's MAX_ITEMS
+
+
+class DigestClient:
+    """GET /api/words/digest, counting requests and response bytes."""
+
+    def __init__(self, api_url: str, auth_cookie: Optional[str] = None, timeout: float = 60):
+        self.endpoint = f"{api_url}/words/digest"
+        self.auth_cookie = auth_cookie
+        self.timeout = timeout
+        self.requests = 0
+        self.bytes_received = 0
+
+    def get(self, **params) -> Dict:
+        import urllib.request
+
+        url = f"{self.endpoint}?{urlencode(params)}" if params else self.endpoint
+        headers = {'Cookie': self.auth_cookie} if self.auth_cookie else {}
+        req = urllib.request.Request(url, headers=headers, method='GET')
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            body = response.read()
+        self.requests += 1
+        self.bytes_received += len(body)
+        return json.loads(body.decode('utf-8'))['data']
+
+    def buckets(self, category: Optional[str] = None, prefix: str = "", depth: int = 0) -> List[Dict]:
+        if category is None:
+            return self.get()['buckets']
+        return self.get(category=category, prefix=prefix, depth=depth)['buckets']
+
+    def items(self, category: str, prefix: str) -> List[Dict]:
+        return self.get(category=category, prefix=prefix, items=1)['items']
+
+
+def _differs(local: Optional[Dict], server: Optional[Dict]) -> bool:
+    if local is None or server is None:
+        return True
+    return local['count'] != server['count'] or local['digest'] != server['digest']
+
+
+def reconcile(items: List[DigestItem], client: DigestClient, leaf_size: int = LEAF_SIZE) -> Dict:
+    """
+    Compare local digest items with the server's words.
+
+    Returns {"missing": [DigestItem], "divergent": [(DigestItem, server item)],
+    "moved": [(DigestItem, server category)], "extra": [(category, server item)],
+    "serverTotal": int}.
+    """
+    missing: List[DigestItem] = []
+    divergent = []
+    extra = []
+
+    def compare_leaf(category: str, prefix: str) -> None:
+        server_by_key = {s['keyHash']: s for s in client.items(category, prefix)}
+        for item in select_items(items, category, prefix):
+            server = server_by_key.pop(item.key_hash, None)
+            if server is None:
+                missing.append(item)
+            elif server['itemHash'] != item.item_hash:
+                divergent.append((item, server))
+        extra.extend((category, s) for s in server_by_key.values())
+
+    def drill(category: str, prefix: str, local_count: int, server_count: int) -> None:
+        if server_count == 0:
+            missing.extend(select_items(items, category, prefix))
+            return
+        if max(local_count, server_count) <= leaf_size or len(prefix) >= MAX_HASH_DEPTH:
+            compare_leaf(category, prefix)
+            return
+
+        # One hex digit deeper: 16 sub-buckets, about 1 KB per response
+        depth = len(prefix) + 1
+        local = {b['bucket']: b for b in bucket_summaries(items, category, prefix, depth)}
+        server = {b['bucket']: b for b in client.buckets(category, prefix, depth)}
+        for bucket in sorted(set(local) | set(server)):
+            if _differs(local.get(bucket), server.get(bucket)):
+                drill(
+                    category,
+                    bucket,
+                    local[bucket]['count'] if bucket in local else 0,
+                    server[bucket]['count'] if bucket in server else 0,
+                )
+
+    local_top = {b['bucket']: b for b in bucket_summaries(items)}
+    server_top = {b['bucket']: b for b in client.buckets()}
+    for category in sorted(set(local_top) | set(server_top)):
+        local, server = local_top.get(category), server_top.get(category)
+        if _differs(local, server):
+            drill(category, "", local['count'] if local else 0, server['count'] if server else 0)
+
+    # A word missing from one category but extra in another was stored there
+    extra_by_key = {s['keyHash']: (category, s) for category, s in extra}
+    moved = []
+    for item in missing:
+        if item.key_hash in extra_by_key:
+            moved.append((item, extra_by_key.pop(item.key_hash)[0]))
+    moved_keys = {item.key_hash for item, _ in moved}
+
+    return {
+        "missing": [item for item in missing if item.key_hash not in moved_keys],
+        "divergent": divergent,
+        "moved": moved,
+        "extra": list(extra_by_key.values()),
+        "serverTotal": sum(b['count'] for b in server_top.values()),
+    }
+
+
+def write_missing(entries: List[VocabEntry], missing: List[DigestItem], path: Path) -> int:
+    """Write the local entries of missing words as an import file; returns the count."""
+    wanted = {item.key_hash for item in missing}
+    selected = []
+    for entry in entries:
+        key_hash = digest_item(entry.original_text, entry.translation, entry.category.value).key_hash
+        if key_hash in wanted:
+            wanted.discard(key_hash)  # First copy only, as the importer keeps
+            selected.append(to_wire(entry))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(selected, f, ensure_ascii=False, indent=2)
+    return len(selected)
+
+
+def print_report(local_total: int, result: Dict, client: DigestClient, show: int) -> None:
+    missing, divergent, moved, extra = result['missing'], result['divergent'], result['moved'], result['extra']
+    matched = local_total - len(missing) - len(divergent) - len(moved)
+
+    print("\n" + "=" * 70)
+    print("RECONCILIATION")
+    print("=" * 70)
+    print(f"\n✓ Local words:   {local_total}")
+    print(f"✓ Server words:  {result['serverTotal']}")
+    print(f"  Exchanged {client.requests} requests, {client.bytes_received / 1024:.1f} KB")
+    print(f"\n✓ Matching:      {matched}")
+
+    if missing:
+        print(f"✗ Missing on server: {len(missing)}")
+        for item in missing[:show]:
+            print(f"    - \"{item.original_text}\" ({item.category})")
+    if divergent:
+        print(f"⚠️  Different translation: {len(divergent)}")
+        for item, server in divergent[:show]:
+            print(f"    - \"{item.original_text}\": local \"{item.translation}\", server \"{server['translation']}\"")
+    if moved:
+        print(f"⚠️  Stored under another category: {len(moved)}")
+        for item, category in moved[:show]:
+            print(f"    - \"{item.original_text}\": {item.category} -> {category}")
+    if extra:
+        print(f"  Only on server: {len(extra)} (e.g. captured in the app)")
+
+    hidden = max(0, len(missing) - show) + max(0, len(divergent) - show) + max(0, len(moved) - show)
+    if hidden:
+        print(f"\n  ... {hidden} more not shown (use --show)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check an import file against LLYLI using bucket digests",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # After an import
+    python3 reconcile.py imports/file.json
+
+    # Write the words that never arrived as a new import file
+    python3 reconcile.py imports/file.json --missing-out imports/missing.json
+    python3 import_to_llyli.py imports/missing.json
+        """
+    )
+    parser.add_argument("filepath", type=Path, help="Path to JSON import file")
+    parser.add_argument(
+        "--api-url",
+        type=str,
+        default="http://localhost:3000/api",
+        help="LLYLI API URL (default: http://localhost:3000/api)"
+    )
+    parser.add_argument(
+        "--leaf-size",
+        type=int,
+        default=LEAF_SIZE,
+        help=f"Compare word by word once a bucket has at most this many words (default: {LEAF_SIZE})"
+    )
+    parser.add_argument("--show", type=int, default=20, help="Words listed per problem kind (default: 20)")
+    parser.add_argument(
+        "--missing-out",
+        type=Path,
+        default=None,
+        help="Write the entries missing on the server to this import file"
+    )
+
+    args = parser.parse_args()
+
+    if not args.filepath.exists():
+        print(f"✗ File not found: {args.filepath}")
+        sys.exit(1)
+
+    with open(args.filepath, 'r', encoding='utf-8') as f:
+        entries = load_entries(f)
+    items = digest_items((e.original_text, e.translation, e.category.value) for e in entries)
+    print(f"✓ Loaded {len(entries)} entries ({len(items)} distinct importable words)")
+
+    client = DigestClient(args.api_url)
+    try:
+        result = reconcile(items, client, min(max(1, args.leaf_size), MAX_LEAF_SIZE))
+    except Exception as e:
+        print(f"✗ Reconciliation failed: {e}")
+        sys.exit(1)
+
+    print_report(len(items), result, client, args.show)
+
+    if args.missing_out and result['missing']:
+        count = write_missing(entries, result['missing'], args.missing_out)
+        print(f"\n✓ Wrote {count} missing entries to: {args.missing_out}")
+
+    consistent = not (result['missing'] or result['divergent'] or result['moved'])
+    if consistent:
+        print("\n✓ Server matches the import file")
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == "__main__":
+    main()
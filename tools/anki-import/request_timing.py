@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Correlation IDs and client/network/server timing for bulk-import requests.
+
+Every import run gets a run ID, and every request an ID derived from it
+(<run>-b0007, <run>-stream). They are sent as X-Correlation-Id and
+X-Request-Id. The route logs under the request ID and answers with
+    Server-Timing: body;dur=12.3, db;dur=84.0, total;dur=101
+so a slow batch can be found in the server logs and split into:
+
+    client   encoding the request body + parsing the response JSON
+    network  round trip minus the server's total (transfer, TLS, queueing)
+    server   route total, of which body (reading/parsing) and db (Postgres)
+
+Usage:
+    timings = RequestTimings()
+    timing = timings.start(timings.request_id("b0001"), len(batch))
+    with timing.client():
+        encoded = encode_entries(batch, backend)
+    post_batch(endpoint, encoded, timing=timing)   # sends headers, records the rest
+    print(timings.summary())
+    timings.write(Path("timings.jsonl"))
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+def new_run_id() -> str:
+    """Sortable, unique enough run ID, e.g. imp-20260119T101500-3fa2c1."""
+    return f"imp-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.urandom(3).hex()}"
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """{"body": 12.3, "db": 84.0, "total": 101.0} from a Server-Timing header."""
+    metrics = {}
+    for metric in (header or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    metrics[name] = float(value)
+                except ValueError:
+                    pass
+    return metrics
+
+
+class RequestTiming:
+    """Timing of one request, filled in by the caller and post_batch()/post_stream()."""
+
+    __slots__ = ("run_id", "request_id", "entries", "client_ms", "round_trip_ms", "server", "status")
+
+    def __init__(self, run_id: str = "", request_id: str = "", entries: int = 0):
+        self.run_id = run_id
+        self.request_id = request_id
+        self.entries = entries
+        self.client_ms = 0.0
+        self.round_trip_ms = 0.0
+        self.server: Dict[str, float] = {}
+        self.status: Optional[int] = None
+
+    def headers(self) -> Dict[str, str]:
+        if not self.request_id:
+            return {}
+        return {'X-Request-Id': self.request_id, 'X-Correlation-Id': self.run_id}
+
+    @contextmanager
+    def client(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.client_ms += (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def round_trip(self) -> Iterator[None]:
+        """Time from sending the request to having read the whole response."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.round_trip_ms += (time.perf_counter() - start) * 1000
+
+    def observe(self, status: Optional[int], headers) -> None:
+        self.status = status
+        if headers is not None:
+            self.server = parse_server_timing(headers.get('Server-Timing'))
+
+    @property
+    def server_ms(self) -> Optional[float]:
+        return self.server.get('total')
+
+    @property
+    def network_ms(self) -> Optional[float]:
+        if self.server_ms is None:
+            return None
+        return max(0.0, self.round_trip_ms - self.server_ms)
+
+    def to_dict(self) -> Dict:
+        return {
+            "requestId": self.request_id,
+            "status": self.status,
+            "entries": self.entries,
+            "clientMs": round(self.client_ms, 1),
+            "networkMs": None if self.network_ms is None else round(self.network_ms, 1),
+            "serverMs": self.server_ms,
+            "serverBodyMs": self.server.get('body'),
+            "serverDbMs": self.server.get('db'),
+            "roundTripMs": round(self.round_trip_ms, 1),
+        }
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class RequestTimings:
+    """All requests of one run."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or new_run_id()
+        self.requests: List[RequestTiming] = []
+
+    def request_id(self, label: str) -> str:
+        return f"{self.run_id}-{label}"
+
+    def start(self, request_id: str, entries: int) -> RequestTiming:
+        timing = RequestTiming(self.run_id, request_id, entries)
+        self.requests.append(timing)
+        return timing
+
+    def slowest(self) -> Optional[RequestTiming]:
+        return max(self.requests, key=lambda t: t.round_trip_ms + t.client_ms, default=None)
+
+    def summary(self) -> str:
+        """Totals and p50/p95 per component, plus the slowest request's ID."""
+        if not self.requests:
+            return f"Request timing (run {self.run_id}): no requests"
+
+        lines = [f"Request timing (run {self.run_id}, {len(self.requests)} requests):"]
+        components = [
+            ("client", [t.client_ms for t in self.requests]),
+            ("network", [t.network_ms for t in self.requests if t.network_ms is not None]),
+            ("server", [t.server_ms for t in self.requests if t.server_ms is not None]),
+            ("  body", [t.server['body'] for t in self.requests if 'body' in t.server]),
+            ("  db", [t.server['db'] for t in self.requests if 'db' in t.server]),
+        ]
+        for name, values in components:
+            if values:
+                lines.append(
+                    f"  {name:<9} total {sum(values) / 1000:7.2f}s   "
+                    f"p50 {_percentile(values, 0.5):8.1f}ms   p95 {_percentile(values, 0.95):8.1f}ms"
+                )
+        if not any(t.server for t in self.requests):
+            lines.append("  (no Server-Timing headers: network and server time not separable)")
+
+        slowest = self.slowest()
+        lines.append(f"  slowest   {slowest.request_id} ({slowest.round_trip_ms + slowest.client_ms:.0f}ms)")
+        return "\n".join(lines)
+
+    def write(self, path: Path) -> None:
+        """One JSON line per request."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for timing in self.requests:
+                f.write(json.dumps(timing.to_dict()) + "\n")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pluggable JSON encoder for the import pipeline.
+
+Uses orjson or ujson when installed and falls back to the stdlib json module.
+All backends emit UTF-8 bytes with non-ASCII text unescaped, so output is
+interchangeable (the API and validate_import.py accept any of them).
+
+Bulk import pre-serializes each entry exactly once with encode_entry() and
+assembles request bodies by byte concatenation (build_batch_body), so a
+retried or re-split batch never re-encodes its entries.
+
+Backend selection: get_backend("auto" | "orjson" | "ujson" | "stdlib"), or
+the LLYLI_JSON_BACKEND environment variable when no name is given.
+"""
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from vocab_model import AnyEntry, to_wire
+
+BACKEND_CHOICES = ["auto", "orjson", "ujson", "stdlib"]
+AUTO_ORDER = ["orjson", "ujson", "stdlib"]
+ENV_VAR = "LLYLI_JSON_BACKEND"
+
+
+class JsonBackend:
+    """A named pair of compact and pretty (indent=2) encoders returning bytes."""
+
+    def __init__(self, name: str, dumps: Callable[[Any], bytes], dumps_pretty: Callable[[Any], bytes]):
+        self.name = name
+        self.dumps = dumps
+        self.dumps_pretty = dumps_pretty
+
+    def __repr__(self) -> str:
+        return f"JsonBackend({self.name!r})"
+
+
+def _stdlib_backend() -> JsonBackend:
+    return JsonBackend(
+        "stdlib",
+        lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        lambda obj: json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8"),
+    )
+
+
+def _orjson_backend() -> JsonBackend:
+    import orjson
+
+    return JsonBackend(
+        "orjson",
+        orjson.dumps,
+        lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2),
+    )
+
+
+def _ujson_backend() -> JsonBackend:
+    import ujson
+
+    options = {"ensure_ascii": False, "escape_forward_slashes": False}
+    return JsonBackend(
+        "ujson",
+        lambda obj: ujson.dumps(obj, **options).encode("utf-8"),
+        lambda obj: ujson.dumps(obj, indent=2, **options).encode("utf-8"),
+    )
+
+
+_FACTORIES = {
+    "stdlib": _stdlib_backend,
+    "orjson": _orjson_backend,
+    "ujson": _ujson_backend,
+}
+_cache: Dict[str, JsonBackend] = {}
+
+
+def get_backend(name: Optional[str] = None) -> JsonBackend:
+    """
+    Resolve a JSON backend by name.
+
+    "auto" (the default) picks the fastest installed one. Asking for a
+    specific backend that is not installed raises ImportError.
+    """
+    name = name or os.environ.get(ENV_VAR) or "auto"
+    if name not in BACKEND_CHOICES:
+        raise ValueError(f"Unknown JSON backend '{name}' (choose from: {', '.join(BACKEND_CHOICES)})")
+
+    if name in _cache:
+        return _cache[name]
+
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            try:
+                backend = get_backend(candidate)
+                break
+            except ImportError:
+                continue
+    else:
+        backend = _FACTORIES[name]()
+
+    _cache[name] = backend
+    return backend
+
+
+def encode_entry(entry: AnyEntry, backend: Optional[JsonBackend] = None) -> bytes:
+    """Serialize one entry (VocabEntry or wire dict) to compact JSON bytes."""
+    return (backend or get_backend()).dumps(to_wire(entry))
+
+
+def encode_entries(entries: Iterable[AnyEntry], backend: Optional[JsonBackend] = None) -> List[bytes]:
+    backend = backend or get_backend()
+    return [backend.dumps(to_wire(entry)) for entry in entries]
+
+
+def build_batch_body(encoded_entries: List[bytes], skip_duplicates: bool = True) -> bytes:
+    """
+    Bulk-import request body from pre-serialized entries.
+
+    Equivalent to dumps({"entries": [...], "skipDuplicates": ...}) without
+    re-encoding any entry.
+    """
+    return b"".join((
+        b'{"entries":[',
+        b",".join(encoded_entries),
+        b'],"skipDuplicates":',
+        b"true" if skip_duplicates else b"false",
+        b"}",
+    ))
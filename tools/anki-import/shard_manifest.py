@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Size-bounded export shards and their manifest.
+
+write_shards() splits pre-encoded entries into JSON array files of at most
+max_entries entries and max_bytes bytes (an entry larger than max_bytes gets
+a shard of its own). With a group per entry (e.g. its category) shards never
+mix groups. Alongside the shards it writes <stem>.manifest.json:
+
+    {
+      "version": 1,
+      "createdAt": "2026-01-16T22:45:22",
+      "totalEntries": 903,
+      "maxEntries": 250, "maxBytes": null, "groupBy": "category",
+      "shards": [
+        {"file": "llyli_with_history_..._work_001.json", "group": "work",
+         "entries": 250, "bytes": 180231, "sha256": "..."}
+      ]
+    }
+
+Shard files are valid import files on their own, so importers can process
+them in parallel and retry a single shard. Importers resolve a manifest with
+manifest_shards(), which checks each shard's size and hash first.
+
+Usage:
+    manifest = write_shards(encoded, output_dir, stem, max_entries=250, group_by="category")
+    shards, problems = manifest_shards(output_dir / f"{stem}.manifest.json")
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Brackets and separators around pretty-printed (indent=2) array items
+ARRAY_OPEN = b"[\n"
+ARRAY_CLOSE = b"\n]"
+ITEM_SEPARATOR = b",\n"
+
+
+def is_manifest(path: Path) -> bool:
+    return path.name.endswith(MANIFEST_SUFFIX)
+
+
+def manifest_path_for(output_dir: Path, stem: str) -> Path:
+    return output_dir / f"{stem}{MANIFEST_SUFFIX}"
+
+
+def indent_item(pretty: bytes) -> bytes:
+    """Indent one pretty-printed entry as an item of a pretty-printed array."""
+    # JSON strings never contain raw newlines, so every line break is layout
+    return b"  " + pretty.replace(b"\n", b"\n  ")
+
+
+def _shard_name(stem: str, group: Optional[str], number: int) -> str:
+    if group:
+        return f"{stem}_{group}_{number:03d}.json"
+    return f"{stem}_{number:03d}.json"
+
+
+def _write_shard(path: Path, items: List[bytes]) -> Dict:
+    body = ARRAY_OPEN + ITEM_SEPARATOR.join(items) + ARRAY_CLOSE
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+    return {"file": path.name, "entries": len(items), "bytes": len(body), "sha256": hashlib.sha256(body).hexdigest()}
+
+
+def write_shards(
+    encoded: Iterable[Tuple[Optional[str], bytes]],
+    output_dir: Path,
+    stem: str,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    group_by: Optional[str] = None
+) -> Dict:
+    """
+    Write (group, pretty entry bytes) pairs as shards plus the manifest; returns the manifest.
+
+    Entries of one group must be contiguous (sort by group first).
+    """
+    shards = []
+    items: List[bytes] = []
+    size = len(ARRAY_OPEN) + len(ARRAY_CLOSE)
+    current_group: Optional[str] = None
+    numbers: Dict[Optional[str], int] = {}
+    total = 0
+
+    def flush():
+        numbers[current_group] = numbers.get(current_group, 0) + 1
+        path = output_dir / _shard_name(stem, current_group, numbers[current_group])
+        shard = _write_shard(path, items)
+        if group_by:
+            shard["group"] = current_group
+        shards.append(shard)
+
+    for group, pretty in encoded:
+        item = indent_item(pretty)
+        added = len(item) + (len(ITEM_SEPARATOR) if items else 0)
+        if items and (
+            group != current_group
+            or (max_entries is not None and len(items) >= max_entries)
+            or (max_bytes is not None and size + added > max_bytes)
+        ):
+            flush()
+            items = []
+            size = len(ARRAY_OPEN) + len(ARRAY_CLOSE)
+            added = len(item)
+        current_group = group
+        items.append(item)
+        size += added
+        total += 1
+    if items:
+        flush()
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "createdAt": datetime.now().isoformat(timespec="seconds"),
+        "totalEntries": total,
+        "maxEntries": max_entries,
+        "maxBytes": max_bytes,
+        "groupBy": group_by,
+        "shards": shards,
+    }
+    path = manifest_path_for(output_dir, stem)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_manifest(path: Path) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Not a version {MANIFEST_VERSION} shard manifest: {path}")
+    return manifest
+
+
+def verify_shard(directory: Path, shard: Dict) -> Optional[str]:
+    """Why the shard file does not match its manifest record, or None."""
+    path = directory / shard["file"]
+    if not path.exists():
+        return f"{shard['file']}: missing"
+    if path.stat().st_size != shard["bytes"]:
+        return f"{shard['file']}: {path.stat().st_size} bytes, manifest says {shard['bytes']}"
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    if digest.hexdigest() != shard["sha256"]:
+        return f"{shard['file']}: sha256 mismatch"
+    return None
+
+
+def manifest_shards(path: Path) -> Tuple[List[Path], List[str]]:
+    """Shard files of a manifest that match their size and hash, and the problems of those that do not."""
+    manifest = load_manifest(path)
+    shards = []
+    problems = []
+    for shard in manifest["shards"]:
+        problem = verify_shard(path.parent, shard)
+        if problem:
+            problems.append(problem)
+        else:
+            shards.append(path.parent / shard["file"])
+    return shards, problems
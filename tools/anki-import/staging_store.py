@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite staging store for the merge -> Anki join -> export pipeline.
+
+Replaces merged_vocabulary.json and the in-memory Anki history dict with one
+indexed database file:
+
+    source_rows    one row per (source, normalized word_pt, normalized word_en);
+                   upserted per source, rows gone from a source are deleted
+    merged_words   view: for every key, the row of the highest-priority source
+                   (Google Sheets > CSV > Anki), in source then file order
+    anki_history   AnkiConnect learning metadata per key, upserted
+
+Re-running a merge is incremental: unchanged rows (same content digest) keep
+their stored category, so classify_card() only runs for new or changed rows.
+Export streams merged_words LEFT JOIN anki_history through a cursor, so the
+merge and the join no longer hold the corpus in memory.
+
+Usage:
+    with StagingStore(Path("staging.db")) as store:
+        store.stage_source("CSV", CSV_PRIORITY, rows, classify=classify_card)
+        store.stage_anki_history(history)
+        for row in store.iter_joined():
+            ...
+"""
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+DEFAULT_STAGING_DB = "staging.db"
+SCHEMA_VERSION = 1
+
+# Lower wins when the same word appears in several sources
+SHEETS_PRIORITY = 0
+CSV_PRIORITY = 1
+ANKI_PRIORITY = 2
+
+ROW_FIELDS = ["word_pt", "word_en", "sentence_pt", "sentence_en", "date_added", "category"]
+HISTORY_FIELDS = [
+    ("learningState", "learning_state"),
+    ("reviewCount", "review_count"),
+    ("lapseCount", "lapse_count"),
+    ("interval", "interval"),
+    ("easeFactor", "ease_factor"),
+    ("lastReviewed", "last_reviewed"),
+    ("mastered", "mastered"),
+    ("queue", "queue"),
+    ("cardType", "card_type"),
+    ("dueDate", "due_date"),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS source_rows (
+    source TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    key_pt TEXT NOT NULL,
+    key_en TEXT NOT NULL,
+    word_pt TEXT NOT NULL,
+    word_en TEXT NOT NULL,
+    sentence_pt TEXT NOT NULL DEFAULT '',
+    sentence_en TEXT NOT NULL DEFAULT '',
+    date_added TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    digest TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    PRIMARY KEY (source, key_pt, key_en)
+);
+CREATE INDEX IF NOT EXISTS source_rows_by_key ON source_rows (key_pt, key_en, priority);
+CREATE INDEX IF NOT EXISTS source_rows_by_order ON source_rows (priority, seq);
+
+CREATE VIEW IF NOT EXISTS merged_words AS
+SELECT s.* FROM source_rows s
+WHERE s.priority = (
+    SELECT MIN(t.priority) FROM source_rows t
+    WHERE t.key_pt = s.key_pt AND t.key_en = s.key_en
+);
+
+CREATE TABLE IF NOT EXISTS anki_history (
+    key_pt TEXT NOT NULL,
+    key_en TEXT NOT NULL,
+    learning_state TEXT NOT NULL,
+    review_count INTEGER NOT NULL,
+    lapse_count INTEGER NOT NULL,
+    interval INTEGER NOT NULL,
+    ease_factor REAL NOT NULL,
+    last_reviewed TEXT,
+    mastered INTEGER NOT NULL,
+    queue INTEGER,
+    card_type INTEGER,
+    due_date INTEGER,
+    run INTEGER NOT NULL,
+    PRIMARY KEY (key_pt, key_en)
+);
+"""
+
+UPSERT_ROW = """
+INSERT INTO source_rows (
+    source, priority, seq, key_pt, key_en,
+    word_pt, word_en, sentence_pt, sentence_en, date_added, category, digest, run
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, key_pt, key_en) DO UPDATE SET
+    priority = excluded.priority,
+    seq = excluded.seq,
+    word_pt = excluded.word_pt,
+    word_en = excluded.word_en,
+    sentence_pt = excluded.sentence_pt,
+    sentence_en = excluded.sentence_en,
+    date_added = excluded.date_added,
+    category = excluded.category,
+    digest = excluded.digest,
+    run = excluded.run
+WHERE source_rows.run != excluded.run
+"""
+
+UPSERT_HISTORY = """
+INSERT INTO anki_history (
+    key_pt, key_en, learning_state, review_count, lapse_count, interval,
+    ease_factor, last_reviewed, mastered, queue, card_type, due_date, run
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key_pt, key_en) DO UPDATE SET
+    learning_state = excluded.learning_state,
+    review_count = excluded.review_count,
+    lapse_count = excluded.lapse_count,
+    interval = excluded.interval,
+    ease_factor = excluded.ease_factor,
+    last_reviewed = excluded.last_reviewed,
+    mastered = excluded.mastered,
+    queue = excluded.queue,
+    card_type = excluded.card_type,
+    due_date = excluded.due_date,
+    run = excluded.run
+"""
+
+JOINED_QUERY = f"""
+SELECT m.source, {", ".join("m." + f for f in ROW_FIELDS)},
+       h.key_pt IS NOT NULL AS has_history,
+       {", ".join("h." + column for _, column in HISTORY_FIELDS)}
+FROM merged_words m
+LEFT JOIN anki_history h ON h.key_pt = m.key_pt AND h.key_en = m.key_en
+ORDER BY m.priority, m.seq
+"""
+
+
+def normalize_key(word_pt: str, word_en: str) -> Tuple[str, str]:
+    """Normalized (word_pt, word_en) key, as in merge_all_sources.normalize_key."""
+    return (
+        word_pt.strip().lower() if word_pt else "",
+        word_en.strip().lower() if word_en else ""
+    )
+
+
+def row_digest(row: Dict) -> str:
+    """Content digest of a source row as it came in (category before classification)."""
+    content = "\x1f".join(str(row.get(field) or "") for field in ROW_FIELDS)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class StagingStore:
+    """Indexed SQLite staging database; use as a context manager."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        version = self.conn.execute("SELECT value FROM meta WHERE name = 'schema_version'").fetchone()
+        if version is None:
+            self.conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            self.conn.commit()
+        elif int(version[0]) != SCHEMA_VERSION:
+            raise ValueError(f"{self.path} has staging schema {version[0]}, expected {SCHEMA_VERSION} (delete it to rebuild)")
+
+    def __enter__(self) -> "StagingStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _next_run(self) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'run'").fetchone()
+        run = int(row[0]) + 1 if row else 1
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('run', ?)", (str(run),))
+        return run
+
+    def stage_source(
+        self,
+        source: str,
+        priority: int,
+        rows: Iterable[Dict],
+        classify: Optional[Callable[[str, str, str, str], str]] = None
+    ) -> Dict[str, int]:
+        """
+        Replace one source's rows, streaming; returns counts of
+        added/changed/unchanged/duplicate/removed/skipped rows.
+
+        Within a source the first row of a key wins, as in the JSON merge.
+        Rows without a category are classified with classify(word_en, word_pt,
+        sentence_en, sentence_pt), but only when new or changed.
+        """
+        counts = {"added": 0, "changed": 0, "unchanged": 0, "duplicate": 0, "removed": 0, "skipped": 0}
+        with self.conn:
+            run = self._next_run()
+            lookup = self.conn.cursor()
+            for seq, row in enumerate(rows):
+                key = normalize_key(row.get("word_pt", ""), row.get("word_en", ""))
+                if not key[0] or not key[1]:
+                    counts["skipped"] += 1
+                    continue
+
+                digest = row_digest(row)
+                existing = lookup.execute(
+                    "SELECT digest, category, run FROM source_rows WHERE source = ? AND key_pt = ? AND key_en = ?",
+                    (source, key[0], key[1]),
+                ).fetchone()
+
+                if existing is not None and existing[2] == run:
+                    counts["duplicate"] += 1
+                    continue
+                if existing is not None and existing[0] == digest:
+                    counts["unchanged"] += 1
+                    category = existing[1]
+                else:
+                    counts["changed" if existing is not None else "added"] += 1
+                    category = row.get("category") or ""
+                    if not category and classify is not None:
+                        category = classify(
+                            row["word_en"], row["word_pt"], row.get("sentence_en", ""), row.get("sentence_pt", "")
+                        )
+
+                self.conn.execute(UPSERT_ROW, (
+                    source, priority, seq, key[0], key[1],
+                    row["word_pt"], row["word_en"],
+                    row.get("sentence_pt") or "", row.get("sentence_en") or "",
+                    row.get("date_added") or "", category, digest, run,
+                ))
+
+            counts["removed"] = self.conn.execute(
+                "DELETE FROM source_rows WHERE source = ? AND run != ?", (source, run)
+            ).rowcount
+        return counts
+
+    def stage_anki_history(self, history: Dict[Tuple[str, str], Dict]) -> Dict[str, int]:
+        """Upsert AnkiConnect history (get_anki_learning_history() output); cards gone from the deck are dropped."""
+        with self.conn:
+            run = self._next_run()
+            self.conn.executemany(UPSERT_HISTORY, (
+                normalize_key(*key) + tuple(values[name] for name, _ in HISTORY_FIELDS) + (run,)
+                for key, values in history.items()
+            ))
+            removed = self.conn.execute("DELETE FROM anki_history WHERE run != ?", (run,)).rowcount
+        return {"staged": len(history), "removed": removed}
+
+    def iter_merged(self) -> Iterator[Dict]:
+        """Merged vocabulary rows (the merged_vocabulary.json shape), in merge order."""
+        cursor = self.conn.execute(
+            f"SELECT source, {', '.join(ROW_FIELDS)} FROM merged_words ORDER BY priority, seq"
+        )
+        for values in cursor:
+            yield dict(zip(["source"] + ROW_FIELDS, values))
+
+    def iter_joined(self) -> Iterator[Dict]:
+        """
+        Merged rows LEFT JOIN anki_history, in merge order.
+
+        Each row carries "history": the get_anki_learning_history() dict for
+        the word, or None when it was never studied in Anki.
+        """
+        history_names = [name for name, _ in HISTORY_FIELDS]
+        for values in self.conn.execute(JOINED_QUERY):
+            row = dict(zip(["source"] + ROW_FIELDS, values[:7]))
+            row["history"] = None
+            if values[7]:
+                history = dict(zip(history_names, values[8:]))
+                history["mastered"] = bool(history["mastered"])
+                row["history"] = history
+            yield row
+
+    def merged_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM merged_words").fetchone()[0]
+
+    def merged_counts_by(self, column: str) -> Dict[str, int]:
+        """Merged word counts grouped by source or category."""
+        if column not in ("source", "category"):
+            raise ValueError(f"Cannot group by {column}")
+        rows = self.conn.execute(
+            f"SELECT {column}, COUNT(*) FROM merged_words GROUP BY {column} ORDER BY COUNT(*) DESC"
+        )
+        return dict(rows.fetchall())
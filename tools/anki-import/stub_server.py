@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the LLYLI bulk-import API.
+
+Implements the POST /api/words/bulk-import contract of
+web/src/app/api/words/bulk-import/route.ts closely enough to load-test
+import_to_llyli.py offline: no Next.js app, session or database needed.
+
+Responses mirror the real route:
+- 200 {"data": {"total", "imported", "skipped", "withHistory", "errorCount",
+  "errors"?, "results"}} where "errors" is a list of at most 10 strings
+  (omitted when empty) and "results" has one {index, status, reason?} per entry
+- 400 when "entries" is not an array
+- {"format": "columnar", ...} bodies (see columnar.py) are decoded first;
+  400 when they do not decode
+- Content-Type application/x-ndjson (optionally chunked): one entry per line,
+  imported every NDJSON_BATCH_SIZE lines while the body is still arriving;
+  result indices count entry lines
+- 401 when --require-auth is set and no Cookie header is sent
+- X-Request-Id is echoed and successful imports carry a Server-Timing
+  header (body, db = in-memory import, total), as the route sends
+
+Duplicates are detected per user on lower(originalText), like the
+words_user_original_text_unique_idx index, and counted as skipped.
+
+Fault injection (all deterministic for a given --seed):
+- --latency-ms / --jitter-ms   delay before each response
+- --error-rate                 fraction of requests answered with 500
+- --throttle-rate              fraction of requests answered with 429
+- --requests-per-minute        sliding-window limit, answered with 429 and
+                               X-RateLimit-* / Retry-After headers
+- --slow-body-ms               trickle the response body in small chunks
+
+GET /api/words/digest answers bucket digests of the stored words (see
+word_digest.py) for reconcile.py, and GET /api/_stub/stats returns request
+and storage counters.
+
+Usage:
+    python3 stub_server.py --port 3100
+    python3 import_to_llyli.py imports/file.json --api-url http://localhost:3100/api
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from columnar import decode_columnar, is_columnar
+from word_digest import MAX_HASH_DEPTH, DigestItem, bucket_summaries, digest_item, select_items
+
+
+BULK_IMPORT_PATH = "/api/words/bulk-import"
+DIGEST_PATH = "/api/words/digest"
+STATS_PATH = "/api/_stub/stats"
+MAX_ERROR_DETAILS = 10  # Same limit as the real route
+SLOW_BODY_CHUNK_SIZE = 64
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 50  # Same as the real route's BATCH_SIZE
+DIGEST_MAX_DEPTH_STEP = 2  # Same limits as the real digest route
+DIGEST_MAX_ITEMS = 500
+
+
+@dataclass
+class StubConfig:
+    """Fault-injection settings for the stand-in server."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    requests_per_minute: int = 0  # 0 = unlimited
+    slow_body_ms: float = 0.0
+    require_auth: bool = False
+    seed: Optional[int] = None
+
+
+class StubState:
+    """Shared, lock-protected state across handler threads."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.random = random.Random(config.seed)
+        self.words: Dict[str, Dict[str, DigestItem]] = {}  # user -> lower(originalText) -> stored word
+        self.request_times: deque = deque()
+        self.counters = {
+            "requests": 0,
+            "ok": 0,
+            "throttled": 0,
+            "failed": 0,
+            "unauthorized": 0,
+            "badRequest": 0,
+            "entriesReceived": 0,
+            "imported": 0,
+            "skipped": 0,
+            "errors": 0,
+        }
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[key] += amount
+
+    def roll(self) -> Tuple[float, float, float]:
+        """Draw latency, error and throttle dice under the lock (reproducible order)."""
+        with self.lock:
+            jitter = self.random.uniform(-1.0, 1.0) * self.config.jitter_ms
+            return jitter, self.random.random(), self.random.random()
+
+    def check_rate_limit(self) -> Tuple[bool, int, int]:
+        """
+        Sliding one-minute window, like the Upstash limiter.
+
+        Returns (allowed, remaining, reset_unix_seconds).
+        """
+        limit = self.config.requests_per_minute
+        now = time.time()
+        with self.lock:
+            window_start = now - 60
+            while self.request_times and self.request_times[0] <= window_start:
+                self.request_times.popleft()
+
+            if limit <= 0:
+                return True, 0, int(now) + 60
+
+            if len(self.request_times) >= limit:
+                reset = int(self.request_times[0] + 60) + 1
+                return False, 0, reset
+
+            self.request_times.append(now)
+            reset = int(self.request_times[0] + 60) + 1
+            return True, limit - len(self.request_times), reset
+
+    def import_entries(self, user: str, entries: List, offset: int = 0) -> Dict:
+        """
+        Apply the route's per-entry logic and store accepted words.
+
+        Result indices start at offset (the batch's position in an NDJSON stream).
+        """
+        stats = {
+            "total": len(entries),
+            "imported": 0,
+            "skipped": 0,
+            "errors": 0,
+            "withHistory": 0,
+        }
+        error_details = []
+        results = []
+
+        with self.lock:
+            existing = self.words.setdefault(user, {})
+
+            for index, entry in enumerate(entries, offset):
+                if not isinstance(entry, dict) or not entry.get("originalText") or not entry.get("translation"):
+                    stats["skipped"] += 1
+                    results.append({"index": index, "status": "rejected", "reason": "Missing originalText or translation"})
+                    continue
+
+                original = entry["originalText"]
+                if not isinstance(original, str) or not isinstance(entry["translation"], str):
+                    stats["errors"] += 1
+                    reason = "originalText and translation must be strings"
+                    error_details.append(f'Entry "{original}": {reason}')
+                    results.append({"index": index, "status": "rejected", "reason": reason})
+                    continue
+
+                key = original.strip().lower()
+                if key in existing:
+                    stats["skipped"] += 1
+                    results.append({"index": index, "status": "skipped_duplicate"})
+                    continue
+
+                existing[key] = digest_item(original, entry["translation"], entry.get("category"))
+                stats["imported"] += 1
+                results.append({"index": index, "status": "imported"})
+                if entry.get("learningHistory"):
+                    stats["withHistory"] += 1
+
+            self.counters["imported"] += stats["imported"]
+            self.counters["skipped"] += stats["skipped"]
+            self.counters["errors"] += stats["errors"]
+
+        # Match the route: numeric error count moves to errorCount and
+        # errors becomes the (truncated) details
+        data = dict(stats)
+        data["errorCount"] = stats["errors"]
+        if error_details:
+            data["errors"] = error_details[:MAX_ERROR_DETAILS]
+        else:
+            del data["errors"]
+        data["results"] = results
+        return data
+
+    def import_lines(self, user: str, lines: Iterable[bytes]) -> Dict:
+        """import_entries() over a stream of NDJSON lines, NDJSON_BATCH_SIZE entries at a time."""
+        data = {"total": 0, "imported": 0, "skipped": 0, "withHistory": 0, "errorCount": 0, "errors": [], "results": []}
+        batch: List = []
+        start = 0  # Stream index of batch[0]
+        index = 0
+
+        def flush() -> None:
+            if not batch:
+                return
+            part = self.import_entries(user, batch, start)
+            for key in ("total", "imported", "skipped", "withHistory", "errorCount"):
+                data[key] += part[key]
+            data["errors"].extend(part.get("errors", []))
+            data["results"].extend(part["results"])
+            batch.clear()
+
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                flush()
+                reason = f"Invalid JSON: {e}"
+                data["total"] += 1
+                data["errorCount"] += 1
+                data["errors"].append(f"Line {index + 1}: {reason}")
+                data["results"].append({"index": index, "status": "rejected", "reason": reason})
+                self.count("errors")
+                index += 1
+                continue
+
+            if not batch:
+                start = index
+            batch.append(entry)
+            index += 1
+            if len(batch) >= NDJSON_BATCH_SIZE:
+                flush()
+        flush()
+
+        data["errors"] = data["errors"][:MAX_ERROR_DETAILS]
+        if not data["errors"]:
+            del data["errors"]
+        return data
+
+    def digest(self, user: str, query: Dict[str, List[str]]) -> Tuple[int, Dict]:
+        """Status and payload of GET /api/words/digest, with the route's validation."""
+        category = query.get("category", [None])[0]
+        prefix = query.get("prefix", [""])[0]
+        want_items = query.get("items", [""])[0] == "1"
+        try:
+            depth = int(query.get("depth", ["0"])[0])
+        except ValueError:
+            depth = 0
+
+        if prefix.strip("0123456789abcdef") or len(prefix) >= MAX_HASH_DEPTH:
+            return 400, {"error": "prefix must be lowercase hex"}
+        if (want_items or prefix) and not category:
+            return 400, {"error": "prefix and items require a category"}
+        if category and not want_items and not (len(prefix) < depth <= min(len(prefix) + DIGEST_MAX_DEPTH_STEP, MAX_HASH_DEPTH)):
+            return 400, {"error": f"depth must be 1-{DIGEST_MAX_DEPTH_STEP} digits longer than prefix"}
+
+        with self.lock:
+            stored = list(self.words.get(user, {}).values())
+
+        if want_items:
+            items = select_items(stored, category, prefix)
+            if len(items) > DIGEST_MAX_ITEMS:
+                return 400, {"error": f"Bucket has more than {DIGEST_MAX_ITEMS} words; use a longer prefix"}
+            return 200, {"data": {"items": [
+                {"keyHash": i.key_hash, "itemHash": i.item_hash, "originalText": i.original_text, "translation": i.translation}
+                for i in items
+            ]}}
+        return 200, {"data": {"buckets": bucket_summaries(stored, category, prefix, depth if category else None)}}
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                **self.counters,
+                "users": len(self.words),
+                "storedWords": sum(len(w) for w in self.words.values()),
+            }
+
+
+class BulkImportHandler(BaseHTTPRequestHandler):
+    """Request handler; one instance per request, state lives on the server."""
+
+    server_version = "LLYLIStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> StubState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            request_id = self.headers.get("X-Request-Id") if getattr(self, "headers", None) else None
+            if request_id:
+                format += " [%s]"
+                args += (request_id,)
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == STATS_PATH:
+            self.send_json(200, self.state.snapshot())
+        elif url.path == DIGEST_PATH:
+            if self.state.config.require_auth and not self.headers.get("Cookie"):
+                self.send_json(401, {"error": "Unauthorized"})
+                return
+            user = self.headers.get("Cookie") or "stub-user"
+            self.send_json(*self.state.digest(user, parse_qs(url.query)))
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        # Query parameters (e.g. spreadDays/dailyCap) only affect scheduling, which the stub does not model
+        if urlsplit(self.path).path != BULK_IMPORT_PATH:
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        state = self.state
+        config = state.config
+        state.count("requests")
+        started = time.perf_counter()
+
+        streaming = (self.headers.get("Content-Type") or "").startswith(NDJSON_CONTENT_TYPE)
+        if streaming:
+            # Read the body only once the request is accepted, as the route does;
+            # a rejected stream is left unread, so the connection cannot be reused
+            raw_body = b""
+            self.close_connection = True
+        else:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw_body = self.rfile.read(length) if length else b""
+        body_ms = (time.perf_counter() - started) * 1000
+
+        jitter, error_roll, throttle_roll = state.roll()
+        delay_ms = max(0.0, config.latency_ms + jitter)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        allowed, remaining, reset = state.check_rate_limit()
+        if not allowed or throttle_roll < config.throttle_rate:
+            state.count("throttled")
+            self.send_throttled(remaining, reset)
+            return
+
+        if config.require_auth and not self.headers.get("Cookie"):
+            state.count("unauthorized")
+            self.send_json(401, {"error": "Unauthorized"})
+            return
+
+        if error_roll < config.error_rate:
+            state.count("failed")
+            self.send_json(500, {"error": "Injected failure"})
+            return
+
+        headers = {}
+        if config.requests_per_minute > 0:
+            headers = {
+                "X-RateLimit-Limit": str(config.requests_per_minute),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(reset),
+            }
+        user = self.headers.get("Cookie") or "stub-user"
+
+        if streaming:
+            # Reading and importing interleave: time spent waiting on the body is body time
+            read_ms = [0.0]
+            import_start = time.perf_counter()
+            data = state.import_lines(user, self.timed(self.body_lines(), read_ms))
+            db_ms = (time.perf_counter() - import_start) * 1000 - read_ms[0]
+            state.count("entriesReceived", data["total"])
+            state.count("ok")
+            headers.update(self.server_timing(started, read_ms[0], db_ms))
+            self.send_json(200, {"data": data}, headers)
+            return
+
+        parse_start = time.perf_counter()
+        try:
+            body = json.loads(raw_body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            state.count("failed")
+            self.send_json(500, {"error": str(e)})
+            return
+
+        if is_columnar(body):
+            try:
+                body = {"entries": decode_columnar(body)}
+            except ValueError as e:
+                state.count("badRequest")
+                self.send_json(400, {"error": str(e)})
+                return
+
+        entries = body.get("entries") if isinstance(body, dict) else None
+        if not isinstance(entries, list):
+            state.count("badRequest")
+            self.send_json(400, {"error": "entries must be an array"})
+            return
+
+        body_ms += (time.perf_counter() - parse_start) * 1000
+
+        state.count("entriesReceived", len(entries))
+        import_start = time.perf_counter()
+        data = state.import_entries(user, entries)
+        db_ms = (time.perf_counter() - import_start) * 1000
+
+        state.count("ok")
+        headers.update(self.server_timing(started, body_ms, db_ms))
+        self.send_json(200, {"data": data}, headers)
+
+    @staticmethod
+    def timed(items: Iterator, elapsed_ms: List[float]) -> Iterator:
+        """Yield from items, adding the time spent producing them to elapsed_ms[0]."""
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                elapsed_ms[0] += (time.perf_counter() - start) * 1000
+                return
+            elapsed_ms[0] += (time.perf_counter() - start) * 1000
+            yield item
+
+    @staticmethod
+    def server_timing(started: float, body_ms: float, db_ms: float) -> Dict[str, str]:
+        """Server-Timing header like the route's ("db" is the in-memory import here)."""
+        total_ms = (time.perf_counter() - started) * 1000
+        return {"Server-Timing": f"body;dur={body_ms:.1f}, db;dur={db_ms:.1f}, total;dur={total_ms:.0f}"}
+
+    def body_chunks(self) -> Iterator[bytes]:
+        """Request body as it arrives (chunked transfer encoding or Content-Length)."""
+        if "chunked" in (self.headers.get("Transfer-Encoding") or "").lower():
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Trailer section ends with an empty line
+                    while self.rfile.readline().strip():
+                        pass
+                    return
+                chunk = self.rfile.read(size)
+                self.rfile.readline()
+                yield chunk
+        else:
+            remaining = int(self.headers.get("Content-Length") or 0)
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    def body_lines(self) -> Iterator[bytes]:
+        """NDJSON lines of the request body, holding at most one partial line."""
+        pending = b""
+        for chunk in self.body_chunks():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            yield from lines
+        if pending:
+            yield pending
+
+    def send_throttled(self, remaining: int, reset: int) -> None:
+        limit = self.state.config.requests_per_minute
+        retry_after = max(1, reset - int(time.time()))
+        self.send_json(
+            429,
+            {
+                "error": "Too many requests",
+                "code": "RATE_LIMIT_EXCEEDED",
+                "details": {"limit": limit, "remaining": remaining},
+            },
+            {
+                "X-RateLimit-Limit": str(limit),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(reset),
+                "Retry-After": str(retry_after),
+            },
+        )
+
+    def send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.headers.get("X-Request-Id"):
+            self.send_header("X-Request-Id", self.headers["X-Request-Id"])
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        slow_body_ms = self.state.config.slow_body_ms
+        if slow_body_ms <= 0:
+            self.wfile.write(body)
+            return
+
+        for i in range(0, len(body), SLOW_BODY_CHUNK_SIZE):
+            self.wfile.write(body[i:i + SLOW_BODY_CHUNK_SIZE])
+            self.wfile.flush()
+            time.sleep(slow_body_ms / 1000)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying the shared StubState."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: StubConfig, verbose: bool = False):
+        super().__init__(address, BulkImportHandler)
+        self.state = StubState(config)
+        self.verbose = verbose
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+
+def start_stub_server(
+    config: Optional[StubConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    verbose: bool = False
+) -> StubServer:
+    """
+    Start the stand-in server on a background thread.
+
+    Port 0 picks a free port; use server.api_url as the importer's --api-url.
+    Call server.shutdown() when done.
+    """
+    server = StubServer((host, port), config or StubConfig(), verbose)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the LLYLI bulk-import API (load testing)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Plain stand-in on port 3100
+    python3 stub_server.py --port 3100
+
+    # Slow, flaky server with a 60 req/min limit
+    python3 stub_server.py --latency-ms 200 --jitter-ms 50 \\
+        --error-rate 0.05 --requests-per-minute 60 --seed 42
+        """
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=3100, help="Port (default: 3100)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before each response (default: 0)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- latency jitter (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500 (default: 0)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429 (default: 0)")
+    parser.add_argument(
+        "--requests-per-minute",
+        type=int,
+        default=0,
+        help="Sliding-window request limit, 0 = unlimited (default: 0)"
+    )
+    parser.add_argument("--slow-body-ms", type=float, default=0.0, help=f"Delay between {SLOW_BODY_CHUNK_SIZE}-byte response chunks (default: 0)")
+    parser.add_argument("--require-auth", action="store_true", help="Answer 401 unless a Cookie header is sent")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible fault injection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        requests_per_minute=args.requests_per_minute,
+        slow_body_ms=args.slow_body_ms,
+        require_auth=args.require_auth,
+        seed=args.seed,
+    )
+
+    server = StubServer((args.host, args.port), config, args.verbose)
+    print(f"✓ Stub bulk-import API listening on {server.api_url}")
+    print(f"  POST {BULK_IMPORT_PATH}")
+    print(f"  GET  {DIGEST_PATH}")
+    print(f"  GET  {STATS_PATH}")
+    print("  Press Ctrl+C to stop.")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping stub server.")
+        print(json.dumps(server.state.snapshot(), indent=2))
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
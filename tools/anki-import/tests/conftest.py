@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""The anki-import tools are flat scripts; make them importable from the tests."""
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+for path in (TOOLS_DIR, TOOLS_DIR / "export_scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture
+def classify_calls(monkeypatch):
+    """
+    Stand-in for the Anki project's transform_inbox_to_csv module.
+
+    classify_card() derives a category from the English word and records
+    every call, so tests can count classifications.
+    """
+    calls = []
+
+    def classify_card(word_en, word_pt, sentence_en="", sentence_pt=""):
+        calls.append(word_pt)
+        return ["💪 Gym", "💼 Work", "🔍 Other"][len(word_en) % 3]
+
+    module = types.ModuleType("transform_inbox_to_csv")
+    module.classify_card = classify_card
+    monkeypatch.setitem(sys.modules, "transform_inbox_to_csv", module)
+    return calls
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Randomized merge sources with cross-source, case and whitespace duplicates."""
+import random
+from typing import Dict, List, Tuple
+
+
+def make_sources(seed: int, size: int) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """(sheets, anki, csv) rows; some rows lack a word and must be skipped."""
+    rng = random.Random(seed)
+    words = [f"palavra{i}" for i in range(max(1, size // 2))]
+
+    def rows(count: int, with_category: bool) -> List[Dict]:
+        result = []
+        for _ in range(count):
+            word = rng.choice(words)
+            row = {
+                "word_pt": rng.choice([word, word.upper(), f" {word} ", ""]),
+                "word_en": rng.choice(["x", "X ", "yes", ""]),
+                "sentence_pt": rng.choice(["", "Uma frase."]),
+                "sentence_en": rng.choice(["", "A sentence."]),
+                "date_added": rng.choice(["", "2025-01-02"]),
+            }
+            if with_category and rng.random() < 0.7:
+                row["category"] = rng.choice(["💼 Work", "🏡 Daily Life"])
+            result.append(row)
+        return result
+
+    return rows(size // 3, True), rows(size, False), rows(size, True)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Columnar batches decode to the entries they were encoded from."""
+import json
+
+import pytest
+
+from columnar import build_columnar_body, decode_columnar, encode_columnar, is_columnar
+from conftest import TOOLS_DIR
+
+SAMPLE = TOOLS_DIR / "imports" / "llyli_with_history_20260116_224522.json"
+
+
+def without_nulls(entry):
+    """An entry as the decoder returns it: null fields and empty objects left out."""
+    result = {}
+    for key, value in entry.items():
+        if isinstance(value, dict):
+            value = {k: v for k, v in value.items() if v is not None} or None
+        if value is not None:
+            result[key] = value
+    return result
+
+
+def test_sample_export_round_trips():
+    with open(SAMPLE, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    body = json.loads(build_columnar_body(entries))
+
+    assert is_columnar(body)
+    assert body["count"] == len(entries)
+    assert decode_columnar(body) == [without_nulls(entry) for entry in entries]
+
+
+def test_encoding_uses_shared_fields_dictionaries_and_last_lines():
+    entries = [
+        {
+            "originalText": f"palavra{i}",
+            "language": "target",
+            "category": ["work", "social"][i % 2],
+            "notes": f"PT: frase {i}\n[Source: {['CSV', 'Anki'][i % 2]}]",
+            "learningHistory": {"interval": i or None, "mastered": False},
+        }
+        for i in range(6)
+    ]
+
+    body = encode_columnar(entries, skip_duplicates=False)
+
+    assert body["skipDuplicates"] is False
+    assert body["shared"] == {"language": "target", "learningHistory.mastered": False}
+    assert body["dictionaries"]["category"] == ["social", "work"]
+    assert body["lastLines"]["notes"] == ["[Source: Anki]", "[Source: CSV]"]
+    assert body["columns"]["learningHistory.interval"][0] is None
+    assert decode_columnar(body) == [without_nulls(entry) for entry in entries]
+
+
+def test_single_line_values_keep_their_text():
+    entries = [{"notes": "PT: a\n[Source: CSV]"}, {"notes": "b\n[Source: CSV]"},
+               {"notes": "c\n[Source: CSV]"}, {"notes": "single"}]
+
+    body = encode_columnar(entries)
+
+    assert body["columns"]["notes"][3] == ["single", None]
+    assert decode_columnar(body) == entries
+
+
+def test_empty_batch_round_trips():
+    assert decode_columnar(encode_columnar([])) == []
+
+
+@pytest.mark.parametrize("changes, message", [
+    ({"version": 2}, "Unsupported columnar version"),
+    ({"count": -1}, "non-negative integer"),
+    ({"columns": {"originalText": ["a"]}}, "must have 2 values"),
+    ({"dictionaries": {"category": ["work"]}, "columns": {"category": [0, 1]}}, "out of range"),
+    ({"lastLines": {"notes": ["x"]}, "columns": {"notes": ["plain", None]}}, "expected \\[text, lastLines index\\]"),
+])
+def test_malformed_batches_are_rejected(changes, message):
+    batch = {"format": "columnar", "version": 1, "count": 2, **changes}
+
+    with pytest.raises(ValueError, match=message):
+        decode_columnar(batch)
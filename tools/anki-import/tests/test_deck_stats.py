@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Deck analytics survive malformed learning history values."""
+import pytest
+
+from deck_stats import DeckColumns
+from validate_import import analyze_entries, summarize_partials
+from vocab_model import LearningHistory, LearningState, VocabEntry
+
+
+def wire(history):
+    return {"originalText": "apontado", "translation": "pointed", "category": "other", "learningHistory": history}
+
+
+GOOD = {"state": "review", "reviewCount": 3, "lapseCount": 1, "interval": 12, "easeFactor": 2.5, "mastered": False}
+MALFORMED = [
+    {**GOOD, "interval": "12"},
+    {**GOOD, "easeFactor": "high"},
+    {**GOOD, "reviewCount": True},
+    {**GOOD, "lapseCount": float("nan")},
+    {**GOOD, "lapseCount": 10 ** 30},
+    {**GOOD, "interval": 10 ** 400},
+    {**GOOD, "interval": [12]},
+]
+
+
+@pytest.mark.parametrize("use_numpy", [False, None])
+def test_malformed_wire_values_are_counted_not_fatal(use_numpy):
+    columns = DeckColumns.from_entries([wire(GOOD)] + [wire(h) for h in MALFORMED])
+
+    summary = columns.summarize(use_numpy=use_numpy)
+
+    assert summary["total"] == summary["withHistory"] == 1 + len(MALFORMED)
+    assert summary["invalidNumbers"] == len(MALFORMED)
+    # The three bad intervals count as 0 days
+    assert (summary["intervalHistogram"]["0d"], summary["intervalHistogram"]["7-29d"]) == (3, 5)
+
+
+def test_null_values_are_defaults_not_errors():
+    columns = DeckColumns.from_entries([wire({"state": "review", "interval": None, "easeFactor": None})])
+
+    summary = columns.summarize(use_numpy=False)
+
+    assert summary["invalidNumbers"] == 0
+    assert summary["easeDistribution"]["p50"] == 2.5
+
+
+def test_malformed_model_values_are_counted():
+    history = LearningHistory(state=LearningState.REVIEW, interval="12", ease_factor=None)
+    entry = VocabEntry("apontado", "pointed", None, None, learning_history=history)
+
+    columns = DeckColumns.from_entries([entry])
+
+    assert columns.invalid_numbers == 1
+    assert columns.summarize(use_numpy=False)["withHistory"] == 1
+
+
+def test_validation_reports_what_the_stats_skipped():
+    partials = [analyze_entries(enumerate([wire(GOOD), wire(MALFORMED[0])], 1))]
+    partials.append(analyze_entries([(3, wire(MALFORMED[1]))]))
+
+    stats, errors = summarize_partials(partials)
+
+    assert stats["distributions"]["invalidNumbers"] == 2
+    assert "Entry 2: learningHistory.interval must be a number" in errors
+    assert "Entry 3: learningHistory.easeFactor must be a number" in errors
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""entry_index must accept and number entries exactly as json.load does."""
+import json
+
+import pytest
+
+from entry_index import IndexedReader, scan_offsets
+
+ENTRY = {"originalText": "ação ]", "translation": "a \"quoted\" [x]", "learningHistory": {"interval": [1, {"y": "}"}]}}
+TEXT = json.dumps(ENTRY, ensure_ascii=False)
+
+
+def scanned_items(text: str):
+    buf = text.encode("utf-8")
+    starts, ends = scan_offsets(buf)
+    return [json.loads(buf[start:end]) for start, end in zip(starts, ends)]
+
+
+@pytest.mark.parametrize("text", [
+    f"[{TEXT}, {TEXT}]",
+    f" \n[ {TEXT} ,\n{TEXT} ]\n ",
+    "[]",
+    "[ \n ]",
+    f'[1, "x", {TEXT}, [2], null, -1.5e3, true]',
+    '["a,b]", {"k": "[{"}]',
+])
+def test_valid_arrays_match_json_load(text):
+    assert scanned_items(text) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", [
+    f"[{TEXT} {TEXT}]",
+    f"[{TEXT}] junk",
+    f"[{TEXT},]",
+    f"[{TEXT},,{TEXT}]",
+    "[,1]",
+    "[tru]",
+    f"[{TEXT}",
+    '["abc',
+])
+def test_invalid_arrays_are_rejected_like_json_load(text):
+    with pytest.raises(ValueError):
+        json.loads(text)
+    with pytest.raises(ValueError):
+        scan_offsets(text.encode("utf-8"))
+
+
+def test_ndjson_lines():
+    assert scanned_items(f"{TEXT}\n\n{TEXT}\r\n") == [ENTRY, ENTRY]
+
+
+def test_reader_numbers_non_objects_like_json_load(tmp_path):
+    path = tmp_path / "import.json"
+    path.write_text(f'[1, "x", {TEXT}]', encoding="utf-8")
+
+    with IndexedReader(path) as reader:
+        assert len(reader) == 3
+        assert reader.get_dict(2) == ENTRY
+        assert [d for _, d in reader.iter_dicts(range(0, 2))] == [1, "x"]
+
+
+def test_index_is_rebuilt_when_the_file_changes(tmp_path):
+    path = tmp_path / "import.json"
+    path.write_text(f"[{TEXT}]", encoding="utf-8")
+    with IndexedReader(path) as reader:
+        assert len(reader) == 1
+
+    path.write_text(f"[{TEXT}, {TEXT}]", encoding="utf-8")
+    with IndexedReader(path) as reader:
+        assert len(reader) == 2
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""The example import files in the README must pass validation."""
+import json
+
+import pytest
+
+from conftest import TOOLS_DIR
+from validate_import import validate_entry
+
+EXAMPLES = sorted((TOOLS_DIR / "examples").glob("*.json"))
+
+
+@pytest.mark.parametrize("path", EXAMPLES, ids=lambda p: p.name)
+def test_example_entries_are_valid(path):
+    entries = json.loads(path.read_text(encoding="utf-8"))
+
+    assert entries
+    for number, entry in enumerate(entries, 1):
+        assert validate_entry(entry, number) == []
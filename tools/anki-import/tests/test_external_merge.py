@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""merge_datasets_external() writes the same file as the in-memory merge."""
+import json
+import random
+
+import pytest
+
+import external_sort
+from merge_all_sources import merge_datasets, merge_datasets_external, save_merged_data, save_merged_stream
+from sources import make_sources
+
+
+def merged_in_memory(tmp_path, sheets, anki, csv_rows) -> bytes:
+    path = tmp_path / "in_memory.json"
+    save_merged_data(merge_datasets(sheets, anki, csv_rows), str(path))
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("run_size", [1, 7, 100_000])
+@pytest.mark.parametrize("seed", [1, 2])
+def test_external_merge_matches_in_memory_merge(tmp_path, classify_calls, seed, run_size):
+    sheets, anki, csv_rows = make_sources(seed, 200)
+    expected = merged_in_memory(tmp_path, sheets, anki, csv_rows)
+
+    path = tmp_path / "external.json"
+    sources, categories = merge_datasets_external(sheets, anki, csv_rows, str(path), run_size)
+
+    assert path.read_bytes() == expected
+    entries = json.loads(expected)
+    assert sum(sources.values()) == sum(categories.values()) == len(entries)
+
+
+def test_external_merge_of_empty_sources(tmp_path, classify_calls):
+    expected = merged_in_memory(tmp_path, [], [], [])
+
+    path = tmp_path / "external.json"
+    merge_datasets_external([], [], [], str(path))
+
+    assert path.read_bytes() == expected
+
+
+def test_stream_writer_matches_json_dump(tmp_path):
+    entries = [
+        {"word_pt": "casa", "word_en": "house", "source": "CSV", "category": "🏡 Daily Life"},
+        {"word_pt": "treino", "word_en": "workout", "source": "Anki", "category": "💪 Gym"},
+    ]
+    expected, actual = tmp_path / "dump.json", tmp_path / "stream.json"
+    save_merged_data(entries, str(expected))
+
+    sources, categories = save_merged_stream(entries, str(actual))
+
+    assert actual.read_bytes() == expected.read_bytes()
+    assert sources == {"CSV": 1, "Anki": 1}
+    assert categories == {"🏡 Daily Life": 1, "💪 Gym": 1}
+
+
+def test_sort_merges_in_several_passes_beyond_the_fan_in(tmp_path, monkeypatch):
+    monkeypatch.setattr(external_sort, "MAX_FAN_IN", 3)
+    rng = random.Random(5)
+    records = [[rng.randrange(50), i] for i in range(200)]
+
+    ordered = list(external_sort.sort_records(records, tmp_path, key=lambda r: r, run_size=4))
+
+    assert ordered == sorted(records)
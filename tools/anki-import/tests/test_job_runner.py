@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""FairScheduler fairness, failed loads and request IDs in the job runner."""
+from pathlib import Path
+
+from job_runner import FairScheduler, ImportJob, build_report, load_jobs, run_jobs
+from request_timing import RequestTimings
+from stub_server import start_stub_server
+
+
+def job(user_id, entries, batch_size=2, name="deck.json"):
+    wire = [{"originalText": f"{user_id}-{i}", "userId": user_id} for i in range(entries)]
+    return ImportJob(Path(name), user_id, wire, list(range(entries)), batch_size)
+
+
+def drain(scheduler):
+    """User of each batch, in hand-out order, releasing every batch right away."""
+    order = []
+    while True:
+        taken = scheduler.acquire()
+        if taken is None:
+            return order
+        order.append(taken[0].user_id)
+        scheduler.release(taken[0])
+
+
+def test_batches_alternate_between_users():
+    scheduler = FairScheduler([job("big", 10), job("small", 2), job("mid", 4)], max_per_user=1)
+
+    assert drain(scheduler) == ["big", "small", "mid", "big", "mid", "big", "big", "big"]
+
+
+def test_one_user_with_many_files_does_not_starve_others():
+    jobs = [job("alice", 4, name="a1.json"), job("alice", 4, name="a2.json"), job("bob", 4)]
+
+    order = drain(FairScheduler(jobs, max_per_user=1))
+
+    assert order[:4] == ["alice", "bob", "alice", "bob"]
+    assert order.count("alice") == 4
+
+
+def test_in_flight_cap_skips_busy_users():
+    scheduler = FairScheduler([job("alice", 6), job("bob", 6)], max_per_user=1)
+
+    first = scheduler.acquire()
+    second = scheduler.acquire()
+
+    assert (first[0].user_id, second[0].user_id) == ("alice", "bob")
+    scheduler.release(first[0])
+    assert scheduler.acquire()[0].user_id == "alice"
+
+
+def test_jobs_finish_when_their_last_batch_is_released():
+    only = job("alice", 3)
+    scheduler = FairScheduler([only], max_per_user=2)
+
+    batches = [scheduler.acquire(), scheduler.acquire()]
+    assert [b[3] for b in batches] == [1, 2]
+    assert scheduler.acquire() is None
+
+    scheduler.release(only)
+    assert only.finished is None
+    scheduler.release(only)
+    assert only.finished is not None
+
+
+def test_abort_stops_handing_out_batches():
+    scheduler = FairScheduler([job("alice", 6), job("bob", 2)], max_per_user=1)
+
+    scheduler.abort_user("alice", "401 Unauthorized")
+
+    assert drain(scheduler) == ["bob"]
+    assert scheduler.queues["alice"][0].finished is not None
+
+
+def test_unloadable_file_is_a_failed_job_in_the_report(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text('[{"originalText": "a",', encoding="utf-8")
+
+    jobs = load_jobs([broken], batch_size=2)
+    report = build_report(jobs, duration=1.0)
+
+    assert [job.has_pending() for job in jobs] == [False]
+    assert report["jobs"][0]["aborted"].startswith("load failed: ")
+    assert report["failedFiles"] == [{"file": str(broken), "error": jobs[0].load_error}]
+    assert report["users"] == {}
+
+
+def test_requests_carry_run_and_batch_ids():
+    server = start_stub_server()
+    try:
+        jobs = [job("123e4567-e89b-42d3-a456-426614174000", 3), job("223e4567-e89b-42d3-a456-426614174000", 2)]
+        for entry in jobs[0].entries + jobs[1].entries:
+            entry["translation"] = "x"
+        timings = RequestTimings("imp-test")
+
+        duration = run_jobs(jobs, server.api_url, workers=2, timings=timings)
+        report = build_report(jobs, duration, timings)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sorted(t.request_id for t in timings.requests) == [
+        "imp-test-j001-b0001", "imp-test-j001-b0002", "imp-test-j002-b0001",
+    ]
+    assert all(t.status == 200 and "total" in t.server for t in timings.requests)
+    assert report["runId"] == "imp-test"
+    assert len(report["requestTimings"]) == 3
+    assert report["totals"]["imported"] == 5
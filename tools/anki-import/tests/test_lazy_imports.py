@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""CLIs start without importing optional or heavy dependencies."""
+import subprocess
+import sys
+
+import pytest
+
+from bench_startup import CLIS, bench_env
+
+# Imported only where they are used (requests, Sheets, classification, profiling)
+LAZY_MODULES = ["urllib.request", "google_sheets", "gspread", "transform_inbox_to_csv", "cProfile", "pstats", "tracemalloc"]
+
+
+@pytest.mark.parametrize("module, script", CLIS, ids=[module for module, _ in CLIS])
+def test_import_leaves_heavy_modules_unloaded(module, script):
+    code = f"import sys, {module}; print(' '.join(sorted(set(sys.modules) & set({LAZY_MODULES!r}))))"
+
+    result = subprocess.run([sys.executable, "-c", code], env=bench_env(), capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == []
+
+
+@pytest.mark.parametrize("module, script", CLIS, ids=[module for module, _ in CLIS])
+def test_help_runs(module, script):
+    result = subprocess.run([sys.executable, str(script), "--help"], env=bench_env(), capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert "usage:" in result.stdout
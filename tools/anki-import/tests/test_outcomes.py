@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Every input entry gets exactly one outcome, mapped back to its file index."""
+import json
+
+from outcomes import (
+    FAILED,
+    IMPORTED,
+    REJECTED,
+    RESEND_STATUSES,
+    SKIPPED_DUPLICATE,
+    UNCONFIRMED,
+    OutcomeRecorder,
+    batch_error_count,
+    load_outcomes,
+    select_indices,
+)
+
+BATCH = [{"originalText": "a"}, {"originalText": "b"}, {"originalText": ""}]
+INDICES = [10, 11, 12]
+
+
+def statuses(recorder):
+    return {index: outcome["status"] for index, outcome in recorder.outcomes.items()}
+
+
+def test_results_map_to_input_indices():
+    recorder = OutcomeRecorder()
+
+    recorder.record_batch_response(INDICES, BATCH, {"results": [
+        {"index": 0, "status": IMPORTED},
+        {"index": 1, "status": SKIPPED_DUPLICATE},
+        {"index": 2, "status": REJECTED, "reason": "Missing originalText or translation"},
+    ]})
+
+    assert statuses(recorder) == {10: IMPORTED, 11: SKIPPED_DUPLICATE, 12: REJECTED}
+    assert recorder.outcomes[12]["reason"] == "Missing originalText or translation"
+
+
+def test_unreported_or_invalid_results_are_unconfirmed():
+    recorder = OutcomeRecorder()
+
+    recorder.record_batch_response(INDICES, BATCH, {"results": [
+        {"index": 0, "status": "stored"},
+        {"index": 7, "status": IMPORTED},
+        {"index": "1", "status": IMPORTED},
+    ]})
+
+    assert statuses(recorder) == {10: UNCONFIRMED, 11: UNCONFIRMED, 12: UNCONFIRMED}
+
+
+def test_responses_without_results_are_unconfirmed():
+    recorder = OutcomeRecorder()
+
+    recorder.record_batch_response(INDICES, BATCH, {"imported": 3})
+
+    assert set(statuses(recorder).values()) == {UNCONFIRMED}
+
+
+def test_failures_and_aborted_entries_are_failed():
+    recorder = OutcomeRecorder()
+    recorder.record_batch_failure(INDICES[:1], BATCH[:1], "HTTP 500")
+
+    recorder.fill_missing(INDICES, BATCH, "Import aborted")
+
+    assert statuses(recorder) == {10: FAILED, 11: FAILED, 12: FAILED}
+    assert recorder.outcomes[10]["reason"] == "HTTP 500"
+    assert recorder.outcomes[11]["reason"] == "Import aborted"
+
+
+def test_manifest_round_trip_selects_entries_to_resend(tmp_path):
+    recorder = OutcomeRecorder()
+    recorder.record(3, {"originalText": "c"}, FAILED, "timeout")
+    recorder.record(1, {"originalText": "a"}, IMPORTED)
+    recorder.record(2, {"originalText": "b"}, UNCONFIRMED)
+    recorder.record(0, {"originalText": ""}, REJECTED, "Missing originalText")
+    path = tmp_path / "outcomes.jsonl"
+
+    recorder.write(path)
+    outcomes = load_outcomes(path)
+
+    assert [o["index"] for o in outcomes] == [0, 1, 2, 3]
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[1]) == {
+        "index": 1, "originalText": "a", "status": IMPORTED,
+    }
+    assert select_indices(outcomes, RESEND_STATUSES) == [2, 3]
+    assert select_indices(outcomes, RESEND_STATUSES | {REJECTED}) == [0, 2, 3]
+
+
+def test_batch_error_count_prefers_error_count():
+    assert batch_error_count({"errorCount": 12, "errors": ["x"] * 10}, 50) == 12
+    assert batch_error_count({"errors": 4}, 50) == 4
+    assert batch_error_count({"imported": 40, "skipped": 7, "errors": ["x"]}, 50) == 3
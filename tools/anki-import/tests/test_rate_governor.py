@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Token buckets and the governor's 429 backoff/recovery (AIMD)."""
+import time
+
+import pytest
+
+import rate_governor
+from rate_governor import DECREASE_FACTOR, INCREASE_FRACTION, RateGovernor, TokenBucket
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record sleeps instead of sleeping."""
+    slept = []
+    monkeypatch.setattr(rate_governor.time, "sleep", slept.append)
+    return slept
+
+
+def test_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=2, capacity=2)
+    now = bucket.updated
+
+    assert [bucket.reserve(1, now) for _ in range(3)] == [0.0, 0.0, 0.5]
+    assert bucket.reserve(1, now + 1.0) == 0.0
+
+
+def test_429_halves_the_rate_and_pauses_for_retry_after(sleeps):
+    governor = RateGovernor(requests_per_second=2)
+    governor.acquire()
+
+    governor.observe(429, {"Retry-After": "30"})
+
+    assert governor.requests.rate == 2 * DECREASE_FACTOR
+    assert governor.throttled == 1
+    governor.acquire()
+    assert sleeps and sleeps[-1] == pytest.approx(30, abs=1)
+
+
+def test_rate_recovers_additively_up_to_the_ceiling(sleeps):
+    governor = RateGovernor(requests_per_second=2)
+    governor.observe(429, {"Retry-After": "0"})
+    rates = []
+
+    for _ in range(30):
+        governor.observe(200, {})
+        rates.append(governor.requests.rate)
+
+    assert rates[0] == pytest.approx(1 + 2 * INCREASE_FRACTION)
+    assert rates == sorted(rates)
+    assert rates[-1] == 2
+
+
+def test_learns_the_ceiling_from_rate_limit_headers():
+    governor = RateGovernor()
+
+    governor.observe(200, {"X-RateLimit-Limit": "30", "X-RateLimit-Remaining": "29"})
+
+    assert governor.ceiling == pytest.approx(0.5)
+    assert governor.requests.rate == pytest.approx(0.5)
+
+
+def test_exhausted_window_blocks_until_reset(sleeps):
+    governor = RateGovernor()
+    reset = time.time() + 20
+
+    governor.observe(200, {"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+    governor.acquire()
+
+    assert sleeps[-1] == pytest.approx(20, abs=1)
+
+
+def test_429_without_limit_headers_probes_back_up(sleeps):
+    governor = RateGovernor()
+
+    governor.observe(429, {})
+    throttled_rate = governor.requests.rate
+    governor.observe(200, {})
+
+    assert governor.requests.rate > throttled_rate
+
+
+def test_learning_can_be_disabled():
+    governor = RateGovernor(requests_per_second=2, learn=False)
+
+    governor.observe(429, {"Retry-After": "30"})
+
+    assert governor.requests.rate == 2
+    assert governor.blocked_until == 0.0
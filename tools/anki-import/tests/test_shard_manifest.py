@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Shards are valid import files within their bounds, and the manifest catches damage."""
+import json
+
+import pytest
+
+from shard_manifest import manifest_path_for, manifest_shards, write_shards
+
+
+def encoded(entries, group_by=None):
+    return [
+        (entry.get(group_by) if group_by else None, json.dumps(entry, ensure_ascii=False, indent=2).encode("utf-8"))
+        for entry in entries
+    ]
+
+
+def make_entries(count, categories=("work",)):
+    return [
+        {"originalText": f"palavra{i}", "category": categories[i * len(categories) // count], "notes": "ç" * (i % 5)}
+        for i in range(count)
+    ]
+
+
+def read_shards(paths):
+    entries = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            entries.extend(json.load(f))
+    return entries
+
+
+def test_shards_hold_all_entries_within_max_entries(tmp_path):
+    entries = make_entries(10)
+
+    manifest = write_shards(encoded(entries), tmp_path, "export", max_entries=4)
+    shards, problems = manifest_shards(manifest_path_for(tmp_path, "export"))
+
+    assert problems == []
+    assert [shard["entries"] for shard in manifest["shards"]] == [4, 4, 2]
+    assert manifest["totalEntries"] == 10
+    assert read_shards(shards) == entries
+
+
+def test_single_shard_is_byte_identical_to_json_dump(tmp_path):
+    entries = make_entries(3)
+
+    manifest = write_shards(encoded(entries), tmp_path, "export")
+
+    shard = tmp_path / manifest["shards"][0]["file"]
+    assert shard.read_bytes() == json.dumps(entries, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+@pytest.mark.parametrize("max_bytes", [1, 200, 600])
+def test_shards_stay_under_max_bytes(tmp_path, max_bytes):
+    entries = make_entries(12)
+
+    manifest = write_shards(encoded(entries), tmp_path, "export", max_bytes=max_bytes)
+    shards, _ = manifest_shards(manifest_path_for(tmp_path, "export"))
+
+    for shard in manifest["shards"]:
+        assert shard["bytes"] <= max_bytes or shard["entries"] == 1
+        assert (tmp_path / shard["file"]).stat().st_size == shard["bytes"]
+    assert read_shards(shards) == entries
+
+
+def test_groups_are_never_mixed(tmp_path):
+    entries = make_entries(9, categories=("social", "work", "food"))
+
+    manifest = write_shards(encoded(entries, "category"), tmp_path, "export", max_entries=2, group_by="category")
+
+    for shard in manifest["shards"]:
+        with open(tmp_path / shard["file"], "r", encoding="utf-8") as f:
+            assert {entry["category"] for entry in json.load(f)} == {shard["group"]}
+    assert manifest["shards"][0]["file"] == "export_social_001.json"
+
+
+def test_damaged_or_missing_shards_are_reported(tmp_path):
+    write_shards(encoded(make_entries(6)), tmp_path, "export", max_entries=2)
+    (tmp_path / "export_001.json").write_bytes(b"[]")
+    damaged = tmp_path / "export_002.json"
+    damaged.write_bytes(damaged.read_bytes().replace(b"palavra", b"palavrA"))
+    (tmp_path / "export_003.json").unlink()
+
+    shards, problems = manifest_shards(manifest_path_for(tmp_path, "export"))
+
+    assert shards == []
+    assert len(problems) == 3
+    assert problems[0].startswith("export_001.json: 2 bytes, manifest says ")
+    assert problems[1:] == ["export_002.json: sha256 mismatch", "export_003.json: missing"]
+
+
+def test_other_files_are_not_manifests(tmp_path):
+    path = tmp_path / "export.manifest.json"
+    path.write_text('{"version": 99}', encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Not a version 1 shard manifest"):
+        manifest_shards(path)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""The staging database merges like merge_datasets() and re-stages incrementally."""
+import pytest
+
+from merge_all_sources import merge_datasets, stage_datasets
+from sources import make_sources
+from staging_store import CSV_PRIORITY, StagingStore
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_merged_words_match_the_json_merge(tmp_path, classify_calls, seed):
+    sheets, anki, csv_rows = make_sources(seed, 300)
+
+    with StagingStore(tmp_path / "staging.db") as store:
+        stage_datasets(store, sheets, anki, csv_rows)
+        staged = list(store.iter_merged())
+
+    assert staged == merge_datasets(sheets, anki, csv_rows)
+
+
+def test_restaging_only_classifies_new_or_changed_rows(tmp_path, classify_calls):
+    rows = [
+        {"word_pt": "treino", "word_en": "workout"},
+        {"word_pt": "casa", "word_en": "house"},
+        {"word_pt": "banco", "word_en": "bank"},
+    ]
+
+    from transform_inbox_to_csv import classify_card
+
+    with StagingStore(tmp_path / "staging.db") as store:
+        first = store.stage_source("CSV", CSV_PRIORITY, rows, classify=classify_card)
+        assert first["added"] == 3 and len(classify_calls) == 3
+
+        changed = [rows[0], {**rows[1], "sentence_pt": "Uma casa."}]
+        second = store.stage_source("CSV", CSV_PRIORITY, changed, classify=classify_card)
+
+        assert (second["unchanged"], second["changed"], second["removed"]) == (1, 1, 1)
+        assert classify_calls[3:] == ["casa"]
+        assert [row["word_pt"] for row in store.iter_merged()] == ["treino", "casa"]
+
+
+def test_joined_rows_carry_anki_history(tmp_path):
+    history = {
+        ("treino", "workout"): {
+            "learningState": "review", "reviewCount": 4, "lapseCount": 0, "interval": 9,
+            "easeFactor": 2.5, "lastReviewed": "2026-01-02", "mastered": 1,
+            "queue": 2, "cardType": 2, "dueDate": None,
+        },
+    }
+
+    with StagingStore(tmp_path / "staging.db") as store:
+        store.stage_source("CSV", CSV_PRIORITY, [
+            {"word_pt": "Treino", "word_en": "Workout", "category": "💪 Gym"},
+            {"word_pt": "casa", "word_en": "house", "category": "🏡 Daily Life"},
+        ])
+        store.stage_anki_history(history)
+        joined = {row["word_pt"]: row["history"] for row in store.iter_joined()}
+
+    assert joined["Treino"]["reviewCount"] == 4
+    assert joined["Treino"]["mastered"] is True
+    assert joined["casa"] is None
+
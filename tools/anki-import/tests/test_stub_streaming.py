@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""NDJSON streaming imports give the same per-entry results as JSON batches."""
+import json
+
+import pytest
+
+from import_to_llyli import build_batch_body, post_body, post_stream
+from stub_server import NDJSON_BATCH_SIZE, StubConfig, StubState, start_stub_server
+
+
+def entries(count):
+    return [{"originalText": f"palavra{i % (count - 3)}", "translation": f"word{i}"} for i in range(count)]
+
+
+def lines(items):
+    return [json.dumps(item).encode("utf-8") for item in items]
+
+
+@pytest.fixture
+def server():
+    server = start_stub_server(StubConfig(seed=1))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_streamed_lines_match_a_single_batch():
+    items = entries(NDJSON_BATCH_SIZE * 2 + 7)
+
+    streamed = StubState(StubConfig()).import_lines("u", lines(items))
+    batched = StubState(StubConfig()).import_entries("u", items)
+
+    assert streamed == batched
+    assert [r["index"] for r in streamed["results"]] == list(range(len(items)))
+    assert streamed["skipped"] == 3
+
+
+def test_invalid_lines_are_rejected_in_place():
+    stream = [b'{"originalText": "a", "translation": "b"}', b"", b"{not json", b'{"originalText": "c"}']
+
+    data = StubState(StubConfig()).import_lines("u", stream)
+
+    assert data["total"] == 3
+    assert [(r["index"], r["status"]) for r in data["results"]] == [
+        (0, "imported"), (1, "rejected"), (2, "rejected"),
+    ]
+    assert data["results"][1]["reason"].startswith("Invalid JSON")
+    assert data["errorCount"] == 1 and data["errors"][0].startswith("Line 2: Invalid JSON")
+
+
+def test_chunked_upload_matches_json_batch(server):
+    items = entries(120)
+    endpoint = f"{server.api_url}/words/bulk-import"
+
+    streamed = post_stream(endpoint, lines(items), auth_cookie="streamed", chunk_bytes=100)
+    batched = post_body(endpoint, build_batch_body(lines(items), skip_duplicates=True), len(items), "batched")
+
+    assert streamed["data"]["results"] == batched["data"]["results"]
+    assert streamed["data"]["imported"] == 117
+    assert server.state.counters["entriesReceived"] == 240
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Most-urgent-first upload order."""
+from upload_priority import priority_order
+
+NOW = 1_768_900_000.0  # 2026-01-20
+
+
+def wire(text, state=None, last_reviewed=None, interval=0):
+    entry = {"originalText": text}
+    if state:
+        entry["learningHistory"] = {"state": state, "lastReviewed": last_reviewed, "interval": interval}
+    return entry
+
+
+def test_tiers_then_due_time_then_file_order():
+    entries = [
+        wire("new"),
+        wire("later", "review", "2026-01-19T00:00:00Z", 30),
+        wire("overdue", "review", "2026-01-01T00:00:00Z", 2),
+        wire("struggling", "struggling", "2026-01-10T00:00:00Z", 1),
+        wire("very overdue", "review", "2025-12-01T00:00:00Z", 2),
+        wire("new too"),
+    ]
+
+    ordered, indices = priority_order(entries, [10, 11, 12, 13, 14, 15], now=NOW)
+
+    assert [e["originalText"] for e in ordered] == [
+        "struggling", "very overdue", "overdue", "later", "new", "new too",
+    ]
+    assert indices == [13, 14, 12, 11, 10, 15]
+
+
+def test_small_window_keeps_tiers_in_order():
+    entries = [wire(f"new {i}") for i in range(3)] + [
+        wire(f"due {day}", "review", f"2026-01-{day:02d}T00:00:00Z", 1) for day in (9, 3, 7, 1, 5)
+    ] + [wire("struggling", "struggling", "2026-01-10T00:00:00Z", 1)]
+
+    ordered, _ = priority_order(entries, now=NOW, window=2)
+
+    names = [e["originalText"] for e in ordered]
+    assert names[0] == "struggling"
+    assert sorted(names[1:6]) == ["due 1", "due 3", "due 5", "due 7", "due 9"]
+    assert names[6:] == ["new 0", "new 1", "new 2"]
+    # A window of 2 holds back the two most urgent of the first three seen
+    assert names[1:6] == ["due 3", "due 1", "due 5", "due 7", "due 9"]
+
+
+def test_window_covering_the_tier_orders_exactly():
+    days = [9, 3, 7, 1, 5, 2, 8]
+    entries = [wire(f"due {day}", "review", f"2026-01-{day:02d}T00:00:00Z", 1) for day in days]
+
+    ordered, indices = priority_order(entries, now=NOW, window=len(days))
+
+    assert [e["originalText"] for e in ordered] == [f"due {day}" for day in sorted(days)]
+    assert indices == sorted(range(len(days)), key=lambda i: days[i])
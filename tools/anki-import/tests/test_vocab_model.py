@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""VocabEntry/LearningHistory wire parsing."""
+import io
+import json
+
+import pytest
+
+from deck_stats import DeckColumns
+from vocab_model import EntryErrors, LearningHistory, LearningState, VocabEntry, load_entries
+
+WIRE = {
+    "originalText": "apontado",
+    "translation": "pointed",
+    "language": "target",
+    "userId": "123e4567-e89b-42d3-a456-426614174000",
+    "category": "other",
+    "createdAt": "2025-12-15T00:00:00",
+}
+
+
+def test_null_history_fields_get_defaults():
+    history = LearningHistory.from_dict({
+        "state": "review",
+        "reviewCount": None,
+        "lapseCount": None,
+        "interval": None,
+        "easeFactor": None,
+        "lastReviewed": None,
+        "mastered": None,
+    })
+
+    assert history.state is LearningState.REVIEW
+    assert (history.review_count, history.lapse_count, history.interval) == (0, 0, 0)
+    assert history.ease_factor == 2.5
+    assert history.mastered is False
+
+
+def test_zero_values_are_kept():
+    history = LearningHistory.from_dict({"interval": 0, "easeFactor": 0, "mastered": False})
+
+    assert history.interval == 0
+    assert history.ease_factor == 0
+
+
+def test_entry_with_null_history_fields_feeds_deck_stats():
+    entry = VocabEntry.from_dict({**WIRE, "learningHistory": {"state": "review", "interval": None, "easeFactor": None}})
+    columns = DeckColumns()
+
+    columns.append_entry(entry)
+    columns.append_wire(entry.to_dict())
+
+    assert columns.summarize()["withHistory"] == 2
+
+
+def test_wire_round_trip():
+    wire = {**WIRE, "notes": "PT: x", "learningHistory": LearningHistory(interval=3).to_dict()}
+
+    assert VocabEntry.from_dict(wire).to_dict() == wire
+
+
+@pytest.mark.parametrize("history, field", [
+    ({"interval": "12"}, "learningHistory.interval"),
+    ({"easeFactor": "high"}, "learningHistory.easeFactor"),
+    ({"reviewCount": True}, "learningHistory.reviewCount"),
+    ({"lapseCount": [1]}, "learningHistory.lapseCount"),
+    ({"mastered": "yes"}, "learningHistory.mastered"),
+])
+def test_wrongly_typed_history_fields_name_the_field(history, field):
+    with pytest.raises(ValueError, match=field):
+        LearningHistory.from_dict(history)
+
+
+def test_load_reports_every_invalid_entry():
+    data = [
+        WIRE,
+        {**WIRE, "category": "sports"},
+        "not an entry",
+        {**WIRE, "learningHistory": {"interval": "soon"}},
+        WIRE,
+    ]
+
+    with pytest.raises(EntryErrors) as raised:
+        load_entries(io.StringIO(json.dumps(data)))
+
+    assert raised.value.errors == [
+        "Entry 2: Invalid category 'sports'",
+        "Entry 3: must be an object",
+        "Entry 4: learningHistory.interval must be a number, got 'soon'",
+    ]
+    assert str(raised.value).startswith("3 invalid entries: Entry 2: ")
+
+
+def test_missing_user_and_date_stay_missing():
+    wire = {key: value for key, value in WIRE.items() if key not in ("userId", "createdAt")}
+
+    entry = VocabEntry.from_dict(wire)
+
+    assert (entry.user_id, entry.created_at) == (None, None)
+    assert entry.to_dict() == wire
+    assert VocabEntry.from_dict({**wire, "userId": None}).to_dict() == wire
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Watch mode retries only failed batches, and only up to --max-attempts."""
+import argparse
+import json
+
+import pytest
+
+import watch_imports
+from outcomes import REJECTED
+from stub_server import StubConfig, start_stub_server
+from watch_imports import process_file
+
+USER_ID = "123e4567-e89b-42d3-a456-426614174000"
+
+
+def write_export(path, user_id=USER_ID, count=3):
+    entries = [
+        {"originalText": f"palavra{i}", "translation": f"word{i}", "language": "target", "userId": user_id,
+         "category": "other", "createdAt": "2026-01-16T22:45:22"}
+        for i in range(count)
+    ]
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
+
+
+def watch_args(api_url, max_attempts=3):
+    return argparse.Namespace(
+        api_url=api_url, batch_size=2, batch_workers=1, order="file", dry_run=False,
+        json_backend=None, outcomes_dir=None, retry_after=60.0, max_attempts=max_attempts,
+    )
+
+
+@pytest.fixture
+def failing_server():
+    server = start_stub_server(StubConfig(error_rate=1.0, seed=1))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_rejected_entries_are_final(tmp_path, monkeypatch):
+    def reject_all(jobs, *args, **kwargs):
+        for job in jobs:
+            for index, entry in zip(job.indices, job.entries):
+                job.recorder.record(index, entry, REJECTED, "Missing originalText or translation")
+            job.stats["errors"] += len(job.entries)
+        return 0.1
+
+    monkeypatch.setattr(watch_imports, "run_jobs", reject_all)
+    path = write_export(tmp_path / "export.json")
+
+    record = process_file(path, watch_args("http://127.0.0.1:9/api"))
+
+    assert record["status"] == "imported_with_errors"
+    assert (record["errors"], record["retryable"]) == (3, 0)
+    assert "retryAt" not in record
+
+
+def test_failed_batches_are_retried_until_max_attempts(tmp_path, failing_server):
+    path = write_export(tmp_path / "export.json")
+    args = watch_args(failing_server.api_url, max_attempts=2)
+
+    first = process_file(path, args)
+    second = process_file(path, args, previous=first)
+
+    assert (first["status"], first["attempts"], first["retryable"]) == ("failed", 1, 3)
+    assert first["retryAt"] > 0
+    assert (second["status"], second["attempts"]) == ("imported_with_errors", 2)
+    assert second["error"] == "gave up after 2 attempts"
+
+
+def test_a_changed_file_starts_counting_again(tmp_path, failing_server):
+    path = write_export(tmp_path / "export.json")
+    args = watch_args(failing_server.api_url, max_attempts=2)
+    first = process_file(path, args)
+
+    write_export(path, count=4)
+
+    assert process_file(path, args, previous=first)["attempts"] == 1
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Priority ordering for uploads: the cards a user needs first land first.
+
+Entries are ranked by tier, then by due time (lastReviewed + interval days),
+then by file position:
+
+    0 struggling   lapsing cards, most overdue first
+    1 due          review/learning cards whose due time has passed
+    2 scheduled    review/learning cards due later, soonest first
+    3 new          no learning history yet (file order)
+
+iter_prioritized() makes one pass to sort positions into a bucket per tier
+(compact arrays of positions and due times, no entry references), then
+yields the tiers in order, reading entries back by position. Inside a tier,
+due-time order comes from a heap of at most window items: exact for tiers
+up to window entries, approximate beyond that. The new tier needs no heap.
+Memory is 12 bytes per entry plus the window, so the entries can live on
+disk (any sequence with len() and [], e.g. a list or an mmap-backed reader).
+
+Usage:
+    entries, indices = priority_order(entries, indices)
+"""
+import heapq
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from vocab_model import AnyEntry, LearningState, VocabEntry
+
+TIER_STRUGGLING = 0
+TIER_DUE = 1
+TIER_SCHEDULED = 2
+TIER_NEW = 3
+TIER_NAMES = ["struggling", "due", "scheduled", "new"]
+ORDER_CHOICES = ["file", "priority"]
+
+SECONDS_PER_DAY = 86400
+DEFAULT_WINDOW = 50_000  # Heap items per tier; larger tiers come out approximately due-ordered
+
+PriorityKey = Tuple[int, float]
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Unix seconds for an ISO 8601 lastReviewed value (naive = UTC), or None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _history_fields(entry: AnyEntry) -> Optional[Tuple[str, Optional[str], float]]:
+    """(state, lastReviewed, interval) of an entry's learning history, or None."""
+    if isinstance(entry, VocabEntry):
+        history = entry.learning_history
+        if history is None:
+            return None
+        return history.state.value, history.last_reviewed, history.interval or 0
+
+    history = entry.get("learningHistory")
+    if not isinstance(history, dict) or not history:
+        return None
+    return history.get("state", "new"), history.get("lastReviewed"), history.get("interval") or 0
+
+
+def priority_key(entry: AnyEntry, now: float) -> PriorityKey:
+    """(tier, due unix seconds); lower sorts first."""
+    fields = _history_fields(entry)
+    if fields is None or fields[0] == LearningState.NEW.value:
+        return TIER_NEW, 0.0
+
+    state, last_reviewed, interval = fields
+    reviewed = parse_timestamp(last_reviewed)
+    due = reviewed + float(interval) * SECONDS_PER_DAY if reviewed is not None else 0.0
+
+    if state == LearningState.STRUGGLING.value:
+        return TIER_STRUGGLING, due
+    if due <= now:
+        return TIER_DUE, due
+    return TIER_SCHEDULED, due
+
+
+def _due_order(positions: array, dues: array, window: int) -> Iterator[int]:
+    """Positions by (due, position) through a heap of at most window items."""
+    heap: List[Tuple[float, int]] = []
+    for position, due in zip(positions, dues):
+        if len(heap) >= window:
+            yield heapq.heappushpop(heap, (due, position))[1]
+        else:
+            heapq.heappush(heap, (due, position))
+    while heap:
+        yield heapq.heappop(heap)[1]
+
+
+def iter_prioritized(
+    entries: Sequence[AnyEntry],
+    now: Optional[float] = None,
+    window: int = DEFAULT_WINDOW
+) -> Iterator[Tuple[int, AnyEntry]]:
+    """
+    Yield (position, entry) in priority order.
+
+    position is the entry's 0-based place in the input; ties keep input order.
+    Tiers are always in order; due time is exact within tiers of up to window
+    entries.
+    """
+    now = time.time() if now is None else now
+    positions = [array("I") for _ in TIER_NAMES]
+    dues = [array("d") for _ in TIER_NAMES]
+    for position in range(len(entries)):
+        tier, due = priority_key(entries[position], now)
+        positions[tier].append(position)
+        dues[tier].append(due)
+
+    for tier in range(len(TIER_NAMES)):
+        if tier == TIER_NEW:
+            ordered: Iterable[int] = positions[tier]
+        else:
+            ordered = _due_order(positions[tier], dues[tier], max(1, window))
+        for position in ordered:
+            yield position, entries[position]
+
+
+def priority_order(
+    entries: Sequence[AnyEntry],
+    indices: Optional[List[int]] = None,
+    now: Optional[float] = None,
+    window: int = DEFAULT_WINDOW
+) -> Tuple[List[AnyEntry], List[int]]:
+    """Entries and their input indices, reordered most urgent first."""
+    if indices is None:
+        indices = list(range(len(entries)))
+    ordered_entries = []
+    ordered_indices = []
+    for position, entry in iter_prioritized(entries, now=now, window=window):
+        ordered_entries.append(entry)
+        ordered_indices.append(indices[position])
+    return ordered_entries, ordered_indices
+
+
+def tier_counts(entries: Iterable[AnyEntry], now: Optional[float] = None) -> Dict[str, int]:
+    now = time.time() if now is None else now
+    counts = {name: 0 for name in TIER_NAMES}
+    for entry in entries:
+        counts[TIER_NAMES[priority_key(entry, now)[0]]] += 1
+    return counts
+
+
+def describe_order(entries: Iterable[AnyEntry], now: Optional[float] = None) -> str:
+    counts = tier_counts(entries, now)
+    return "Upload order: " + ", ".join(f"{counts[name]} {name}" for name in TIER_NAMES)
@@ -15,7 +15,12 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from deck_stats import DeckColumns, print_distributions
+from entry_index import IndexedReader
+from profiling import PhaseTimer, add_profiling_arguments, profiling_session
+from vocab_model import user_id_problem
 
 
 REQUIRED_FIELDS = ["originalText", "translation", "language", "userId", "category", "createdAt"]
@@ -63,6 +68,11 @@ def validate_entry(entry: Dict, index: int) -> List[str]:
     if "category" in entry and entry["category"] not in VALID_CATEGORIES:
         errors.append(f"Entry {index}: Invalid category '{entry['category']}'")
 
+    if entry.get("userId"):
+        problem = user_id_problem(entry["userId"])
+        if problem:
+            errors.append(f"Entry {index}: {problem[0].upper()}{problem[1:]}")
+
     # Validate learning history if present
     if "learningHistory" in entry:
         history = entry["learningHistory"]
@@ -72,25 +82,132 @@ def validate_entry(entry: Dict, index: int) -> List[str]:
             if "state" in history and history["state"] not in VALID_LEARNING_STATES:
                 errors.append(f"Entry {index}: Invalid learning state '{history['state']}'")
 
-            # Check numeric fields
-            for field in ["reviewCount", "lapseCount", "interval"]:
-                if field in history and not isinstance(history[field], (int, float)):
+            # Check numeric fields (null means the default)
+            for field in ["reviewCount", "lapseCount", "interval", "easeFactor"]:
+                value = history.get(field)
+                if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
                     errors.append(f"Entry {index}: learningHistory.{field} must be a number")
 
             # Check boolean fields
-            if "mastered" in history and not isinstance(history["mastered"], bool):
+            if history.get("mastered") is not None and not isinstance(history["mastered"], bool):
                 errors.append(f"Entry {index}: learningHistory.mastered must be boolean")
 
     return errors
 
 
-def validate_import_file(filepath: Path, verbose: bool = False) -> Dict:
+def analyze_entries(numbered_entries: Iterable[Tuple[int, Dict]]) -> Dict:
+    """Errors and partial stats for (1-based index, entry) pairs; mergeable across workers."""
+    partial = {
+        "errors": [],
+        "with_notes": 0,
+        "categories": set(),
+        "languages": set(),
+        "users": set(),
+        "columns": DeckColumns(),
+    }
+    for index, entry in numbered_entries:
+        if not isinstance(entry, dict):
+            partial["errors"].append(f"Entry {index}: Must be an object")
+            continue
+        partial["errors"].extend(validate_entry(entry, index))
+
+        # Collect stats (history counts are columnar reductions in summarize_partials)
+        partial["columns"].append_wire(entry)
+
+        if "notes" in entry and entry["notes"]:
+            partial["with_notes"] += 1
+
+        if "category" in entry:
+            partial["categories"].add(entry["category"])
+
+        if "language" in entry:
+            partial["languages"].add(entry["language"])
+
+        if "userId" in entry:
+            partial["users"].add(entry["userId"])
+
+    return partial
+
+
+def analyze_range(filepath: Path, start: int, stop: int) -> Dict:
+    """analyze_entries() over entries start..stop (0-based) of an indexed file; runs in a worker process."""
+    decoded = []
+    decode_errors = []
+    with IndexedReader(filepath, build=False) as reader:
+        for index in range(start, stop):
+            try:
+                decoded.append((index + 1, reader.get_dict(index)))
+            except ValueError as e:
+                decode_errors.append(f"Entry {index + 1}: Invalid JSON: {e}")
+
+    partial = analyze_entries(decoded)
+    partial["errors"] = decode_errors + partial["errors"]
+    return partial
+
+
+def summarize_partials(partials: List[Dict]) -> Tuple[Dict, List[str]]:
+    """Merge per-range results (in file order) into the stats dict and error list."""
+    columns = DeckColumns()
+    stats = {"with_notes": 0, "categories": set(), "languages": set(), "users": set()}
+    all_errors = []
+    for partial in partials:
+        all_errors.extend(partial["errors"])
+        columns.extend(partial["columns"])
+        stats["with_notes"] += partial["with_notes"]
+        for key in ("categories", "languages", "users"):
+            stats[key] |= partial[key]
+
+    summary = columns.summarize()
+    stats["with_history"] = summary["withHistory"]
+    stats["learning_states"] = summary["byState"]
+    stats["mastered"] = summary["mastered"]
+    stats["distributions"] = summary
+    return stats, all_errors
+
+
+def analyze_parallel(filepath: Path, workers: int) -> Tuple[int, List[Dict]]:
+    """Entry count and per-range partials, using a byte-offset index and one process per range."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with IndexedReader(filepath) as reader:
+        count = len(reader)
+        ranges = reader.ranges(workers)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [pool.submit(analyze_range, filepath, r.start, r.stop) for r in ranges]
+        return count, [future.result() for future in futures]
+
+
+def validate_import_file(
+    filepath: Path,
+    verbose: bool = False,
+    timer: Optional[PhaseTimer] = None,
+    workers: int = 1
+) -> Dict:
     """Validate complete import file."""
+    timer = timer or PhaseTimer(enabled=False)
     print(f"Validating: {filepath}")
     print("=" * 70)
 
+    if workers > 1:
+        # Workers parse their own ranges, so the file is never loaded as a whole
+        if not filepath.exists():
+            print(f"✗ FAILED: File not found: {filepath}")
+            return {"valid": False, "errors": [f"File not found: {filepath}"]}
+        try:
+            with timer.phase("analyze"):
+                count, partials = analyze_parallel(filepath, workers)
+                stats, all_errors = summarize_partials(partials)
+        except ValueError as e:
+            print(f"✗ FAILED: Invalid JSON: {e}")
+            return {"valid": False, "errors": [f"Invalid JSON: {e}"]}
+        print(f"✓ Valid JSON structure (indexed)")
+        print(f"✓ {count} entries found, validated in {len(partials)} ranges")
+        stats["total"] = count
+        return report_results(stats, all_errors)
+
     # Check file format
-    format_check = validate_file_format(filepath)
+    with timer.phase("load"):
+        format_check = validate_file_format(filepath)
     if not format_check["valid"]:
         print(f"✗ FAILED: {format_check['error']}")
         return {"valid": False, "errors": [format_check["error"]]}
@@ -100,43 +217,16 @@ def validate_import_file(filepath: Path, verbose: bool = False) -> Dict:
     print(f"✓ {len(data)} entries found")
 
     # Validate each entry
-    all_errors = []
-    stats = {
-        "total": len(data),
-        "with_history": 0,
-        "with_notes": 0,
-        "categories": set(),
-        "languages": set(),
-        "users": set(),
-        "learning_states": {"new": 0, "learning": 0, "review": 0, "struggling": 0},
-        "mastered": 0,
-    }
-
-    for index, entry in enumerate(data, 1):
-        errors = validate_entry(entry, index)
-        all_errors.extend(errors)
-
-        # Collect stats
-        if "learningHistory" in entry:
-            stats["with_history"] += 1
-            state = entry["learningHistory"].get("state", "new")
-            stats["learning_states"][state] = stats["learning_states"].get(state, 0) + 1
-            if entry["learningHistory"].get("mastered", False):
-                stats["mastered"] += 1
+    with timer.phase("analyze"):
+        partial = analyze_entries(enumerate(data, 1))
+        stats, all_errors = summarize_partials([partial])
 
-        if "notes" in entry and entry["notes"]:
-            stats["with_notes"] += 1
+    stats["total"] = len(data)
+    return report_results(stats, all_errors)
 
-        if "category" in entry:
-            stats["categories"].add(entry["category"])
 
-        if "language" in entry:
-            stats["languages"].add(entry["language"])
-
-        if "userId" in entry:
-            stats["users"].add(entry["userId"])
-
-    # Print validation results
+def report_results(stats: Dict, all_errors: List[str]) -> Dict:
+    """Print validation results and statistics."""
     print("\n" + "=" * 70)
     print("VALIDATION RESULTS")
     print("=" * 70)
@@ -173,6 +263,7 @@ def validate_import_file(filepath: Path, verbose: bool = False) -> Dict:
         for state, count in sorted(stats['learning_states'].items()):
             if count > 0:
                 print(f"  - {state}: {count}")
+        print_distributions(stats["distributions"])
 
     print("\n" + "=" * 70)
     print("✓ Ready to import!")
@@ -181,6 +272,20 @@ def validate_import_file(filepath: Path, verbose: bool = False) -> Dict:
     return {"valid": True, "errors": [], "stats": stats}
 
 
+def show_entries(filepath: Path, numbers: List[int]) -> None:
+    """Print single entries by number, read straight from their byte offsets."""
+    try:
+        with IndexedReader(filepath) as reader:
+            for number in numbers:
+                if not 1 <= number <= len(reader):
+                    print(f"\n✗ Entry {number} out of range (1-{len(reader)})")
+                    continue
+                print(f"\nEntry {number}:")
+                print(reader.raw(number - 1).decode("utf-8"))
+    except ValueError as e:
+        print(f"\n✗ Cannot index {filepath}: {e}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Validate Anki import files for LLYLI"
@@ -195,10 +300,29 @@ def main():
         action="store_true",
         help="Show detailed validation output"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Validate disjoint entry ranges in N processes via a byte-offset index (default: 1)"
+    )
+    parser.add_argument(
+        "--show-entry",
+        type=int,
+        action="append",
+        default=[],
+        metavar="N",
+        help="Also print entry N as numbered in the errors (repeatable)"
+    )
+    add_profiling_arguments(parser)
 
     args = parser.parse_args()
 
-    result = validate_import_file(args.filepath, args.verbose)
+    with profiling_session(args) as timer:
+        result = validate_import_file(args.filepath, args.verbose, timer, workers=args.workers)
+
+    if args.show_entry and args.filepath.exists():
+        show_entries(args.filepath, args.show_entry)
 
     if not result["valid"]:
         print(f"\n✗ Validation failed. Fix errors before importing.")
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Watch the imports folder and import new export files automatically.
+
+Polls the directory (one scandir + stat per file per poll) and treats a
+file as complete once its mtime and size have not changed for --settle
+seconds. Complete files are validated and imported by a bounded worker
+pool; at most --workers files are in flight and the rest wait their turn.
+
+Processed files are remembered in a state file (by mtime/size), so a
+restart does not re-import them. A file that is rewritten is imported
+again; an invalid one waits until it changes. A file with failed outcomes
+(API down, HTTP errors: batches that never reached the database) is retried
+after --retry-after seconds, at most --max-attempts times. Entries the API
+rejected or skipped are final, so a file whose only errors are those is
+marked "imported_with_errors" and not retried.
+
+Usage:
+    python3 watch_imports.py                        # watch imports/ until Ctrl+C
+    python3 watch_imports.py --workers 2 --settle 3
+    python3 watch_imports.py --once                 # import what is there, then exit
+"""
+import argparse
+import fnmatch
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from job_runner import build_report, load_credentials, log, print_lock, run_jobs, split_jobs, write_outcomes
+from outcomes import FAILED
+from rate_governor import RateGovernor, add_rate_arguments, governor_from_args
+from request_timing import RequestTimings
+from serialization import BACKEND_CHOICES
+from shard_manifest import MANIFEST_SUFFIX
+from upload_priority import ORDER_CHOICES
+from validate_import import validate_entry, validate_file_format
+from vocab_model import entries_from_dicts
+
+DEFAULT_DIR = Path(__file__).resolve().parent / "imports"
+DEFAULT_PATTERN = "llyli_with_history_*.json"
+STATE_FILE_NAME = ".watch_state.json"
+DEFAULT_MAX_ATTEMPTS = 5
+
+Signature = Tuple[int, int]  # (mtime_ns, size)
+
+
+class FolderWatcher:
+    """
+    Tracks candidate files and reports the ones that are ready to import.
+
+    A file is ready when its signature has been stable for settle seconds
+    and differs from the one last processed (or its retry time has come).
+    """
+
+    def __init__(self, directory: Path, pattern: str, settle: float, state: Dict[str, Dict]):
+        self.directory = directory
+        self.pattern = pattern
+        self.settle = settle
+        self.state = state
+        self.seen: Dict[str, Tuple[Signature, float]] = {}
+
+    def scan(self, now: float, busy: set) -> Tuple[List[Path], Optional[float]]:
+        """
+        Ready files (oldest first) and seconds until the next one may settle.
+
+        The second value is None when nothing is waiting to settle.
+        """
+        current: Dict[str, Signature] = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    # Shard manifests match the export pattern but are not import files
+                    if item.name.endswith(MANIFEST_SUFFIX) or not fnmatch.fnmatch(item.name, self.pattern):
+                        continue
+                    if item.is_file():
+                        st = item.stat()
+                        current[item.name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+
+        for name in list(self.seen):
+            if name not in current:
+                del self.seen[name]
+
+        ready = []
+        next_check = None
+        for name, signature in current.items():
+            previous = self.seen.get(name)
+            if previous is None or previous[0] != signature:
+                # An mtime already older than the settle window counts as stable time
+                self.seen[name] = (signature, min(now, signature[0] / 1e9))
+            since = self.seen[name][1]
+
+            if name in busy or not self.needs_import(name, signature, now):
+                continue
+
+            remaining = self.settle - (now - since)
+            if remaining <= 0:
+                ready.append((signature[0], self.directory / name))
+            else:
+                next_check = remaining if next_check is None else min(next_check, remaining)
+
+        return [path for _, path in sorted(ready)], next_check
+
+    def needs_import(self, name: str, signature: Signature, now: float) -> bool:
+        record = self.state.get(name)
+        if record is None or tuple(record["signature"]) != signature:
+            return True
+        return record["status"] == "failed" and now >= record.get("retryAt", 0)
+
+
+def load_state(path: Path) -> Dict[str, Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        log(f"⚠️  Ignoring unreadable state file {path}: {e}")
+        return {}
+
+
+def save_state(path: Path, state: Dict[str, Dict]) -> None:
+    """Write via a temp file so a crash never leaves a truncated state file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def file_signature(path: Path) -> Signature:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def attempt_number(previous: Optional[Dict], signature: Signature) -> int:
+    """1 for a new or changed file, one more than last time for a retry."""
+    if previous is None or tuple(previous.get("signature", ())) != signature:
+        return 1
+    return previous.get("attempts", 1) + 1
+
+
+def failed_record(record: Dict, attempts: int, max_attempts: int, retry_after: float) -> Dict:
+    """Mark a record failed and schedule a retry, or give up after max_attempts."""
+    if attempts >= max_attempts:
+        record["status"] = "imported_with_errors"
+        record.setdefault("error", f"gave up after {attempts} attempts")
+    else:
+        record["status"] = "failed"
+        record["retryAt"] = time.time() + retry_after
+    return record
+
+
+def process_file(
+    path: Path,
+    args,
+    governor: Optional[RateGovernor] = None,
+    credentials: Optional[Dict[str, str]] = None,
+    previous: Optional[Dict] = None
+) -> Dict:
+    """
+    Validate and import one file; returns the state record for it.
+
+    previous is the file's last state record, used to count attempts.
+    """
+    signature = file_signature(path)
+    attempts = attempt_number(previous, signature)
+    record = {
+        "signature": list(signature),
+        "processedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "attempts": attempts,
+    }
+
+    format_check = validate_file_format(path)
+    if not format_check["valid"]:
+        log(f"✗ {path.name}: {format_check['error']}")
+        return {**record, "status": "invalid", "error": format_check["error"]}
+
+    data = format_check["data"]
+    errors = []
+    for index, entry in enumerate(data, 1):
+        errors.extend(validate_entry(entry, index))
+    if errors:
+        log(f"✗ {path.name}: {len(errors)} validation errors (fix the file to retry)")
+        for error in errors[:5]:
+            log(f"    {error}")
+        return {**record, "status": "invalid", "error": f"{len(errors)} validation errors"}
+
+    jobs = split_jobs(path, list(entries_from_dicts(data)), args.batch_size, credentials, args.order)
+    del data, format_check  # Only the jobs' entries are needed from here on
+    log(f"→ {path.name}: {sum(len(job.entries) for job in jobs)} entries, {len(jobs)} user(s)")
+
+    timings = None if args.dry_run else RequestTimings()
+    duration = run_jobs(
+        jobs,
+        args.api_url,
+        workers=args.batch_workers,
+        dry_run=args.dry_run,
+        json_backend=args.json_backend,
+        governor=governor,
+        timings=timings,
+    )
+    if timings is not None:
+        record["runId"] = timings.run_id  # Finds the file's requests in the API logs
+    totals = build_report(jobs, duration)["totals"]
+    if args.outcomes_dir:
+        with print_lock:  # Keep the manifest summary lines together
+            write_outcomes(jobs, args.outcomes_dir)
+
+    retryable = sum(
+        1 for job in jobs for outcome in job.recorder.outcomes.values() if outcome["status"] == FAILED
+    )
+    record.update(retryable=retryable, **{key: totals[key] for key in ("total", "imported", "skipped", "errors")})
+    if retryable:
+        failed_record(record, attempts, args.max_attempts, args.retry_after)
+    else:
+        record["status"] = "imported" if totals["errors"] == 0 else "imported_with_errors"
+
+    mark = "✓" if record["status"] == "imported" else "✗"
+    log(f"{mark} {path.name}: {totals['imported']} imported, {totals['skipped']} skipped, "
+        f"{totals['errors']} errors, {retryable} to retry ({duration:.1f}s, {record['status']})")
+    return record
+
+
+def watch(args) -> int:
+    state_path = args.state or args.directory / STATE_FILE_NAME
+    state = load_state(state_path)
+    watcher = FolderWatcher(args.directory, args.pattern, args.settle, state)
+
+    stop = threading.Event()
+    wake = threading.Event()
+
+    def request_stop(*_):
+        stop.set()
+        wake.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    busy: Dict[str, Future] = {}
+    governor = governor_from_args(args)  # Shared: the server's limit covers all files
+    credentials = load_credentials(args.credentials) if args.credentials else None
+    failures = 0
+    idle_interval = args.interval
+
+    log(f"Watching {args.directory}/{args.pattern} "
+        f"(settle {args.settle:g}s, {args.workers} worker(s){', DRY RUN' if args.dry_run else ''})")
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        while not stop.is_set():
+            now = time.time()
+
+            for name, future in list(busy.items()):
+                if future.done():
+                    del busy[name]
+                    try:
+                        state[name] = future.result()
+                    except Exception as e:
+                        log(f"✗ {name}: {e}")
+                        signature = watcher.seen.get(name, ((0, 0), 0))[0]
+                        attempts = attempt_number(state.get(name), signature)
+                        state[name] = failed_record(
+                            {"signature": list(signature), "attempts": attempts, "error": str(e)},
+                            attempts,
+                            args.max_attempts,
+                            args.retry_after,
+                        )
+                    if state[name]["status"] != "imported":
+                        failures += 1
+                    if not args.dry_run:
+                        save_state(state_path, state)
+
+            ready, next_settle = watcher.scan(now, set(busy))
+            for path in ready[:max(0, args.workers - len(busy))]:
+                future = pool.submit(process_file, path, args, governor, credentials, state.get(path.name))
+                future.add_done_callback(lambda _: wake.set())
+                busy[path.name] = future
+
+            if args.once and not busy and not ready and next_settle is None:
+                break
+
+            # Poll fast while something is settling or importing, back off when idle
+            if ready or busy or next_settle is not None:
+                idle_interval = args.interval
+                timeout = min(args.interval, next_settle) if next_settle is not None else args.interval
+            else:
+                timeout = idle_interval
+                idle_interval = min(idle_interval * 2, args.max_interval)
+
+            wake.wait(timeout)
+            wake.clear()
+
+        if busy:
+            log(f"Waiting for {len(busy)} in-flight file(s)...")
+    for name, future in busy.items():
+        try:
+            state[name] = future.result()
+        except Exception as e:
+            log(f"✗ {name}: {e}")
+    if not args.dry_run:  # A dry run must not mark files as imported
+        save_state(state_path, state)
+
+    log("Stopped watching")
+    return 1 if args.once and failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch the imports folder and auto-import new LLYLI export files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Watch tools/anki-import/imports/ until Ctrl+C
+    python3 watch_imports.py
+
+    # Import whatever is complete now, then exit (cron)
+    python3 watch_imports.py --once
+        """
+    )
+    parser.add_argument("directory", type=Path, nargs="?", default=DEFAULT_DIR, help="Folder to watch (default: imports/)")
+    parser.add_argument("--pattern", type=str, default=DEFAULT_PATTERN, help=f"File name glob (default: {DEFAULT_PATTERN})")
+    parser.add_argument(
+        "--api-url",
+        type=str,
+        default="http://localhost:3000/api",
+        help="LLYLI API URL (default: http://localhost:3000/api)"
+    )
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds mtime/size must be unchanged (default: 2)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Poll interval while active (default: 1s)")
+    parser.add_argument("--max-interval", type=float, default=5.0, help="Poll interval when idle (default: 5s)")
+    parser.add_argument("--workers", type=int, default=2, help="Files imported concurrently (default: 2)")
+    parser.add_argument("--batch-workers", type=int, default=2, help="Concurrent requests per file (default: 2)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Entries per request (default: 50)")
+    parser.add_argument("--retry-after", type=float, default=60.0, help="Seconds before retrying a failed file (default: 60)")
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"Imports of an unchanged file before giving up on its failed batches (default: {DEFAULT_MAX_ATTEMPTS})"
+    )
+    parser.add_argument("--state", type=Path, default=None, help=f"State file (default: <directory>/{STATE_FILE_NAME})")
+    parser.add_argument("--outcomes-dir", type=Path, default=None, help="Write one outcome manifest per file here")
+    parser.add_argument(
+        "--credentials",
+        type=Path,
+        default=None,
+        help="JSON object mapping userId to that user's session Cookie header (see job_runner.py)"
+    )
+    parser.add_argument(
+        "--order",
+        type=str,
+        default="file",
+        choices=ORDER_CHOICES,
+        help="Upload order: file, or priority (struggling/overdue first)"
+    )
+    parser.add_argument("--once", action="store_true", help="Import complete files present now, then exit")
+    parser.add_argument("--dry-run", action="store_true", help="Simulate import without making changes")
+    parser.add_argument(
+        "--json-backend",
+        type=str,
+        default=None,
+        choices=BACKEND_CHOICES,
+        help="JSON encoder for request bodies (default: auto = orjson > ujson > stdlib)"
+    )
+    add_rate_arguments(parser)
+
+    args = parser.parse_args()
+    if not args.directory.is_dir():
+        print(f"✗ Not a directory: {args.directory}")
+        sys.exit(1)
+
+    sys.exit(watch(args))
+
+
+if __name__ == "__main__":
+    main()
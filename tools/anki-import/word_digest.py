@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bucketed word digests for post-import reconciliation.
+
+reconcile.py, stub_server.py and GET /api/words/digest
+(web/src/app/api/words/digest/route.ts) hash a stored word the same way:
+
+    key       lower(originalText)          (the duplicate key; text is trimmed on import)
+    keyHash   md5(key)
+    itemHash  md5(key + "\\n" + translation)
+    digest    md5 of the bucket's itemHashes, sorted and concatenated
+
+A bucket is either a whole category or, within one category, the words whose
+keyHash starts with a given hex prefix. Two buckets with the same count and
+digest hold the same words, so reconciliation only descends into buckets
+that differ. md5 is a checksum here, not a security measure (Postgres has it
+built in).
+
+Usage:
+    items = digest_items((e.original_text, e.translation, e.category.value) for e in entries)
+    top = bucket_summaries(items)                           # one bucket per category
+    sub = bucket_summaries(items, "work", prefix="a", depth=2)  # "a0".."af" within work
+"""
+import hashlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MAX_HASH_DEPTH = 32  # Hex digits in an md5
+
+
+class DigestItem(NamedTuple):
+    category: str
+    key_hash: str
+    item_hash: str
+    original_text: str
+    translation: str
+
+
+def _md5(text: str) -> str:
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def digest_item(original_text: str, translation: str, category: Optional[str]) -> DigestItem:
+    """Hash one word as the server stores it (trimmed, category defaulting to "other")."""
+    original_text = original_text.strip()
+    translation = translation.strip()
+    key = original_text.lower()
+    return DigestItem(category or "other", _md5(key), _md5(f"{key}\n{translation}"), original_text, translation)
+
+
+def digest_items(words: Iterable[Tuple[str, str, Optional[str]]]) -> List[DigestItem]:
+    """
+    Digest items for (originalText, translation, category) triples.
+
+    Words without text or translation are dropped, and only the first word
+    per key is kept, matching what the bulk-import route would store.
+    """
+    items = []
+    seen = set()
+    for original_text, translation, category in words:
+        if not original_text or not translation:
+            continue
+        item = digest_item(original_text, translation, category)
+        if item.key_hash in seen:
+            continue
+        seen.add(item.key_hash)
+        items.append(item)
+    return items
+
+
+def bucket_digest(item_hashes: Iterable[str]) -> str:
+    return _md5("".join(sorted(item_hashes)))
+
+
+def select_items(items: Iterable[DigestItem], category: str, prefix: str = "") -> List[DigestItem]:
+    """Items of one bucket."""
+    return [i for i in items if i.category == category and i.key_hash.startswith(prefix)]
+
+
+def bucket_summaries(
+    items: Iterable[DigestItem],
+    category: Optional[str] = None,
+    prefix: str = "",
+    depth: Optional[int] = None
+) -> List[Dict]:
+    """
+    {"bucket", "count", "digest"} per non-empty bucket, sorted by bucket.
+
+    Without a category, buckets are categories. With one, buckets are the
+    depth-digit keyHash prefixes under prefix within that category.
+    """
+    groups: Dict[str, List[str]] = {}
+    if category is None:
+        for item in items:
+            groups.setdefault(item.category, []).append(item.item_hash)
+    else:
+        for item in select_items(items, category, prefix):
+            groups.setdefault(item.key_hash[:depth], []).append(item.item_hash)
+    return [
+        {"bucket": bucket, "count": len(hashes), "digest": bucket_digest(hashes)}
+        for bucket, hashes in sorted(groups.items())
+    ]
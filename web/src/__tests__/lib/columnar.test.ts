@@ -0,0 +1,78 @@
+import { describe, it, expect } from 'vitest';
+import { decodeColumnarBatch, isColumnarBatch, type ColumnarBatch } from '@/lib/utils/columnar';
+
+function batch(fields: Partial<ColumnarBatch>): ColumnarBatch {
+  return { format: 'columnar', version: 1, count: 2, ...fields };
+}
+
+describe('decodeColumnarBatch', () => {
+  it('expands shared fields, columns and dictionaries', () => {
+    const entries = decodeColumnarBatch(
+      batch({
+        shared: { language: 'target', 'learningHistory.mastered': false },
+        dictionaries: { category: ['social', 'work'] },
+        columns: {
+          originalText: ['a', 'b'],
+          category: [1, 0],
+          'learningHistory.interval': [12, 3],
+        },
+      })
+    );
+
+    expect(entries).toEqual([
+      {
+        language: 'target',
+        originalText: 'a',
+        category: 'work',
+        learningHistory: { mastered: false, interval: 12 },
+      },
+      {
+        language: 'target',
+        originalText: 'b',
+        category: 'social',
+        learningHistory: { mastered: false, interval: 3 },
+      },
+    ]);
+  });
+
+  it('leaves out fields whose column value is null', () => {
+    const entries = decodeColumnarBatch(
+      batch({ columns: { originalText: ['a', 'b'], 'learningHistory.interval': [null, 3] } })
+    );
+
+    expect(entries).toEqual([{ originalText: 'a' }, { originalText: 'b', learningHistory: { interval: 3 } }]);
+  });
+
+  it('reattaches dictionary-encoded last lines', () => {
+    const entries = decodeColumnarBatch(
+      batch({
+        count: 3,
+        lastLines: { notes: ['[Source: CSV]'] },
+        columns: { notes: [['PT: a\nEN: b', 0], ['single', null], null] },
+      })
+    );
+
+    expect(entries).toEqual([{ notes: 'PT: a\nEN: b\n[Source: CSV]' }, { notes: 'single' }, {}]);
+  });
+
+  it('rejects malformed batches', () => {
+    expect(() => decodeColumnarBatch(batch({ version: 2 }))).toThrow('Unsupported columnar version');
+    expect(() => decodeColumnarBatch(batch({ columns: { originalText: ['a'] } }))).toThrow(
+      'must have 2 values'
+    );
+    expect(() =>
+      decodeColumnarBatch(batch({ dictionaries: { category: ['work'] }, columns: { category: [0, 1] } }))
+    ).toThrow('out of range');
+    expect(() =>
+      decodeColumnarBatch(batch({ lastLines: { notes: ['x'] }, columns: { notes: ['plain', null] } }))
+    ).toThrow('expected [text, lastLines index]');
+  });
+});
+
+describe('isColumnarBatch', () => {
+  it('recognises columnar bodies only', () => {
+    expect(isColumnarBatch(batch({}))).toBe(true);
+    expect(isColumnarBatch({ entries: [] })).toBe(false);
+    expect(isColumnarBatch(null)).toBe(false);
+  });
+});
@@ -0,0 +1,96 @@
+import { describe, it, expect } from 'vitest';
+import {
+  createDayLoad,
+  parseSpreadOptions,
+  spreadDueDates,
+  DEFAULT_DAILY_CAP,
+  DEFAULT_SPREAD_DAYS,
+  MAX_SPREAD_DAYS,
+} from '@/lib/fsrs/due-spread';
+
+const MS_PER_DAY = 24 * 60 * 60 * 1000;
+const now = new Date('2026-01-20T09:00:00Z');
+
+function dayOf(date: Date): number {
+  return Math.round((date.getTime() - now.getTime()) / MS_PER_DAY);
+}
+
+describe('spreadDueDates', () => {
+  it('keeps every day at or under the cap', () => {
+    const options = { days: 14, dailyCap: 50 };
+    const load = createDayLoad(options);
+
+    const dates = spreadDueDates(new Array(600).fill(0.5), load, options, now);
+
+    const perDay = new Array(14).fill(0);
+    dates.forEach((date) => perDay[dayOf(date)]++);
+    expect(perDay.slice(0, 12)).toEqual(new Array(12).fill(50));
+    expect(perDay.slice(12)).toEqual([0, 0]);
+  });
+
+  it('schedules the most-forgotten cards first', () => {
+    const options = { days: 3, dailyCap: 1 };
+
+    const dates = spreadDueDates([0.8, 0.1, 0.5], createDayLoad(options), options, now);
+
+    expect(dates.map(dayOf)).toEqual([2, 0, 1]);
+  });
+
+  it('counts existing reviews toward the cap', () => {
+    const options = { days: 3, dailyCap: 10 };
+    const load = createDayLoad(options, [10, 9]);
+
+    const dates = spreadDueDates([0.3, 0.3], load, options, now);
+
+    expect(dates.map(dayOf)).toEqual([1, 2]);
+    expect(load).toEqual([10, 10, 1]);
+  });
+
+  it('shares the load across batches', () => {
+    const options = { days: 2, dailyCap: 2 };
+    const load = createDayLoad(options);
+
+    spreadDueDates([0.5, 0.5], load, options, now);
+    const second = spreadDueDates([0.5], load, options, now);
+
+    expect(second.map(dayOf)).toEqual([1]);
+  });
+
+  it('falls back to the least-loaded day when every day is full', () => {
+    const options = { days: 3, dailyCap: 1 };
+    const load = createDayLoad(options, [4, 2, 3]);
+
+    const dates = spreadDueDates([0.5, 0.5], load, options, now);
+
+    expect(dates.map(dayOf)).toEqual([1, 1]);
+  });
+
+  it('makes every card due now when spreading is off', () => {
+    const options = { days: 0, dailyCap: 50 };
+
+    const dates = spreadDueDates([0.2, 0.7], createDayLoad(options), options, now);
+
+    expect(dates).toEqual([now, now]);
+  });
+});
+
+describe('parseSpreadOptions', () => {
+  it('uses defaults when params are missing or invalid', () => {
+    expect(parseSpreadOptions(new URLSearchParams())).toEqual({
+      days: DEFAULT_SPREAD_DAYS,
+      dailyCap: DEFAULT_DAILY_CAP,
+    });
+    expect(parseSpreadOptions(new URLSearchParams('spreadDays=-1&dailyCap=0'))).toEqual({
+      days: DEFAULT_SPREAD_DAYS,
+      dailyCap: DEFAULT_DAILY_CAP,
+    });
+  });
+
+  it('reads and clamps query params', () => {
+    expect(parseSpreadOptions(new URLSearchParams('spreadDays=0&dailyCap=20'))).toEqual({
+      days: 0,
+      dailyCap: 20,
+    });
+    expect(parseSpreadOptions(new URLSearchParams('spreadDays=9999')).days).toBe(MAX_SPREAD_DAYS);
+  });
+});
@@ -0,0 +1,90 @@
+// @vitest-environment node
+import { describe, it, expect } from 'vitest';
+import { readNdjsonLines, type NdjsonLine } from '@/lib/utils/ndjson';
+
+/** Build a byte stream that delivers the given text chunks one read at a time. */
+function streamOf(chunks: (string | Uint8Array)[]): ReadableStream<Uint8Array> {
+  const encoder = new TextEncoder();
+  return new ReadableStream({
+    start(controller) {
+      for (const chunk of chunks) {
+        controller.enqueue(typeof chunk === 'string' ? encoder.encode(chunk) : chunk);
+      }
+      controller.close();
+    },
+  });
+}
+
+async function collect(stream: ReadableStream<Uint8Array>, maxLineBytes?: number) {
+  const lines: NdjsonLine[] = [];
+  for await (const line of readNdjsonLines(stream, maxLineBytes)) {
+    lines.push(line);
+  }
+  return lines;
+}
+
+describe('readNdjsonLines', () => {
+  it('parses one value per line', async () => {
+    const lines = await collect(streamOf(['{"a":1}\n{"a":2}\n']));
+
+    expect(lines).toEqual([
+      { index: 0, value: { a: 1 } },
+      { index: 1, value: { a: 2 } },
+    ]);
+  });
+
+  it('reassembles lines split across chunks', async () => {
+    const lines = await collect(streamOf(['{"originalText":"ol', 'á"}\n{"orig', 'inalText":"x"}']));
+
+    expect(lines.map((l) => l.value)).toEqual([{ originalText: 'olá' }, { originalText: 'x' }]);
+  });
+
+  it('decodes multi-byte characters split across chunks', async () => {
+    const bytes = new TextEncoder().encode('{"t":"ção"}\n');
+    const lines = await collect(streamOf([bytes.slice(0, 8), bytes.slice(8)]));
+
+    expect(lines).toEqual([{ index: 0, value: { t: 'ção' } }]);
+  });
+
+  it('accepts CRLF line endings and skips blank lines without counting them', async () => {
+    const lines = await collect(streamOf(['{"a":1}\r\n\r\n\n{"a":2}\r\n']));
+
+    expect(lines).toEqual([
+      { index: 0, value: { a: 1 } },
+      { index: 1, value: { a: 2 } },
+    ]);
+  });
+
+  it('reports invalid lines and keeps going', async () => {
+    const lines = await collect(streamOf(['{"a":1}\n{broken\n{"a":3}\n']));
+
+    expect(lines[0]).toEqual({ index: 0, value: { a: 1 } });
+    expect(lines[1].index).toBe(1);
+    expect(lines[1].error).toBeDefined();
+    expect(lines[2]).toEqual({ index: 2, value: { a: 3 } });
+  });
+
+  it('yields nothing for an empty body', async () => {
+    expect(await collect(streamOf([]))).toEqual([]);
+  });
+
+  it('throws when a line exceeds the limit', async () => {
+    const stream = streamOf(['{"a":"' + 'x'.repeat(100)]);
+
+    await expect(collect(stream, 50)).rejects.toThrow('exceeds 50 bytes');
+  });
+
+  it('measures the limit in UTF-8 bytes, not characters', async () => {
+    // 22 characters, 36 bytes
+    const line = '{"t":"' + 'ç'.repeat(14) + '"}';
+
+    await expect(collect(streamOf([line + '\n']), 30)).rejects.toThrow('exceeds 30 bytes');
+    expect(await collect(streamOf([line + '\n']), 36)).toEqual([{ index: 0, value: { t: 'ç'.repeat(14) } }]);
+  });
+
+  it('applies the limit to complete lines within one chunk', async () => {
+    const stream = streamOf(['{"a":1}\n{"a":"' + 'x'.repeat(100) + '"}\n{"a":3}\n']);
+
+    await expect(collect(stream, 50)).rejects.toThrow('NDJSON line 1 exceeds 50 bytes');
+  });
+});
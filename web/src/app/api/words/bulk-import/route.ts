@@ -2,7 +2,16 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getCurrentUser } from '@/lib/supabase/server';
 import { db } from '@/lib/db';
 import { words } from '@/lib/db/schema';
+import { and, eq, sql } from 'drizzle-orm';
 import { getRequestContext } from '@/lib/logger/api-logger';
+import { readNdjsonLines } from '@/lib/utils/ndjson';
+import { decodeColumnarBatch, isColumnarBatch } from '@/lib/utils/columnar';
+import {
+  createDayLoad,
+  parseSpreadOptions,
+  spreadDueDates,
+  type SpreadOptions,
+} from '@/lib/fsrs/due-spread';
 
 /**
  * POST /api/words/bulk-import
@@ -10,6 +19,19 @@ import { getRequestContext } from '@/lib/logger/api-logger';
  * Bulk import vocabulary from Anki with learning history preservation.
  * Converts Anki's SM-2 parameters to FSRS parameters.
  *
+ * Body formats:
+ * - `application/json`: `{ entries: [...], skipDuplicates? }`, parsed whole
+ * - `application/json` with `format: "columnar"`: the same batch with each
+ *   field stored once (shared values, string dictionaries, parallel arrays),
+ *   about half the bytes; see lib/utils/columnar.ts
+ * - `application/x-ndjson`: one entry per line, parsed and inserted while the
+ *   body is still streaming in, so one long-lived request can carry a whole
+ *   deck without either side buffering it. Outcome indices count entry lines.
+ *
+ * Cards whose review date has passed are spread over the next days instead
+ * of all becoming due now (see lib/fsrs/due-spread.ts). Query params:
+ * `spreadDays` (default 14, 0 = off) and `dailyCap` (default 50).
+ *
  * Reference: /docs/engineering/ANKI_IMPORT_GUIDE.md
  */
 
@@ -38,6 +60,53 @@ interface BulkImportRequest {
   skipDuplicates?: boolean;
 }
 
+/**
+ * Per-entry outcome, keyed by the entry's index in the request's `entries`
+ * array. Lets the importer write an outcome manifest and re-send only the
+ * entries that did not make it.
+ */
+type ImportOutcomeStatus = 'imported' | 'skipped_duplicate' | 'rejected';
+
+interface ImportOutcome {
+  index: number;
+  status: ImportOutcomeStatus;
+  reason?: string;
+}
+
+/** Route time split for the Server-Timing header, in milliseconds */
+interface RouteTiming {
+  bodyMs: number; // receiving and parsing the request body
+  dbMs: number; // due-load query and inserts
+}
+
+interface ImportProgress {
+  timing: RouteTiming;
+  stats: {
+    total: number;
+    imported: number;
+    skipped: number;
+    errors: number;
+    withHistory: number;
+  };
+  errorDetails: string[];
+  outcomes: ImportOutcome[];
+}
+
+interface IndexedEntry {
+  index: number;
+  entry: ImportEntry;
+}
+
+/** Due-date spreading state shared by all batches of one request */
+interface DueSpread {
+  options: SpreadOptions;
+  load: number[]; // cards due per day of the window
+  now: Date;
+}
+
+const BATCH_SIZE = 50;
+const NDJSON_CONTENT_TYPE = 'application/x-ndjson';
+
 /**
  * Convert Anki ease factor to FSRS difficulty (0-10 scale)
  *
@@ -145,150 +214,359 @@ function calculateConsecutiveCorrectSessions(
   return 0;
 }
 
+/**
+ * Convert and insert one batch of entries, recording stats and per-entry
+ * outcomes. A failed batch insert falls back to row-by-row inserts so one
+ * bad row (or a duplicate) does not reject its neighbours.
+ */
+async function importBatch(
+  userId: string,
+  batch: IndexedEntry[],
+  progress: ImportProgress,
+  spread: DueSpread
+): Promise<void> {
+  const { stats, errorDetails, outcomes } = progress;
+  const valuesToInsert = [];
+  const valueIndices: number[] = []; // request index of each valuesToInsert item
+  const overduePositions: number[] = []; // valuesToInsert positions of overdue cards
+  const overdueRetrievabilities: number[] = [];
+
+  for (const { index, entry } of batch) {
+    try {
+      // Validate required fields
+      if (!entry.originalText || !entry.translation) {
+        stats.skipped++;
+        outcomes.push({
+          index,
+          status: 'rejected',
+          reason: 'Missing originalText or translation',
+        });
+        continue;
+      }
+
+      // Convert learning history to FSRS parameters
+      const history = entry.learningHistory;
+      let difficulty = 5.0;
+      let stability = 1.0;
+      let retrievability = 1.0;
+      let nextReviewDate = new Date();
+      let lastReviewDate: Date | null = null;
+      let reviewCount = 0;
+      let lapseCount = 0;
+      let consecutiveCorrectSessions = 0;
+      let masteryStatus: 'learning' | 'learned' | 'ready_to_use' = 'learning';
+
+      if (history) {
+        difficulty = convertEaseFactorToDifficulty(history.easeFactor || 2.5);
+        stability = convertIntervalToStability(history.interval || 1);
+        retrievability = calculateRetrievability(stability, history.lastReviewed);
+        nextReviewDate = calculateNextReviewDate(stability, history.lastReviewed);
+        lastReviewDate = history.lastReviewed ? new Date(history.lastReviewed) : null;
+        reviewCount = history.reviewCount || 0;
+        lapseCount = history.lapseCount || 0;
+        consecutiveCorrectSessions = calculateConsecutiveCorrectSessions(
+          history.state,
+          history.mastered,
+          history.lapseCount,
+          history.reviewCount
+        );
+        masteryStatus = convertStateToMasteryStatus(
+          history.state,
+          history.mastered,
+          history.reviewCount
+        );
+        stats.withHistory++;
+
+        // calculateNextReviewDate clamps overdue cards to now; spread them below
+        if (history.lastReviewed && nextReviewDate.getTime() <= Date.now()) {
+          overduePositions.push(valuesToInsert.length);
+          overdueRetrievabilities.push(retrievability);
+        }
+      }
+
+      valuesToInsert.push({
+        userId,
+        originalText: entry.originalText.trim(),
+        translation: entry.translation.trim(),
+        language: (entry.language || 'target') as 'source' | 'target',
+        category: entry.category || 'other',
+        categoryConfidence: 0.8, // Imported categories are assumed accurate
+        difficulty,
+        stability,
+        retrievability,
+        nextReviewDate,
+        lastReviewDate,
+        reviewCount,
+        lapseCount,
+        consecutiveCorrectSessions,
+        masteryStatus,
+        createdAt: entry.createdAt ? new Date(entry.createdAt) : new Date(),
+      });
+      valueIndices.push(index);
+    } catch (entryError) {
+      stats.errors++;
+      const reason = entryError instanceof Error ? entryError.message : 'Unknown error';
+      errorDetails.push(`Entry "${entry.originalText}": ${reason}`);
+      outcomes.push({ index, status: 'rejected', reason });
+    }
+  }
+
+  // Spread overdue cards over the next days, most-forgotten first
+  if (overduePositions.length > 0) {
+    const dates = spreadDueDates(overdueRetrievabilities, spread.load, spread.options, spread.now);
+    overduePositions.forEach((position, i) => {
+      valuesToInsert[position].nextReviewDate = dates[i];
+    });
+  }
+
+  // Batch insert
+  if (valuesToInsert.length > 0) {
+    const dbStart = performance.now();
+    try {
+      await db.insert(words).values(valuesToInsert);
+      stats.imported += valuesToInsert.length;
+      for (const index of valueIndices) {
+        outcomes.push({ index, status: 'imported' });
+      }
+    } catch (dbError) {
+      // If batch fails, try individual inserts
+      for (const [position, value] of valuesToInsert.entries()) {
+        const index = valueIndices[position];
+        try {
+          await db.insert(words).values(value);
+          stats.imported++;
+          outcomes.push({ index, status: 'imported' });
+        } catch (individualError) {
+          stats.errors++;
+          if (
+            individualError instanceof Error &&
+            individualError.message.includes('duplicate')
+          ) {
+            stats.skipped++;
+            stats.errors--;
+            outcomes.push({ index, status: 'skipped_duplicate' });
+          } else {
+            const reason = individualError instanceof Error ? individualError.message : 'Unknown';
+            errorDetails.push(`"${value.originalText}": ${reason}`);
+            outcomes.push({ index, status: 'rejected', reason });
+          }
+        }
+      }
+    }
+    progress.timing.dbMs += performance.now() - dbStart;
+  }
+}
+
+/**
+ * Stream NDJSON entries into the database, BATCH_SIZE rows per insert.
+ * Only the current batch is held in memory.
+ */
+async function importNdjson(
+  userId: string,
+  body: ReadableStream<Uint8Array>,
+  progress: ImportProgress,
+  spread: DueSpread
+): Promise<void> {
+  const { stats, errorDetails, outcomes } = progress;
+  let batch: IndexedEntry[] = [];
+
+  for await (const line of readNdjsonLines(body)) {
+    stats.total++;
+    if (line.error !== undefined) {
+      stats.errors++;
+      errorDetails.push(`Line ${line.index + 1}: Invalid JSON: ${line.error}`);
+      outcomes.push({ index: line.index, status: 'rejected', reason: `Invalid JSON: ${line.error}` });
+      continue;
+    }
+    if (typeof line.value !== 'object' || line.value === null || Array.isArray(line.value)) {
+      stats.skipped++;
+      outcomes.push({ index: line.index, status: 'rejected', reason: 'Entry must be an object' });
+      continue;
+    }
+
+    batch.push({ index: line.index, entry: line.value as ImportEntry });
+    if (batch.length >= BATCH_SIZE) {
+      await importBatch(userId, batch, progress, spread);
+      batch = [];
+    }
+  }
+
+  if (batch.length > 0) {
+    await importBatch(userId, batch, progress, spread);
+  }
+}
+
+/**
+ * Cards the user already has due per day of the spreading window, with
+ * anything overdue counted on day 0. One grouped query per request.
+ */
+async function loadDueCounts(userId: string, options: SpreadOptions, now: Date): Promise<number[]> {
+  const load = createDayLoad(options);
+  if (load.length === 0) return load;
+
+  const nowISO = now.toISOString();
+  const windowEndISO = new Date(now.getTime() + options.days * 24 * 60 * 60 * 1000).toISOString();
+  const rows = await db
+    .select({
+      day: sql<number>`greatest(0, floor(extract(epoch from (${words.nextReviewDate} - ${nowISO}::timestamp)) / 86400))::int`,
+      count: sql<number>`count(*)::int`,
+    })
+    .from(words)
+    .where(and(eq(words.userId, userId), sql`${words.nextReviewDate} < ${windowEndISO}::timestamp`))
+    .groupBy(sql`1`);
+
+  for (const { day, count } of rows) {
+    if (day < load.length) load[day] += count;
+  }
+  return load;
+}
+
+/**
+ * Correlation and timing headers. X-Request-Id is the ID on this request's
+ * log lines (the client's own when it sent one); Server-Timing splits the
+ * route's time into body, db and total so a client can subtract it from
+ * its round trip to get network time.
+ */
+function timingHeaders(requestId: string, startTime: number, timing?: RouteTiming) {
+  const metrics = timing
+    ? [`body;dur=${timing.bodyMs.toFixed(1)}`, `db;dur=${timing.dbMs.toFixed(1)}`]
+    : [];
+  metrics.push(`total;dur=${Date.now() - startTime}`);
+  return { 'X-Request-Id': requestId, 'Server-Timing': metrics.join(', ') };
+}
+
+function progressData(progress: ImportProgress) {
+  const { stats, errorDetails, outcomes } = progress;
+  outcomes.sort((a, b) => a.index - b.index);
+  return {
+    ...stats,
+    errorCount: stats.errors, // `errors` below is replaced by (truncated) details
+    errors: errorDetails.length > 0 ? errorDetails.slice(0, 10) : undefined, // Limit error details
+    results: outcomes,
+  };
+}
+
 export async function POST(request: NextRequest) {
   const startTime = Date.now();
-  const { logRequest, logResponse, logError } = getRequestContext(request);
+  const { requestId, logRequest, logResponse, logError } = getRequestContext(request);
 
   try {
     logRequest();
     // 1. Authenticate user
     const user = await getCurrentUser();
     if (!user) {
-      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-    }
-
-    // 2. Parse request body
-    const body: BulkImportRequest = await request.json();
-    const { entries, skipDuplicates = true } = body;
-
-    if (!entries || !Array.isArray(entries)) {
       return NextResponse.json(
-        { error: 'entries must be an array' },
-        { status: 400 }
+        { error: 'Unauthorized' },
+        { status: 401, headers: timingHeaders(requestId, startTime) }
       );
     }
 
-    // 3. Process entries
-    const stats = {
-      total: entries.length,
-      imported: 0,
-      skipped: 0,
-      errors: 0,
-      withHistory: 0,
+    const progress: ImportProgress = {
+      timing: {
+        bodyMs: 0,
+        dbMs: 0,
+      },
+      stats: {
+        total: 0,
+        imported: 0,
+        skipped: 0,
+        errors: 0,
+        withHistory: 0,
+      },
+      errorDetails: [],
+      outcomes: [],
     };
 
-    const BATCH_SIZE = 50;
-    const errorDetails: string[] = [];
+    const now = new Date();
+    const spreadOptions = parseSpreadOptions(new URL(request.url).searchParams);
+    const dueLoadStart = performance.now();
+    const spread: DueSpread = {
+      options: spreadOptions,
+      load: await loadDueCounts(user.id, spreadOptions, now),
+      now,
+    };
+    progress.timing.dbMs += performance.now() - dueLoadStart;
 
-    for (let i = 0; i < entries.length; i += BATCH_SIZE) {
-      const batch = entries.slice(i, i + BATCH_SIZE);
-      const valuesToInsert = [];
+    // 2a. Streaming body: insert while reading
+    const contentType = request.headers.get('content-type') || '';
+    if (contentType.startsWith(NDJSON_CONTENT_TYPE)) {
+      if (!request.body) {
+        return NextResponse.json(
+          { error: 'Request body is empty' },
+          { status: 400, headers: timingHeaders(requestId, startTime) }
+        );
+      }
+      // Reading and inserting interleave: body time is what inserts leave over
+      const streamStart = performance.now();
+      const dbBefore = progress.timing.dbMs;
+      let streamError: unknown = null;
+      try {
+        await importNdjson(user.id, request.body, progress, spread);
+      } catch (error) {
+        streamError = error;
+      }
+      progress.timing.bodyMs = performance.now() - streamStart - (progress.timing.dbMs - dbBefore);
 
-      for (const entry of batch) {
-        try {
-          // Validate required fields
-          if (!entry.originalText || !entry.translation) {
-            stats.skipped++;
-            continue;
-          }
+      if (streamError) {
+        // Earlier batches are already committed: report them with the error
+        logResponse(400, Date.now() - startTime);
+        return NextResponse.json(
+          {
+            error: streamError instanceof Error ? streamError.message : 'Invalid NDJSON body',
+            data: progressData(progress),
+          },
+          { status: 400, headers: timingHeaders(requestId, startTime, progress.timing) }
+        );
+      }
 
-          // Convert learning history to FSRS parameters
-          const history = entry.learningHistory;
-          let difficulty = 5.0;
-          let stability = 1.0;
-          let retrievability = 1.0;
-          let nextReviewDate = new Date();
-          let lastReviewDate: Date | null = null;
-          let reviewCount = 0;
-          let lapseCount = 0;
-          let consecutiveCorrectSessions = 0;
-          let masteryStatus: 'learning' | 'learned' | 'ready_to_use' = 'learning';
-
-          if (history) {
-            difficulty = convertEaseFactorToDifficulty(history.easeFactor || 2.5);
-            stability = convertIntervalToStability(history.interval || 1);
-            retrievability = calculateRetrievability(stability, history.lastReviewed);
-            nextReviewDate = calculateNextReviewDate(stability, history.lastReviewed);
-            lastReviewDate = history.lastReviewed ? new Date(history.lastReviewed) : null;
-            reviewCount = history.reviewCount || 0;
-            lapseCount = history.lapseCount || 0;
-            consecutiveCorrectSessions = calculateConsecutiveCorrectSessions(
-              history.state,
-              history.mastered,
-              history.lapseCount,
-              history.reviewCount
-            );
-            masteryStatus = convertStateToMasteryStatus(
-              history.state,
-              history.mastered,
-              history.reviewCount
-            );
-            stats.withHistory++;
+      logResponse(200, Date.now() - startTime);
+      return NextResponse.json(
+        { data: progressData(progress) },
+        { headers: timingHeaders(requestId, startTime, progress.timing) }
+      );
+    }
+
+    // 2b. Parse request body
+    const bodyStart = performance.now();
+    const parsed: unknown = await request.json();
+    let body: BulkImportRequest;
+    try {
+      body = isColumnarBatch(parsed)
+        ? {
+            entries: decodeColumnarBatch(parsed) as unknown as ImportEntry[],
+            skipDuplicates: parsed.skipDuplicates,
           }
+        : (parsed as BulkImportRequest);
+    } catch (decodeError) {
+      return NextResponse.json(
+        { error: decodeError instanceof Error ? decodeError.message : 'Invalid columnar body' },
+        { status: 400, headers: timingHeaders(requestId, startTime) }
+      );
+    }
+    progress.timing.bodyMs = performance.now() - bodyStart;
+    const { entries, skipDuplicates = true } = body;
 
-          valuesToInsert.push({
-            userId: user.id,
-            originalText: entry.originalText.trim(),
-            translation: entry.translation.trim(),
-            language: (entry.language || 'target') as 'source' | 'target',
-            category: entry.category || 'other',
-            categoryConfidence: 0.8, // Imported categories are assumed accurate
-            difficulty,
-            stability,
-            retrievability,
-            nextReviewDate,
-            lastReviewDate,
-            reviewCount,
-            lapseCount,
-            consecutiveCorrectSessions,
-            masteryStatus,
-            createdAt: entry.createdAt ? new Date(entry.createdAt) : new Date(),
-          });
-        } catch (entryError) {
-          stats.errors++;
-          errorDetails.push(
-            `Entry "${entry.originalText}": ${entryError instanceof Error ? entryError.message : 'Unknown error'}`
-          );
-        }
-      }
+    if (!entries || !Array.isArray(entries)) {
+      return NextResponse.json(
+        { error: 'entries must be an array' },
+        { status: 400, headers: timingHeaders(requestId, startTime, progress.timing) }
+      );
+    }
 
-      // Batch insert
-      if (valuesToInsert.length > 0) {
-        try {
-          await db.insert(words).values(valuesToInsert);
-          stats.imported += valuesToInsert.length;
-        } catch (dbError) {
-          // If batch fails, try individual inserts
-          for (const value of valuesToInsert) {
-            try {
-              await db.insert(words).values(value);
-              stats.imported++;
-            } catch (individualError) {
-              stats.errors++;
-              if (
-                individualError instanceof Error &&
-                individualError.message.includes('duplicate')
-              ) {
-                stats.skipped++;
-                stats.errors--;
-              } else {
-                errorDetails.push(
-                  `"${value.originalText}": ${individualError instanceof Error ? individualError.message : 'Unknown'}`
-                );
-              }
-            }
-          }
-        }
-      }
+    // 3. Process entries
+    progress.stats.total = entries.length;
+    for (let i = 0; i < entries.length; i += BATCH_SIZE) {
+      const batch = entries
+        .slice(i, i + BATCH_SIZE)
+        .map((entry, offset) => ({ index: i + offset, entry }));
+      await importBatch(user.id, batch, progress, spread);
     }
 
     logResponse(200, Date.now() - startTime);
-    return NextResponse.json({
-      data: {
-        ...stats,
-        errors: errorDetails.length > 0 ? errorDetails.slice(0, 10) : undefined, // Limit error details
-      },
-    });
+    return NextResponse.json(
+      { data: progressData(progress) },
+      { headers: timingHeaders(requestId, startTime, progress.timing) }
+    );
   } catch (error) {
     logError(error, { endpoint: '/api/words/bulk-import' });
     logResponse(500, Date.now() - startTime);
@@ -296,7 +574,7 @@ export async function POST(request: NextRequest) {
       {
         error: error instanceof Error ? error.message : 'Failed to import words',
       },
-      { status: 500 }
+      { status: 500, headers: timingHeaders(requestId, startTime) }
     );
   }
 }
@@ -0,0 +1,141 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { getCurrentUser } from '@/lib/supabase/server';
+import { db } from '@/lib/db';
+import { words } from '@/lib/db/schema';
+import { getRequestContext } from '@/lib/logger/api-logger';
+import { and, eq, sql } from 'drizzle-orm';
+
+/**
+ * GET /api/words/digest
+ *
+ * Bucketed checksums of the user's words, so an import client can check
+ * what landed without downloading the vocabulary. Used by
+ * tools/anki-import/reconcile.py (hashing mirrored in word_digest.py).
+ *
+ * Hashes (md5 as a checksum, not for security):
+ * - keyHash  = md5(lower(originalText))  - the duplicate key
+ * - itemHash = md5(lower(originalText) || '\n' || translation)
+ * - digest   = md5 of the bucket's itemHashes, sorted and concatenated
+ *
+ * Query params:
+ * - (none): one bucket per category
+ * - category, prefix?, depth: buckets of that category keyed by the first
+ *   `depth` hex digits of keyHash, among keyHashes starting with `prefix`
+ *   (at most MAX_DEPTH_STEP digits deeper than the prefix)
+ * - category, prefix?, items=1: the words of one bucket (at most MAX_ITEMS)
+ *
+ * Response: {
+ *   data: { buckets: [{ bucket, count, digest }] }
+ *      or { items: [{ keyHash, itemHash, originalText, translation }] }
+ * }
+ */
+
+const MAX_HASH_DEPTH = 32; // Hex digits in an md5
+const MAX_DEPTH_STEP = 2; // At most 256 buckets per response
+const MAX_ITEMS = 500;
+const HEX_PREFIX = /^[0-9a-f]*$/;
+
+const keyHash = sql<string>`md5(lower(${words.originalText}))`;
+const itemHash = sql<string>`md5(lower(${words.originalText}) || chr(10) || ${words.translation})`;
+
+export async function GET(request: NextRequest) {
+  const startTime = Date.now();
+  const { logRequest, logResponse, logError } = getRequestContext(request);
+
+  try {
+    logRequest();
+
+    // 1. Authenticate user
+    const user = await getCurrentUser();
+    if (!user) {
+      logResponse(401, Date.now() - startTime);
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    // 2. Parse query parameters
+    const { searchParams } = new URL(request.url);
+    const category = searchParams.get('category');
+    const prefix = searchParams.get('prefix') || '';
+    const wantItems = searchParams.get('items') === '1';
+    const depth = parseInt(searchParams.get('depth') || '0');
+
+    if (!HEX_PREFIX.test(prefix) || prefix.length >= MAX_HASH_DEPTH) {
+      logResponse(400, Date.now() - startTime);
+      return NextResponse.json({ error: 'prefix must be lowercase hex' }, { status: 400 });
+    }
+    if ((wantItems || prefix) && !category) {
+      logResponse(400, Date.now() - startTime);
+      return NextResponse.json({ error: 'prefix and items require a category' }, { status: 400 });
+    }
+    if (
+      category &&
+      !wantItems &&
+      !(depth > prefix.length && depth <= Math.min(prefix.length + MAX_DEPTH_STEP, MAX_HASH_DEPTH))
+    ) {
+      logResponse(400, Date.now() - startTime);
+      return NextResponse.json(
+        { error: `depth must be 1-${MAX_DEPTH_STEP} digits longer than prefix` },
+        { status: 400 }
+      );
+    }
+
+    const conditions = [eq(words.userId, user.id)];
+    if (category) {
+      conditions.push(eq(words.category, category));
+    }
+    if (prefix) {
+      conditions.push(sql`${keyHash} like ${prefix + '%'}`);
+    }
+
+    // 3a. Words of one bucket
+    if (wantItems) {
+      const items = await db
+        .select({
+          keyHash,
+          itemHash,
+          originalText: words.originalText,
+          translation: words.translation,
+        })
+        .from(words)
+        .where(and(...conditions))
+        .limit(MAX_ITEMS + 1);
+
+      if (items.length > MAX_ITEMS) {
+        logResponse(400, Date.now() - startTime);
+        return NextResponse.json(
+          { error: `Bucket has more than ${MAX_ITEMS} words; use a longer prefix` },
+          { status: 400 }
+        );
+      }
+
+      logResponse(200, Date.now() - startTime);
+      return NextResponse.json({ data: { items } });
+    }
+
+    // 3b. Bucket digests, computed in the database so only checksums leave it.
+    // Grouping by position keeps the parameterized expression out of GROUP BY.
+    const bucket = category ? sql<string>`left(${keyHash}, ${depth})` : sql<string>`${words.category}`;
+    const buckets = await db
+      .select({
+        bucket,
+        count: sql<number>`count(*)::int`,
+        digest: sql<string>`md5(string_agg(${itemHash}, '' order by ${itemHash} collate "C"))`,
+      })
+      .from(words)
+      .where(and(...conditions))
+      .groupBy(sql`1`)
+      .orderBy(sql`1`);
+
+    logResponse(200, Date.now() - startTime);
+    return NextResponse.json({ data: { buckets } });
+  } catch (error) {
+    logError(error, { endpoint: '/api/words/digest' });
+    logResponse(500, Date.now() - startTime);
+    return NextResponse.json(
+      {
+        error: error instanceof Error ? error.message : 'Failed to compute digests',
+      },
+      { status: 500 }
+    );
+  }
+}
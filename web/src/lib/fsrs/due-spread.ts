@@ -0,0 +1,90 @@
+/**
+ * Due-Date Load Spreading
+ *
+ * Imported cards whose review date has already passed would all become due
+ * "now", so a long-neglected deck lands as hundreds of cards due at once.
+ * The bulk-import route spreads them over the next `days` days instead:
+ *
+ * - Cards are placed most-forgotten first (lowest retrievability), each on
+ *   the earliest day that has fewer than `dailyCap` cards due
+ * - The per-day counts start from the user's existing reviews, so the cap
+ *   holds across batches, requests and earlier imports
+ * - Once every day is at the cap, cards go to the least-loaded day
+ *
+ * Day 0 starts now; day d is exactly d * 24h later.
+ */
+
+export interface SpreadOptions {
+  days: number; // 0 disables spreading (overdue cards are due now)
+  dailyCap: number;
+}
+
+export const DEFAULT_SPREAD_DAYS = 14;
+export const DEFAULT_DAILY_CAP = 50;
+export const MAX_SPREAD_DAYS = 365;
+
+const MS_PER_DAY = 24 * 60 * 60 * 1000;
+
+/**
+ * Read `spreadDays` / `dailyCap` query parameters, falling back to the
+ * defaults for missing or invalid values.
+ */
+export function parseSpreadOptions(searchParams: URLSearchParams): SpreadOptions {
+  const days = parseInt(searchParams.get('spreadDays') ?? '');
+  const dailyCap = parseInt(searchParams.get('dailyCap') ?? '');
+  return {
+    days: Number.isFinite(days) && days >= 0 ? Math.min(days, MAX_SPREAD_DAYS) : DEFAULT_SPREAD_DAYS,
+    dailyCap: Number.isFinite(dailyCap) && dailyCap > 0 ? dailyCap : DEFAULT_DAILY_CAP,
+  };
+}
+
+/**
+ * Per-day card counts for the spreading window.
+ *
+ * @param existingLoad - Cards already due per day (index 0 = next 24h, overdue included)
+ */
+export function createDayLoad(options: SpreadOptions, existingLoad: number[] = []): number[] {
+  return Array.from({ length: options.days }, (_, day) => existingLoad[day] ?? 0);
+}
+
+function pickDay(load: number[], dailyCap: number): number {
+  let leastLoaded = 0;
+  for (let day = 0; day < load.length; day++) {
+    if (load[day] < dailyCap) return day;
+    if (load[day] < load[leastLoaded]) leastLoaded = day;
+  }
+  return leastLoaded;
+}
+
+/**
+ * Review dates for overdue cards, in input order.
+ *
+ * Updates `load` in place, so calls for consecutive batches share the cap.
+ *
+ * @param retrievabilities - Current retrievability of each overdue card
+ * @param load - Per-day counts from createDayLoad()
+ * @param options - Daily cap
+ * @param now - Start of day 0
+ */
+export function spreadDueDates(
+  retrievabilities: number[],
+  load: number[],
+  options: SpreadOptions,
+  now: Date = new Date()
+): Date[] {
+  if (load.length === 0) {
+    return retrievabilities.map(() => new Date(now));
+  }
+
+  const order = retrievabilities
+    .map((retrievability, index) => ({ retrievability, index }))
+    .sort((a, b) => a.retrievability - b.retrievability || a.index - b.index);
+
+  const dates: Date[] = new Array(retrievabilities.length);
+  for (const { index } of order) {
+    const day = pickDay(load, options.dailyCap);
+    load[day]++;
+    dates[index] = new Date(now.getTime() + day * MS_PER_DAY);
+  }
+  return dates;
+}
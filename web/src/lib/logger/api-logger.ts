@@ -1,9 +1,26 @@
 import { NextRequest } from "next/server";
 import { logger, generateRequestId, createRequestLogger } from "./index";
 
+// Client-supplied IDs are echoed into logs, so only accept short, plain tokens
+const CLIENT_ID_PATTERN = /^[A-Za-z0-9._:-]{1,100}$/;
+
+function clientId(value: string | null): string | undefined {
+  return value && CLIENT_ID_PATTERN.test(value) ? value : undefined;
+}
+
+/**
+ * Per-request logger and log helpers.
+ *
+ * A client can correlate its requests with these log lines by sending
+ * `X-Request-Id` (used as this request's ID instead of a generated one)
+ * and `X-Correlation-Id` (e.g. one import run spanning many requests,
+ * logged as `correlationId`).
+ */
 export function getRequestContext(request: NextRequest, userId?: string) {
-  const requestId = generateRequestId();
-  const log = createRequestLogger(requestId, userId);
+  const requestId = clientId(request.headers.get("x-request-id")) ?? generateRequestId();
+  const correlationId = clientId(request.headers.get("x-correlation-id"));
+  const requestLog = createRequestLogger(requestId, userId);
+  const log = correlationId ? requestLog.child({ correlationId }) : requestLog;
 
   return {
     requestId,
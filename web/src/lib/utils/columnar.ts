@@ -0,0 +1,118 @@
+/**
+ * Columnar Batch Utility
+ *
+ * Decodes the bulk-import route's compact batch format (written by
+ * tools/anki-import/columnar.py). Instead of repeating every key per entry,
+ * a columnar body stores each field once per batch:
+ *
+ * - `shared`: fields every entry has with the same value
+ * - `columns`: one value per entry, `null` where the entry lacks the field
+ * - `dictionaries`: when a field has one, its column holds indexes into it
+ *   (category, learning state, ...)
+ * - `lastLines`: when a field has one, its values are
+ *   `[text before the last line, index into lastLines]` (the notes'
+ *   `[Source: ...]` tag), or `[text, null]` for a value without a line break
+ *
+ * Fields are dotted paths: `learningHistory.interval` is `interval` inside
+ * `learningHistory`.
+ */
+
+export const COLUMNAR_FORMAT = 'columnar';
+export const COLUMNAR_VERSION = 1;
+
+export interface ColumnarBatch {
+  format: typeof COLUMNAR_FORMAT;
+  version: number;
+  count: number;
+  skipDuplicates?: boolean;
+  shared?: Record<string, unknown>;
+  dictionaries?: Record<string, unknown[]>;
+  lastLines?: Record<string, string[]>;
+  columns?: Record<string, unknown[]>;
+}
+
+const PATH_SEPARATOR = '.';
+
+/** Whether a parsed request body is in the columnar format */
+export function isColumnarBatch(body: unknown): body is ColumnarBatch {
+  return (
+    typeof body === 'object' &&
+    body !== null &&
+    (body as { format?: unknown }).format === COLUMNAR_FORMAT
+  );
+}
+
+function setField(entry: Record<string, unknown>, field: string, value: unknown) {
+  const separator = field.indexOf(PATH_SEPARATOR);
+  if (separator === -1) {
+    entry[field] = value;
+    return;
+  }
+  const key = field.slice(0, separator);
+  const inner = (entry[key] ??= {}) as Record<string, unknown>;
+  inner[field.slice(separator + 1)] = value;
+}
+
+function lookup<T>(table: T[], index: unknown, field: string): T {
+  if (typeof index !== 'number' || !Number.isInteger(index) || index < 0 || index >= table.length) {
+    throw new Error(`Column ${field}: index ${String(index)} out of range`);
+  }
+  return table[index];
+}
+
+/**
+ * Expand a columnar batch into plain entry objects, in order.
+ *
+ * @throws Error for an unknown version, a column of the wrong length or an
+ *   index out of range
+ *
+ * @example
+ * ```ts
+ * const entries = decodeColumnarBatch({
+ *   format: 'columnar', version: 1, count: 2,
+ *   shared: { language: 'target' },
+ *   dictionaries: { category: ['work'] },
+ *   columns: { originalText: ['a', 'b'], category: [0, null] },
+ * });
+ * // [{ language: 'target', originalText: 'a', category: 'work' },
+ * //  { language: 'target', originalText: 'b' }]
+ * ```
+ */
+export function decodeColumnarBatch(batch: ColumnarBatch): Record<string, unknown>[] {
+  if (batch.version !== COLUMNAR_VERSION) {
+    throw new Error(`Unsupported columnar version: ${String(batch.version)}`);
+  }
+  const { count } = batch;
+  if (typeof count !== 'number' || !Number.isInteger(count) || count < 0) {
+    throw new Error('count must be a non-negative integer');
+  }
+
+  const entries: Record<string, unknown>[] = Array.from({ length: count }, () => ({}));
+  for (const [field, value] of Object.entries(batch.shared ?? {})) {
+    entries.forEach((entry) => setField(entry, field, value));
+  }
+
+  const dictionaries = batch.dictionaries ?? {};
+  const lastLines = batch.lastLines ?? {};
+  for (const [field, column] of Object.entries(batch.columns ?? {})) {
+    if (!Array.isArray(column) || column.length !== count) {
+      throw new Error(`Column ${field} must have ${count} values`);
+    }
+    const dictionary = dictionaries[field];
+    const tails = lastLines[field];
+    column.forEach((raw, i) => {
+      if (raw === null || raw === undefined) return;
+      let value = raw;
+      if (dictionary) {
+        value = lookup(dictionary, raw, field);
+      } else if (tails) {
+        if (!Array.isArray(raw) || raw.length !== 2 || typeof raw[0] !== 'string') {
+          throw new Error(`Column ${field}: expected [text, lastLines index]`);
+        }
+        value = raw[1] === null ? raw[0] : `${raw[0]}\n${lookup(tails, raw[1], field)}`;
+      }
+      setField(entries[i], field, value);
+    });
+  }
+  return entries;
+}
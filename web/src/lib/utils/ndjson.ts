@@ -0,0 +1,122 @@
+/**
+ * NDJSON Utility
+ *
+ * Incremental parsing of newline-delimited JSON request bodies. Used by the
+ * bulk-import route's streaming mode so a large import is inserted while it
+ * is still arriving instead of being buffered with `request.json()`.
+ */
+
+/**
+ * One non-blank line of an NDJSON stream.
+ *
+ * `index` counts non-blank lines from 0, so it matches the position of the
+ * entry in the sender's stream. Lines that are not valid JSON carry an
+ * `error` instead of a `value`.
+ */
+export type NdjsonLine =
+  | { index: number; value: unknown; error?: undefined }
+  | { index: number; value?: undefined; error: string };
+
+/** Longest line accepted by default (one vocabulary entry is ~1 KB). */
+export const DEFAULT_MAX_LINE_BYTES = 256 * 1024;
+
+const NEWLINE = 0x0a;
+
+/** Join byte chunks into one array. */
+function concatBytes(chunks: Uint8Array[], length: number): Uint8Array {
+  if (chunks.length === 1) return chunks[0];
+  const joined = new Uint8Array(length);
+  let offset = 0;
+  for (const chunk of chunks) {
+    joined.set(chunk, offset);
+    offset += chunk.length;
+  }
+  return joined;
+}
+
+/**
+ * Parse an NDJSON byte stream line by line.
+ *
+ * Features:
+ * - Holds at most one partial line in memory
+ * - Accepts `\n` and `\r\n` line endings and a final line without newline
+ * - Skips blank lines; reports unparseable lines without aborting the stream
+ * - Throws if a single line is longer than `maxLineBytes`
+ *
+ * Lines are split and measured as UTF-8 bytes, before decoding (a newline
+ * byte never occurs inside a multi-byte character), so the limit is in bytes
+ * whatever the text.
+ *
+ * @param stream - Request body (e.g. `request.body`)
+ * @param maxLineBytes - Longest accepted line in UTF-8 bytes, excluding the newline
+ *
+ * @example
+ * ```ts
+ * for await (const line of readNdjsonLines(request.body)) {
+ *   if (line.error) reject(line.index, line.error);
+ *   else handle(line.index, line.value);
+ * }
+ * ```
+ */
+export async function* readNdjsonLines(
+  stream: ReadableStream<Uint8Array>,
+  maxLineBytes: number = DEFAULT_MAX_LINE_BYTES
+): AsyncGenerator<NdjsonLine> {
+  const reader = stream.getReader();
+  const decoder = new TextDecoder();
+  let pending: Uint8Array[] = [];
+  let pendingBytes = 0;
+  let index = 0;
+
+  const checkLength = (bytes: number) => {
+    if (bytes > maxLineBytes) {
+      throw new Error(`NDJSON line ${index} exceeds ${maxLineBytes} bytes`);
+    }
+  };
+
+  const parse = (bytes: Uint8Array): NdjsonLine | null => {
+    const text = decoder.decode(bytes).trim();
+    if (!text) return null;
+    const lineIndex = index++;
+    try {
+      return { index: lineIndex, value: JSON.parse(text) };
+    } catch (error) {
+      return {
+        index: lineIndex,
+        error: error instanceof Error ? error.message : 'Invalid JSON',
+      };
+    }
+  };
+
+  try {
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      let start = 0;
+      let newline = value.indexOf(NEWLINE, start);
+      while (newline !== -1) {
+        const piece = value.subarray(start, newline);
+        checkLength(pendingBytes + piece.length);
+        const parsed = parse(concatBytes([...pending, piece], pendingBytes + piece.length));
+        if (parsed) yield parsed;
+        pending = [];
+        pendingBytes = 0;
+        start = newline + 1;
+        newline = value.indexOf(NEWLINE, start);
+      }
+
+      if (start < value.length) {
+        // Copy: the rest of the line must outlive this chunk
+        pending.push(value.slice(start));
+        pendingBytes += value.length - start;
+        checkLength(pendingBytes);
+      }
+    }
+
+    const parsed = parse(concatBytes(pending, pendingBytes));
+    if (parsed) yield parsed;
+  } finally {
+    reader.releaseLock();
+  }
+}